@@ -1,13 +1,12 @@
 # -*- coding: utf-8 -*-
 
-# Form implementation generated from reading ui file 'f:\Projects\PROGRAMMING\Repos\ShaderCreator\ui\ShaderCreator.ui'
+# Form implementation of ui/ShaderCreator.ui, ported by hand from the PyQt5 module to PySide2.
 #
-# Created by: PyQt5 UI code generator 5.13.1
-#
-# WARNING! All changes made in this file will be lost!
+# It isn't generated: change ShaderCreator.ui and this file together. Running
+# pyside2-uic ui/ShaderCreator.ui -o ui/ShaderCreator_ui.py replaces it with a generated one.
 
 
-from PyQt5 import QtCore, QtGui, QtWidgets
+from PySide2 import QtCore, QtGui, QtWidgets
 
 
 class Ui_Form(object):
@@ -215,51 +214,51 @@ class Ui_Form(object):
         self.verticalLayout_2.addWidget(self.widget_3)
 
         self.retranslateUi(Form)
-        self.chbox_diffuse.clicked['bool'].connect(self.btn_diffuse.setEnabled)
-        self.chbox_specular.clicked['bool'].connect(self.btn_specular.setEnabled)
-        self.chbox_roughness.clicked['bool'].connect(self.btn_roughness.setEnabled)
-        self.chbox_transmission.clicked['bool'].connect(self.btn_transmission.setEnabled)
-        self.chbox_sss.clicked['bool'].connect(self.btn_sss.setEnabled)
-        self.chbox_ssscolor.clicked['bool'].connect(self.btn_ssscolor.setEnabled)
-        self.chbox_bump.clicked['bool'].connect(self.btn_bump.setEnabled)
-        self.chbox_displacement.clicked['bool'].connect(self.btn_displacement.setEnabled)
-        self.chbox_diffuse.clicked['bool'].connect(self.lEdit_diffuse.setEnabled)
-        self.chbox_specular.clicked['bool'].connect(self.lEdit_specular.setEnabled)
-        self.chbox_roughness.clicked['bool'].connect(self.lEdit_roughness.setEnabled)
-        self.chbox_transmission.clicked['bool'].connect(self.lEdit_transmission.setEnabled)
-        self.chbox_sss.clicked['bool'].connect(self.lEdit_sss.setEnabled)
-        self.chbox_ssscolor.clicked['bool'].connect(self.lEdit_ssscolor.setEnabled)
-        self.chbox_bump.clicked['bool'].connect(self.lEdit_bump.setEnabled)
-        self.chbox_displacement.clicked['bool'].connect(self.lEdit_displacement.setEnabled)
+        self.chbox_diffuse.clicked.connect(self.btn_diffuse.setEnabled)
+        self.chbox_specular.clicked.connect(self.btn_specular.setEnabled)
+        self.chbox_roughness.clicked.connect(self.btn_roughness.setEnabled)
+        self.chbox_transmission.clicked.connect(self.btn_transmission.setEnabled)
+        self.chbox_sss.clicked.connect(self.btn_sss.setEnabled)
+        self.chbox_ssscolor.clicked.connect(self.btn_ssscolor.setEnabled)
+        self.chbox_bump.clicked.connect(self.btn_bump.setEnabled)
+        self.chbox_displacement.clicked.connect(self.btn_displacement.setEnabled)
+        self.chbox_diffuse.clicked.connect(self.lEdit_diffuse.setEnabled)
+        self.chbox_specular.clicked.connect(self.lEdit_specular.setEnabled)
+        self.chbox_roughness.clicked.connect(self.lEdit_roughness.setEnabled)
+        self.chbox_transmission.clicked.connect(self.lEdit_transmission.setEnabled)
+        self.chbox_sss.clicked.connect(self.lEdit_sss.setEnabled)
+        self.chbox_ssscolor.clicked.connect(self.lEdit_ssscolor.setEnabled)
+        self.chbox_bump.clicked.connect(self.lEdit_bump.setEnabled)
+        self.chbox_displacement.clicked.connect(self.lEdit_displacement.setEnabled)
         QtCore.QMetaObject.connectSlotsByName(Form)
 
     def retranslateUi(self, Form):
         _translate = QtCore.QCoreApplication.translate
-        Form.setWindowTitle(_translate("Form", "Form"))
-        self.lEdit_name.setPlaceholderText(_translate("Form", "Type Name"))
-        self.btn_create.setText(_translate("Form", "Create"))
-        self.chbox_assign.setText(_translate("Form", "Assign"))
-        self.chbox_diffuse.setText(_translate("Form", "Diffuse"))
-        self.lEdit_diffuse.setPlaceholderText(_translate("Form", "Texture Path"))
-        self.btn_diffuse.setText(_translate("Form", "Browse"))
-        self.chbox_specular.setText(_translate("Form", "Specular"))
-        self.lEdit_specular.setPlaceholderText(_translate("Form", "Texture Path"))
-        self.btn_specular.setText(_translate("Form", "Browse"))
-        self.chbox_roughness.setText(_translate("Form", "Roughness"))
-        self.lEdit_roughness.setPlaceholderText(_translate("Form", "Texture Path"))
-        self.btn_roughness.setText(_translate("Form", "Browse"))
-        self.chbox_transmission.setText(_translate("Form", "Transmission"))
-        self.lEdit_transmission.setPlaceholderText(_translate("Form", "Texture Path"))
-        self.btn_transmission.setText(_translate("Form", "Browse"))
-        self.chbox_sss.setText(_translate("Form", "SSS"))
-        self.lEdit_sss.setPlaceholderText(_translate("Form", "Texture Path"))
-        self.btn_sss.setText(_translate("Form", "Browse"))
-        self.chbox_ssscolor.setText(_translate("Form", "SSS Color"))
-        self.lEdit_ssscolor.setPlaceholderText(_translate("Form", "Texture Path"))
-        self.btn_ssscolor.setText(_translate("Form", "Browse"))
-        self.chbox_bump.setText(_translate("Form", "Bump"))
-        self.lEdit_bump.setPlaceholderText(_translate("Form", "Texture Path"))
-        self.btn_bump.setText(_translate("Form", "Browse"))
-        self.chbox_displacement.setText(_translate("Form", "Displacement"))
-        self.lEdit_displacement.setPlaceholderText(_translate("Form", "Texture Path"))
-        self.btn_displacement.setText(_translate("Form", "Browse"))
+        Form.setWindowTitle(_translate("Form", "Form", None))
+        self.lEdit_name.setPlaceholderText(_translate("Form", "Type Name", None))
+        self.btn_create.setText(_translate("Form", "Create", None))
+        self.chbox_assign.setText(_translate("Form", "Assign", None))
+        self.chbox_diffuse.setText(_translate("Form", "Diffuse", None))
+        self.lEdit_diffuse.setPlaceholderText(_translate("Form", "Texture Path", None))
+        self.btn_diffuse.setText(_translate("Form", "Browse", None))
+        self.chbox_specular.setText(_translate("Form", "Specular", None))
+        self.lEdit_specular.setPlaceholderText(_translate("Form", "Texture Path", None))
+        self.btn_specular.setText(_translate("Form", "Browse", None))
+        self.chbox_roughness.setText(_translate("Form", "Roughness", None))
+        self.lEdit_roughness.setPlaceholderText(_translate("Form", "Texture Path", None))
+        self.btn_roughness.setText(_translate("Form", "Browse", None))
+        self.chbox_transmission.setText(_translate("Form", "Transmission", None))
+        self.lEdit_transmission.setPlaceholderText(_translate("Form", "Texture Path", None))
+        self.btn_transmission.setText(_translate("Form", "Browse", None))
+        self.chbox_sss.setText(_translate("Form", "SSS", None))
+        self.lEdit_sss.setPlaceholderText(_translate("Form", "Texture Path", None))
+        self.btn_sss.setText(_translate("Form", "Browse", None))
+        self.chbox_ssscolor.setText(_translate("Form", "SSS Color", None))
+        self.lEdit_ssscolor.setPlaceholderText(_translate("Form", "Texture Path", None))
+        self.btn_ssscolor.setText(_translate("Form", "Browse", None))
+        self.chbox_bump.setText(_translate("Form", "Bump", None))
+        self.lEdit_bump.setPlaceholderText(_translate("Form", "Texture Path", None))
+        self.btn_bump.setText(_translate("Form", "Browse", None))
+        self.chbox_displacement.setText(_translate("Form", "Displacement", None))
+        self.lEdit_displacement.setPlaceholderText(_translate("Form", "Texture Path", None))
+        self.btn_displacement.setText(_translate("Form", "Browse", None))
@@ -0,0 +1,127 @@
+from __future__ import annotations
+from typing import NamedTuple
+import re
+import time
+
+SURFACE_TYPES = ['mesh', 'nurbsSurface']
+# Components a shader can be assigned to: mesh faces and surface patches
+FACE_COMPONENT = re.compile(r'\.s?f\[')
+# Members given to each sets -forceElement call. Maya moves every member of one call out of its previous shading group
+# before it returns, so a huge list holds the UI and makes one large undo record, while small chunks pay for more
+# commands. The assignment_chunk stages of the benchmark measure the sizes of benchmark.CHUNK_SIZES.
+ASSIGN_CHUNK_SIZE = 2000
+
+class AssignmentTargets(NamedTuple):
+    """
+     What a selection assigns a shader to.
+
+     @param shapes - Long names of the surface shapes, each instance of a shape is its own path.
+     @param components - Face and patch components on their shape, for example |pCube1|pCubeShape1.f[0:3].
+     @param skipped - Selected items that can't receive a shader.
+    """
+    shapes: list
+    components: list
+    skipped: list
+
+    @property
+    def members(self) -> list:
+        return self.shapes + self.components
+
+class AssignmentReport(NamedTuple):
+    """
+     Result of an assignment.
+
+     @param sg - Shading group assigned.
+     @param members - Number of shapes and components assigned.
+     @param chunks - Number of sets commands run.
+     @param seconds - Time spent assigning.
+    """
+    sg: str
+    members: int
+    chunks: int
+    seconds: float
+
+    @property
+    def per_second(self) -> float:
+        return self.members / self.seconds if self.seconds else 0.0
+
+def collect_targets(items: list[str]|None = None) -> AssignmentTargets:
+    """
+     Find the surfaces under the selected objects and the selected faces with bulk queries, the number of queries
+     doesn't grow with the selection.
+
+     @param items - Objects and components. None for the selection.
+
+     @return AssignmentTargets.
+    """
+    from .mel_helper import cmds
+    # Long names tell the instances of a shape apart
+    items = cmds.ls(selection=True, long=True) if items is None else cmds.ls(items, long=True)
+    items = items or list()
+    objects = [item for item in items if '.' not in item]
+    components = [item for item in items if '.' in item]
+    shapes = list()
+    if objects:
+        shapes = cmds.ls(objects, dag=True, long=True, type=SURFACE_TYPES, noIntermediate=True) or list()
+    # Objects without any surface under them
+    under = set()
+    for shape in shapes:
+        path = shape
+        while path:
+            under.add(path)
+            path = path.rsplit('|', 1)[0]
+    skipped = [item for item in objects if item not in under]
+    faces = [item for item in components if FACE_COMPONENT.search(item)]
+    skipped.extend(item for item in components if not FACE_COMPONENT.search(item))
+    assigned = set(shapes)
+    targets = list()
+    if faces:
+        owners = sorted({face.split('.', 1)[0] for face in faces})
+        surfaces = cmds.ls(owners, dag=True, long=True, type=SURFACE_TYPES, noIntermediate=True) or list()
+        surface_set = set(surfaces)
+        children = dict()
+        for surface in surfaces:
+            children.setdefault(surface.rsplit('|', 1)[0], list()).append(surface)
+        for face in faces:
+            node, component = face.split('.', 1)
+            # Maya names the components of a single shape after its transform
+            owned = children.get(node, list())
+            shape = node if node in surface_set else (owned[0] if len(owned) == 1 else None)
+            if shape is None:
+                skipped.append(face)
+            elif shape not in assigned:
+                targets.append('{0}.{1}'.format(shape, component))
+    return AssignmentTargets(list(dict.fromkeys(shapes)), list(dict.fromkeys(targets)), skipped)
+
+def assign_members(members: list[str], sg: str, chunk_size: int = ASSIGN_CHUNK_SIZE) -> AssignmentReport:
+    """
+     Assign shapes and components to a shading group in chunks, all in one undo chunk.
+
+     @param members - Shapes and components, long names for instanced shapes.
+     @param sg - Shading group.
+     @param chunk_size - Members given to each sets command, at least 1.
+
+     @return AssignmentReport.
+    """
+    from .mel_helper import cmds
+    start = time.perf_counter()
+    chunk_size = max(1, chunk_size)
+    chunks = 0
+    cmds.undoInfo(openChunk=True, chunkName='ShaderCreatorAssign')
+    try:
+        for index in range(0, len(members), chunk_size):
+            cmds.sets(members[index:index + chunk_size], forceElement=sg)
+            chunks += 1
+    finally:
+        cmds.undoInfo(closeChunk=True)
+    return AssignmentReport(sg, len(members), chunks, time.perf_counter() - start)
+
+def format_assignment(report: AssignmentReport) -> str:
+    """
+     Describe an assignment with its throughput.
+
+     @param report - AssignmentReport.
+
+     @return The report as text.
+    """
+    return '{0} members assigned to {1} in {2} chunks, {3:.3f} s ({4:.0f} members/sec)'.format(report.members, report.sg, report.chunks, report.seconds, report.per_second)
@@ -0,0 +1,214 @@
+from __future__ import annotations
+from typing import NamedTuple
+import re
+
+RULE_KINDS = ('glob', 'regex', 'token')
+
+class AssignmentRule(NamedTuple):
+    """
+     Assign a material to every surface under the nodes whose name matches a pattern.
+
+     @param material - Material or shading group to assign.
+     @param pattern - Pattern matched against the name of each node of the path of a shape, the shape itself included.
+     @param kind - glob (rock_A*_GEO), regex (re.search) or token (rock_A matches the tokens rock and A next to each other).
+     @param priority - Higher priorities win when rules match the same shape.
+    """
+    material: str
+    pattern: str
+    kind: str = 'glob'
+    priority: int = 0
+
+class RulePreview(NamedTuple):
+    """
+     What a rule does in the scene.
+
+     @param rule - The AssignmentRule.
+     @param matched - Number of shapes the rule matches.
+     @param assigned - Number of shapes the rule wins.
+     @param lost - Number of shapes another rule wins.
+    """
+    rule: AssignmentRule
+    matched: int
+    assigned: int
+    lost: int
+
+def rules_from_dicts(items: list[dict]) -> list[AssignmentRule]:
+    """
+     Build rules from dictionaries, for example read from a JSON file.
+
+     @param items - Dictionaries with material, pattern and optional kind and priority keys.
+
+     @return List of AssignmentRule.
+    """
+    rules = list()
+    for item in items:
+        rule = AssignmentRule(item['material'], item['pattern'], item.get('kind', 'glob'), int(item.get('priority', 0)))
+        if rule.kind not in RULE_KINDS:
+            raise ValueError('Unknown rule kind {0}, use one of {1}'.format(rule.kind, ', '.join(RULE_KINDS)))
+        rules.append(rule)
+    return rules
+
+def _glob_regex(pattern: str):
+    return re.compile(''.join('.*' if character == '*' else '.' if character == '?' else re.escape(character) for character in pattern), re.DOTALL)
+
+class ShapeNameIndex(object):
+    """
+     Names of the surfaces of the scene, read with one query. Every node name of the path of a shape points to the
+     shapes under it, so rules are matched against the names without querying Maya again.
+
+     @param shapes - Long names of the shapes. None to read every mesh and nurbs surface of the scene.
+    """
+    def __init__(self, shapes: list[str]|None = None):
+        from .mel_helper import cmds
+        from .assignment import SURFACE_TYPES
+        if shapes is None:
+            shapes = cmds.ls(type=SURFACE_TYPES, long=True, noIntermediate=True) or list()
+        self.shapes = list(shapes)
+        self.names = dict()
+        for shape_index, shape in enumerate(self.shapes):
+            for name in shape.strip('|').split('|'):
+                self.names.setdefault(name, list()).append(shape_index)
+        # Every name on its own line, the names containing a text are found with one scan
+        self.text = '\n'.join(self.names)
+        self.tokens = dict()
+        for name in self.names:
+            for token in name.split('_'):
+                self.tokens.setdefault(token, set()).add(name)
+
+    def containing(self, literal: str) -> list[str]:
+        """
+         Find the node names containing a text.
+
+         @param literal - Text to look for.
+
+         @return List of node names.
+        """
+        if not literal:
+            return list(self.names)
+        found = list()
+        text = self.text
+        position = text.find(literal)
+        while position >= 0:
+            line_start = text.rfind('\n', 0, position) + 1
+            line_end = text.find('\n', position)
+            line_end = len(text) if line_end < 0 else line_end
+            found.append(text[line_start:line_end])
+            position = text.find(literal, line_end)
+        return found
+
+    def match(self, rule: AssignmentRule) -> list[str]:
+        """
+         Find the node names a rule matches.
+
+         @param rule - AssignmentRule.
+
+         @return List of node names.
+        """
+        if rule.kind == 'glob':
+            # Only the names with the longest plain part of the pattern are matched
+            literal = max(re.split(r'[*?]', rule.pattern), key=len)
+            expression = _glob_regex(rule.pattern)
+            return [name for name in self.containing(literal) if expression.fullmatch(name)]
+        if rule.kind == 'regex':
+            expression = re.compile(rule.pattern)
+            return [name for name in self.names if expression.search(name)]
+        if rule.kind == 'token':
+            tokens = rule.pattern.split('_')
+            candidates = set.intersection(*[self.tokens.get(token, set()) for token in tokens])
+            found = list()
+            for name in candidates:
+                name_tokens = name.split('_')
+                if any(name_tokens[start:start + len(tokens)] == tokens for start in range(len(name_tokens) - len(tokens) + 1)):
+                    found.append(name)
+            return sorted(found)
+        raise ValueError('Unknown rule kind {0}, use one of {1}'.format(rule.kind, ', '.join(RULE_KINDS)))
+
+def resolve_rules(rules: list[AssignmentRule], index: ShapeNameIndex|None = None) -> tuple:
+    """
+     Match every rule against the scene and pick one rule for each shape. The highest priority wins, then the first
+     rule of the list, so the result doesn't depend on the scene order.
+
+     @param rules - List of AssignmentRule.
+     @param index - ShapeNameIndex to reuse. None to read the scene.
+
+     @return Tuple with a dictionary of shapes and the index of their rule, and the list of RulePreview.
+    """
+    index = index or ShapeNameIndex()
+    best = dict()
+    matched = [0] * len(rules)
+    for rule_index, rule in enumerate(rules):
+        shapes = {shape_index for name in index.match(rule) for shape_index in index.names[name]}
+        matched[rule_index] = len(shapes)
+        key = (-rule.priority, rule_index)
+        for shape_index in shapes:
+            if shape_index not in best or key < best[shape_index]:
+                best[shape_index] = key
+    winners = {index.shapes[shape_index]: key[1] for shape_index, key in best.items()}
+    assigned = [0] * len(rules)
+    for rule_index in winners.values():
+        assigned[rule_index] += 1
+    previews = [RulePreview(rule, matched[rule_index], assigned[rule_index], matched[rule_index] - assigned[rule_index]) for rule_index, rule in enumerate(rules)]
+    return winners, previews
+
+def _shading_groups(materials: list[str]) -> dict:
+    """
+     Find the shading group of each material, a shading group is returned as it is.
+    """
+    from .mel_helper import cmds
+    groups = dict()
+    for material in materials:
+        if not cmds.objExists(material):
+            continue
+        if cmds.nodeType(material) == 'shadingEngine':
+            groups[material] = material
+            continue
+        found = cmds.listConnections(material, source=False, destination=True, type='shadingEngine') or list()
+        if found:
+            groups[material] = sorted(set(found))[0]
+    return groups
+
+def apply_rules(rules: list[AssignmentRule], index: ShapeNameIndex|None = None, preview: bool = False) -> tuple:
+    """
+     Assign materials to the shapes matched by rules, each material in chunked batches and everything in one undo chunk.
+
+     @param rules - List of AssignmentRule.
+     @param index - ShapeNameIndex to reuse. None to read the scene.
+     @param preview - True to only count the matches.
+
+     @return Tuple with the list of RulePreview, the list of assignment.AssignmentReport and the materials not found.
+    """
+    from .mel_helper import cmds
+    from .assignment import assign_members
+    winners, previews = resolve_rules(rules, index)
+    members = dict()
+    for shape, rule_index in sorted(winners.items()):
+        members.setdefault(rules[rule_index].material, list()).append(shape)
+    groups = _shading_groups(sorted(members))
+    missing = [material for material in sorted(members) if material not in groups]
+    if preview:
+        return previews, list(), missing
+    reports = list()
+    cmds.undoInfo(openChunk=True, chunkName='ShaderCreatorRules')
+    try:
+        for material in sorted(groups):
+            reports.append(assign_members(members[material], groups[material]))
+    finally:
+        cmds.undoInfo(closeChunk=True)
+    return previews, reports, missing
+
+def format_rules(previews: list[RulePreview], reports: list|None = None, missing: list[str]|None = None) -> str:
+    """
+     Describe what rules match and assign.
+
+     @param previews - List of RulePreview.
+     @param reports - List of assignment.AssignmentReport, empty for a preview.
+     @param missing - Materials not found in the scene.
+
+     @return The report as text.
+    """
+    from .assignment import format_assignment
+    lines = ['{0} {1} {2}: {3} matched, {4} assigned, {5} taken by other rules'.format(preview.rule.material, preview.rule.kind, preview.rule.pattern, preview.matched, preview.assigned, preview.lost) for preview in previews]
+    lines.extend(format_assignment(report) for report in reports or list())
+    if missing:
+        lines.append('Materials not found: {}'.format(', '.join(missing)))
+    return '\n'.join(lines)
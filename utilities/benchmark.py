@@ -0,0 +1,256 @@
+from __future__ import annotations
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+MAP_TYPES = ['Diffuse', 'Specular', 'Roughness', 'Transmission', 'Sss', 'SssColor', 'Normal', 'Displacement']
+NAMING_VARIANTS = {
+    'mari': '{asset}_{map_type}_v{version:02d}.{tile}.{extension}',
+    'lower': '{asset}_{map_type_lower}_V{version:02d}.{tile}.{extension}',
+    'zbrush': '{asset}_{map_type}_v{version:02d}.u{u}_v{v}.{extension}',
+    'mudbox': '{asset}_{map_type}_v{version:02d}.u{u1}_v{v1}.{extension}',
+    'single': '{asset}_{map_type}_v{version:02d}.{extension}',
+}
+# Chunk sizes of the assignment sweep
+CHUNK_SIZES = (100, 500, 2000, 10000)
+CHANNELS = {'Diffuse': 'diffuse', 'Specular': 'specular', 'Roughness': 'roughness', 'Transmission': 'transmission', 'Sss': 'sss', 'SssColor': 'ssscolor', 'Normal': 'bump', 'Displacement': 'displacement'}
+
+def generate_texture_tree(root: str, assets: int = 10, versions: int = 3, tiles: int = 4, map_types: list[str]|None = None, variants: list[str]|None = None, extension: str = 'exr') -> dict:
+    """
+     Create a synthetic texture folder for benchmarks. Each file only has the signature of its format.
+
+     @param root - Folder to create the files in.
+     @param assets - Number of assets.
+     @param versions - Number of versions of each map.
+     @param tiles - Number of UDIM tiles of each version.
+     @param map_types - Map types to create. Defaults to all the map types the tool knows.
+     @param variants - Naming variants to cycle between assets, keys of NAMING_VARIANTS. Defaults to all of them.
+     @param extension - Extension of the files.
+
+     @return Dictionary of asset names and dictionaries of map types and latest version of each file (first tile).
+    """
+    from .texture_validation import IMAGE_SIGNATURES
+    map_types = map_types or MAP_TYPES
+    header = IMAGE_SIGNATURES.get(extension, [b'image'])[0]
+    variants = variants or list(NAMING_VARIANTS)
+    os.makedirs(root, exist_ok=True)
+    texture_sets = dict()
+    for asset_index in range(assets):
+        asset = 'asset{0:05d}'.format(asset_index)
+        pattern = NAMING_VARIANTS[variants[asset_index % len(variants)]]
+        textures = dict()
+        for map_type in map_types:
+            for version in range(1, versions + 1):
+                for tile in range(tiles if '{tile}' in pattern or '{u' in pattern else 1):
+                    u, v = tile % 10, tile // 10
+                    file = pattern.format(asset=asset, map_type=map_type, map_type_lower=map_type.lower(), version=version, tile=1001 + u + v * 10, u=u, v=v, u1=u + 1, v1=v + 1, extension=extension)
+                    path = '{0}/{1}'.format(root, file)
+                    with open(path, 'wb') as image_file:
+                        image_file.write(header)
+                    if version == versions and tile == 0:
+                        textures[CHANNELS[map_type]] = path
+        texture_sets[asset] = textures
+    return texture_sets
+
+def percentile(values: list[float], percent: float) -> float:
+    """
+     Get a percentile of a list of values.
+
+     @param values - Values to look into.
+     @param percent - Percentile between 0 and 100.
+
+     @return The value at the percentile, 0 if there are no values.
+    """
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round((len(values) - 1) * percent / 100.0)))
+    return values[index]
+
+def time_stage(function, arguments: list, repeat: int = 1) -> dict:
+    """
+     Time a function called once for each argument.
+
+     @param function - Function to time.
+     @param arguments - List of argument tuples, one call for each.
+     @param repeat - Number of times to go through the arguments.
+
+     @return Dictionary with the number of operations, ops/sec, mean, p50 and p95 latency in milliseconds.
+    """
+    timings = list()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for args in arguments:
+            call_start = time.perf_counter()
+            function(*args)
+            timings.append(time.perf_counter() - call_start)
+    total = time.perf_counter() - start
+    return {
+        'ops': len(timings),
+        'ops_per_sec': len(timings) / total if total else 0.0,
+        'mean_ms': 1000.0 * sum(timings) / len(timings) if timings else 0.0,
+        'p50_ms': 1000.0 * percentile(timings, 50),
+        'p95_ms': 1000.0 * percentile(timings, 95),
+    }
+
+def run_benchmarks(assets: int = 50, versions: int = 3, tiles: int = 4, repeat: int = 3, shader_type: str = 'aiStandardSurface', root: str|None = None, materials: int = 1000) -> dict:
+    """
+     Run every benchmark stage on a synthetic texture tree and a fake Maya scene.
+
+     @param assets - Number of assets of the synthetic tree.
+     @param versions - Number of versions of each map.
+     @param tiles - Number of UDIM tiles of each version.
+     @param repeat - Number of times each stage runs over all the assets.
+     @param shader_type - Shader type used to build the networks.
+     @param root - Folder for the synthetic tree. A temporary folder is used and removed if None.
+     @param materials - Number of materials built node by node and from templates.
+
+     @return Dictionary of stage names and their timing dictionaries.
+    """
+    from .maya_backend import set_backend
+    from .fake_cmds import FakeCmds
+    from .texture_index import clear_index_cache
+    from .path_helper import path_look_relatives, file_latest_version
+    from .sanity_checks import main_sanity_checks
+    from .btn_actions import run_create
+    temporary = root is None
+    root = root or tempfile.mkdtemp(prefix='shader_creator_bench_')
+    fake = FakeCmds()
+    previous = set_backend(fake)
+    try:
+        texture_sets = generate_texture_tree(root, assets=assets, versions=versions, tiles=tiles)
+        first_files = [(textures['diffuse'],) for textures in texture_sets.values()]
+        results = dict()
+
+        def discovery_cold(path):
+            clear_index_cache()
+            return path_look_relatives(path)
+        results['discovery_cold'] = time_stage(discovery_cold, first_files[:max(1, min(len(first_files), 5))], repeat)
+        results['discovery_warm'] = time_stage(path_look_relatives, first_files, repeat)
+
+        from .naming import NamingConvention
+        listing = sorted(os.listdir(root))
+        results['classification'] = time_stage(lambda files: NamingConvention().classify_many(files), [(listing,)], repeat)
+        results['classification']['names_per_sec'] = len(listing) * results['classification']['ops_per_sec']
+
+        relatives = [({channel: [path] for channel, path in textures.items()},) for textures in texture_sets.values()]
+        results['version_resolution'] = time_stage(file_latest_version, relatives, repeat)
+        results['sanity_checks'] = time_stage(main_sanity_checks, [(name, list(), textures) for name, textures in texture_sets.items()], repeat)
+
+        results['network_construction'] = time_stage(run_create, [(name, shader_type, False, textures) for name, textures in texture_sets.items()], repeat)
+        results['network_construction']['commands_per_material'] = sum(fake.calls.values()) / results['network_construction']['ops']
+
+        # A group of 100 shapes for each asset assigned to the first material
+        from .mel_helper import selection_shapes_meshes, assign_shader
+        group = fake.createNode('transform', name='bench_GRP')
+        for index in range(assets * 100):
+            transform = fake.createNode('transform', name='bench{0:06d}_GEO'.format(index), parent=group)
+            fake.createNode('mesh', name='bench{0:06d}_GEOShape'.format(index), parent=transform)
+        sg = fake.ls(type='shadingEngine')[0]
+        fake.select(group)
+        results['assignment'] = time_stage(lambda: assign_shader(selection_shapes_meshes(), sg), [()], repeat)
+        results['assignment']['members_per_sec'] = assets * 100 * results['assignment']['ops_per_sec']
+        # The same shapes assigned with each chunk size, to tune assignment.ASSIGN_CHUNK_SIZE
+        members = selection_shapes_meshes()
+        for chunk_size in CHUNK_SIZES:
+            stage = 'assignment_chunk_{}'.format(chunk_size)
+            results[stage] = time_stage(lambda: assign_shader(members, sg, chunk_size), [()], repeat)
+            results[stage]['members_per_sec'] = len(members) * results[stage]['ops_per_sec']
+
+        # The same materials built node by node and duplicated from templates, each in an empty scene. The duplicate
+        # alone costs more than building the whole network, so the tool doesn't use the templates
+        from .mel_helper import get_channel_mapping, execute_plan
+        from .network_plan import plan_material
+        from .network_template import execute_template
+        from .image_header import probe_headers
+        headers = probe_headers([path for textures in texture_sets.values() for path in textures.values()])
+        texture_list = list(texture_sets.values())
+        arguments = [('mat{0:05d}'.format(index), texture_list[index % len(texture_list)]) for index in range(materials)]
+        for stage, execute in (('construction_nodes', execute_plan), ('construction_template', execute_template)):
+            scene = FakeCmds()
+            set_backend(scene)
+            mapping = get_channel_mapping(shader_type)
+            results[stage] = time_stage(lambda name, textures: execute(plan_material(name, shader_type, textures, mapping, headers)), arguments, 1)
+            results[stage]['commands_per_material'] = sum(scene.calls.values()) / max(1, materials)
+        set_backend(fake)
+        return results
+    finally:
+        set_backend(previous)
+        if temporary:
+            shutil.rmtree(root, ignore_errors=True)
+
+def compare_to_baseline(results: dict, baseline: dict, tolerance: float = 0.2) -> list[str]:
+    """
+     Compare benchmark results with a stored baseline.
+
+     @param results - Results of run_benchmarks.
+     @param baseline - Results stored from a previous run.
+     @param tolerance - Allowed slow down, 0.2 lets a stage be 20% slower.
+
+     @return List of regression messages, empty if every stage is inside the tolerance.
+    """
+    regressions = list()
+    for stage, base in sorted(baseline.items()):
+        current = results.get(stage)
+        if not current:
+            regressions.append('{0}: missing from the results'.format(stage))
+            continue
+        if current['ops_per_sec'] < base['ops_per_sec'] * (1.0 - tolerance):
+            regressions.append('{0}: {1:.1f} ops/sec, baseline {2:.1f} ops/sec'.format(stage, current['ops_per_sec'], base['ops_per_sec']))
+        if current['p95_ms'] > base['p95_ms'] * (1.0 + tolerance):
+            regressions.append('{0}: p95 {1:.3f} ms, baseline {2:.3f} ms'.format(stage, current['p95_ms'], base['p95_ms']))
+    return regressions
+
+def format_results(results: dict) -> str:
+    """
+     Format benchmark results as a table.
+
+     @param results - Results of run_benchmarks.
+
+     @return The table as text.
+    """
+    lines = ['{0:<24}{1:>10}{2:>14}{3:>12}{4:>12}{5:>12}'.format('stage', 'ops', 'ops/sec', 'p50 ms', 'p95 ms', 'cmds/mat')]
+    for stage, stats in results.items():
+        commands = '{:.1f}'.format(stats['commands_per_material']) if 'commands_per_material' in stats else ''
+        lines.append('{0:<24}{1:>10}{2:>14.1f}{3:>12.3f}{4:>12.3f}{5:>12}'.format(stage, stats['ops'], stats['ops_per_sec'], stats['p50_ms'], stats['p95_ms'], commands))
+    return '\n'.join(lines)
+
+def main(argv: list[str]|None = None) -> int:
+    """
+     Command line entry point: python -m ShaderCreator.utilities.benchmark
+
+     @param argv - Command line arguments. Defaults to sys.argv.
+
+     @return Exit code, 1 if a regression against the baseline was found.
+    """
+    parser = argparse.ArgumentParser(description='Shader Creator benchmarks')
+    parser.add_argument('--assets', type=int, default=50)
+    parser.add_argument('--versions', type=int, default=3)
+    parser.add_argument('--tiles', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--shader-type', default='aiStandardSurface')
+    parser.add_argument('--materials', type=int, default=1000)
+    parser.add_argument('--baseline', help='JSON file with the results to compare with')
+    parser.add_argument('--save-baseline', help='JSON file to save the results to')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args(argv)
+    results = run_benchmarks(assets=args.assets, versions=args.versions, tiles=args.tiles, repeat=args.repeat, shader_type=args.shader_type, materials=args.materials)
+    print(format_results(results))
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as baseline_file:
+            json.dump(results, baseline_file, indent=2, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare_to_baseline(results, json.load(baseline_file), args.tolerance)
+        for regression in regressions:
+            print('REGRESSION {}'.format(regression))
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,25 @@
 from __future__ import annotations
-import re
+from typing import NamedTuple
 
-def run_create(shader_name: str, shader_type: str, assign: bool, textures: dict) -> str|None:
+class BatchResult(NamedTuple):
+    """
+     Result of one material created by run_create_batch.
+
+     @param name - Name of the material.
+     @param success - True if the material was created.
+     @param material - Name of the created material or None.
+     @param sg - Name of the created shading group or None.
+     @param textures - Dictionary of map types and paths used.
+     @param errors - List of errors found, empty if the material was created.
+    """
+    name: str
+    success: bool
+    material: str|None
+    sg: str|None
+    textures: dict
+    errors: list
+
+def run_create(shader_name: str, shader_type: str, assign: bool, textures: dict, reuse: bool = False, lean: bool = False) -> tuple:
     """
      Create shader. If assign is True assign selected meshes to the shader and connect the textures.
      
@@ -9,8 +27,11 @@ def run_create(shader_name: str, shader_type: str, assign: bool, textures: dict)
      @param shader_type - Type of the shader to create.
      @param assign - True to assign selected meshes. False to not assign.
      @param textures - Dictionary of textures to connect to the shader.
+     @param reuse - True to reuse the file nodes of the scene reading the same textures and share one placement node.
+     @param lean - True to connect the textures without color correct and range nodes.
      
-     @return Error message if something went wrong None otherwise.
+     @return ( errors report ) the error message if something went wrong or None, and the assignment report with its
+     throughput or None if nothing was assigned.
     """
     from .mel_helper import selection_shapes_meshes
     from .sanity_checks import main_sanity_checks
@@ -21,27 +42,97 @@ def run_create(shader_name: str, shader_type: str, assign: bool, textures: dict)
     sanity_errors = main_sanity_checks(shader_name, meshes_list, textures)
     # Return true if sanity errors are met.
     if sanity_errors:
-        return sanity_errors
-    material, sg = run_create_shader(shader_name, shader_type)
-    # Assign meshes to the shader.
-    if meshes_list:
-        run_assign_shader(sg, meshes_list)
-    # connects to the textures if textures is set
-    if textures:
-        run_connect_textures(material, textures, sg)
-    return None
-
-def run_assign_shader(sg: str, meshes_list: list[str]) -> None:
+        return sanity_errors, None
+    from .transaction import Transaction
+    # One undo for the material and its assignment, nothing is left in the scene if one of them fails
+    report = None
+    with Transaction('ShaderCreatorCreate'):
+        material, sg = run_create_material(shader_name, shader_type, textures, reuse=reuse, lean=lean)
+        # Assign meshes to the shader.
+        if meshes_list:
+            report = run_assign_shader(sg, meshes_list)
+    return None, report
+
+def run_create_batch(root_folder: str, shader_type: str, recursive: bool = True, reuse: bool = False, lean: bool = False, convert=None, transaction=None) -> list[BatchResult]:
+    """
+     Create one shader for each asset found in a texture folder and connect all its textures.
+     
+     @param root_folder - Folder to look for textures.
+     @param shader_type - Type of the shaders to create.
+     @param recursive - True to look in the sub folders too.
+     @param reuse - True to reuse the file nodes reading the same textures and share one placement node for each material.
+     @param lean - True to connect the textures without color correct and range nodes.
+     @param convert - texture_convert.ConverterSettings to convert the textures to tiled mipmaps and point the file nodes at them. None to keep the textures.
+     @param transaction - transaction.Transaction the whole batch runs in, to undo it at once or to suspend undo with
+     suspend_undo. None for one undo chunk for each material. A material that fails is always rolled back on its own.
+     
+     @return List of BatchResult, one for each asset found. format_batch describes them with the memory of the transaction.
+    """
+    from .path_helper import discover_texture_sets
+    from .sanity_checks import batch_sanity_checks
+    from .image_header import probe_headers
+    from .transaction import Transaction
+    from .mel_helper import cmds
+    from contextlib import nullcontext
+    results = list()
+    created = list()
+    # Find every asset and run the sanity checks before creating anything
+    texture_sets = discover_texture_sets(root_folder, recursive=recursive)
+    batch_errors = batch_sanity_checks(texture_sets)
+    # Read the image headers of every material at once
+    headers = probe_headers([path for name, textures in texture_sets.items() if name not in batch_errors for path in textures.values()])
+    with transaction or nullcontext():
+        for name, textures in texture_sets.items():
+            if name in batch_errors:
+                results.append(BatchResult(name, False, None, None, textures, batch_errors[name]))
+                continue
+            try:
+                # The nodes of a material that fails are deleted, the batch goes on
+                with Transaction('ShaderCreatorMaterial') as material_transaction:
+                    material, sg = run_create_material(name, shader_type, textures, headers, reuse, lean)
+            except Exception as err:
+                results.append(BatchResult(name, False, None, None, textures, ['{0}: {1}'.format(type(err).__name__, err)]))
+                continue
+            results.append(BatchResult(name, True, material, sg, textures, list()))
+            created.extend(material_transaction.created)
+    # Convert the textures of every material created in one pass
+    if convert is not None:
+        # Only the file nodes of this batch are pointed at the converted textures
+        file_nodes = cmds.ls(created, type='file') if created else list()
+        run_convert_textures([path for result in results if result.success for path in result.textures.values()], convert, repoint=True, nodes=file_nodes)
+    return results
+
+def format_batch(results: list[BatchResult], transaction=None) -> str:
+    """
+     Describe a batch: the materials created, the errors of the others and the memory used when undo was suspended.
+     
+     @param results - Results of run_create_batch.
+     @param transaction - transaction.Transaction given to run_create_batch or None.
+     
+     @return The report as text.
+    """
+    from .transaction import format_transaction
+    lines = list()
+    for result in results:
+        if not result.success:
+            lines.append('{0} failed: {1}'.format(result.name, '; '.join(result.errors)))
+    lines.append('{0} materials created, {1} failed'.format(sum(result.success for result in results), sum(not result.success for result in results)))
+    if transaction is not None and transaction.suspend_undo:
+        lines.append(format_transaction(transaction))
+    return '\n'.join(lines)
+
+def run_assign_shader(sg: str, meshes_list: list[str]) -> str:
     """
      Assign shaders to the selected meshes or nurbs surfaces.
      
      @param sg - name of the shader to be used
-     @param meshes_list - list of meshes to be assigned
+     @param meshes_list - list of meshes or face components to be assigned
 
-     @return None
+     @return Report with the number of members assigned and the throughput
     """
     from .mel_helper import assign_shader
-    assign_shader(meshes_list, sg)
+    from .assignment import format_assignment
+    return format_assignment(assign_shader(meshes_list, sg))
 
 def run_create_shader(shader_name: str, shader_type: str) -> tuple:
     """
@@ -56,6 +147,36 @@ def run_create_shader(shader_name: str, shader_type: str) -> tuple:
     material, sg = create_shader(shader_name, shader_type)
     return material, sg
 
+def run_create_material(shader_name: str, shader_type: str, textures: dict, headers: dict|None = None, reuse: bool = False, lean: bool = False) -> tuple:
+    """
+     Create a shader, its shading group and its texture networks in one pass.
+     
+     @param shader_name - Name of the shader to create.
+     @param shader_type - Type of the shader.
+     @param textures - Dictionary of map types and paths to connect.
+     @param headers - Dictionary of paths and image headers already read. The headers are read if None.
+     @param reuse - True to reuse the file nodes of the scene reading the same textures and share one placement node.
+     @param lean - True to connect the textures without color correct and range nodes.
+     
+     @return ( material sg ) names of the created shader and shading group.
+    """
+    from .mel_helper import get_channel_mapping, execute_plan
+    from .network_plan import plan_material
+    from .image_header import probe_headers
+    from .file_reuse import get_file_node_index
+    textures = textures or dict()
+    if headers is None:
+        headers = probe_headers(list(textures.values()))
+    file_nodes = get_file_node_index() if reuse else None
+    # The channel mapping is built once for each shader type.
+    plan = plan_material(shader_name, shader_type, textures, get_channel_mapping(shader_type), headers, file_nodes, reuse, lean)
+    names = execute_plan(plan)
+    # The new file nodes can be reused by the next materials
+    if file_nodes is not None:
+        for node, key in plan.file_keys:
+            file_nodes.add(key, names[node])
+    return names['@material'], names['@sg']
+
 def run_connect_textures(shader: str, textures: dict, sg:str) -> None:
     """
      Connect textures to a subsurface.
@@ -66,70 +187,140 @@ def run_connect_textures(shader: str, textures: dict, sg:str) -> None:
 
      @return None
     """
-    from .mel_helper import (get_attributes_shaders, 
-                             create_texture_file, 
-                             connect_attributes, 
-                             create_bump, 
-                             create_displacement, 
-                             create_color_correct, 
-                             create_range)
-
-    list_attr = get_attributes_shaders(shader, sg)
-    
-    attr_dict = {
-        'diffuse': [
-            'color', 
-            'baseColor', 
-            'diffuseColor'
-                    ],
-        'specular': [
-            'specular', 
-            'specularReflection', 
-            'specularIntensity', 
-            'specularColor', 
-                     ],
-        'roughness': [
-            'roughness', 
-            'specularRoughness'
-            ],
-        'transmission': [
-            'transmission', 
-            'transparent', 
-            # 'transmissionColor',
-            ],
-        'sss': [
-            'subsurface'
-            ],
-        'ssscolor': [
-            'subsurfaceColor'
-            ],
-        'bump': [
-            'normalCamera'
-            ],
-        'displacement': [
-            'displacementShader'
-        ]
-    }
-
-    # Creates a texture file for each texture attribute.
-    for attr, value in textures.items():
-        attr_name = set(list_attr) & set(attr_dict.get(attr))
-        # If attr_name is not set.
-        if not attr_name:
-            continue
-        file_node = create_texture_file(shader, attr, value)
-        # Create the bump and displacement attributes.
-        if attr == 'bump':
-            create_bump(shader, file_node, file_path = value, shader_attr=list(attr_name)[0])
-            continue
-        elif attr == 'displacement':
-            displacement_node = create_displacement(shader, file_node)
-            connect_attributes(displacement_node, 'displacement', sg, '{0}'.format(list(attr_name)[0]))
-            continue
-        # Connect to the shader and color attributes.
-        if re.search('[Cc]olor', list(attr_name)[0]):
-            color_correct_node = create_color_correct(shader, file_node, attr)
-            connect_attributes(color_correct_node, 'outColor', shader, '{0}'.format(list(attr_name)[0]))
-        else:
-            range_node = create_range(shader, file_node, attr)
-            connect_attributes(range_node, 'outColorR', shader, '{0}'.format(list(attr_name)[0]))
\ No newline at end of file
+    from .mel_helper import get_channel_mapping, get_node_type, execute_plan
+    from .network_plan import NetworkPlan, plan_textures
+    from .image_header import probe_headers
+
+    # The channel mapping of each node type is cached for the session.
+    mapping = get_channel_mapping(get_node_type(shader))
+    headers = probe_headers(list(textures.values()))
+    # Plan the whole texture network first and create it in one pass.
+    plan = NetworkPlan()
+    plan_textures(plan, shader, sg, textures, mapping, headers=headers)
+    execute_plan(plan)
+
+def run_upgrade_versions(dry_run: bool = False) -> str:
+    """
+     Move every file node created by the tool to the latest version of its texture.
+     
+     @param dry_run - True to only report what would change.
+     
+     @return Report of the changes.
+    """
+    from .version_upgrade import upgrade_texture_versions, format_version_changes
+    changes = upgrade_texture_versions(dry_run=dry_run)
+    return format_version_changes(changes, dry_run)
+
+def run_compact_materials(dry_run: bool = False) -> str:
+    """
+     Remove the color correct and range nodes left at their default values in the materials created by the tool.
+     
+     @param dry_run - True to only report what would be removed.
+     
+     @return Report of the nodes and connections removed for each material.
+    """
+    from .graph_optimizer import compact_materials, format_compaction
+    reports = compact_materials(dry_run=dry_run)
+    return format_compaction(reports, dry_run)
+
+def run_convert_textures(paths: list[str], settings=None, repoint: bool = False, nodes: list[str]|None = None) -> str:
+    """
+     Convert textures to tiled mipmaps, skipping the ones already converted with the same settings.
+     
+     @param paths - Texture paths, UDIM paths are converted tile by tile.
+     @param settings - texture_convert.ConverterSettings. Defaults to maketx.
+     @param repoint - True to point the file nodes created by the tool at the converted textures.
+     @param nodes - File nodes to repoint. None for every file node created by the tool.
+     
+     @return Report with the time of each file and the bytes saved.
+    """
+    from .texture_convert import ConverterSettings, convert_textures, converted_paths, repoint_file_nodes, format_conversion
+    settings = settings or ConverterSettings()
+    results = convert_textures(paths, settings)
+    report = format_conversion(results)
+    if repoint:
+        changes = repoint_file_nodes(converted_paths(paths, results, settings.extension), nodes)
+        report = '{0}\n{1} file nodes pointed at the converted textures'.format(report, len(changes))
+    return report
+
+def run_build_proxies(settings=None, switch: bool = False, background: bool = False, callback=None) -> str:
+    """
+     Make the viewport proxies of the textures of the file nodes created by the tool and save both paths on the nodes.
+
+     @param settings - texture_proxy.ProxySettings. Defaults to 1024 pixels.
+     @param switch - True to point the file nodes at the proxies afterwards.
+     @param background - True to make the proxies on a background thread and return at once, Maya stays usable.
+     @param callback - Function called with the report on the main thread when the proxies are done.
+
+     @return Report with the time of each file, or the number of nodes queued in the background.
+    """
+    from .texture_proxy import build_proxies, build_proxies_in_background, switch_resolution, format_proxies
+
+    def finished(results, nodes):
+        report = '{0}\n{1} file nodes have a proxy'.format(format_proxies(results), len(nodes))
+        if switch:
+            changes, _ = switch_resolution(True, nodes)
+            report = '{0}\n{1} file nodes switched to their proxy'.format(report, len(changes))
+        if callback is not None:
+            callback(report)
+        return report
+
+    if background:
+        from .mel_helper import find_tagged_nodes
+        nodes = find_tagged_nodes('file')
+        build_proxies_in_background(settings, nodes, finished)
+        return '{} file nodes queued, their proxies are made in the background'.format(len(nodes))
+    return finished(*build_proxies(settings))
+
+def run_switch_proxies(proxy: bool) -> str:
+    """
+     Point every file node created by the tool at its proxy or back at its full resolution texture.
+
+     @param proxy - True for the proxies, False for the full resolution textures.
+
+     @return Report of the nodes switched and skipped.
+    """
+    from .texture_proxy import switch_resolution
+    changes, skipped = switch_resolution(proxy)
+    report = '{0} file nodes switched to {1}'.format(len(changes), 'their proxy' if proxy else 'full resolution')
+    if skipped:
+        report = '{0}\n{1} file nodes without an up to date proxy, build the proxies again: {2}'.format(report, len(skipped), ', '.join(skipped))
+    return report
+
+def run_assign_rules(rules: list, preview: bool = False) -> str:
+    """
+     Assign materials to the meshes of the scene by naming rules, for example rock_A to every shape under *rock_A*_GEO.
+     
+     @param rules - List of assignment_rules.AssignmentRule or dictionaries with material, pattern, kind and priority.
+     @param preview - True to only report how many shapes each rule matches.
+     
+     @return Report of the matches of each rule and the assignments.
+    """
+    from .assignment_rules import AssignmentRule, rules_from_dicts, apply_rules, format_rules
+    rules = [rule if isinstance(rule, AssignmentRule) else rules_from_dicts([rule])[0] for rule in rules]
+    previews, reports, missing = apply_rules(rules, preview=preview)
+    return format_rules(previews, reports, missing)
+
+def run_export_materials(path: str, materials: list[str]|None = None) -> str:
+    """
+     Save the networks of the materials to a manifest, so they can be rebuilt in another scene without the texture folders.
+     
+     @param path - JSON Lines file to write.
+     @param materials - Materials to save. None for every material created by the tool.
+     
+     @return Report of the export.
+    """
+    from .material_manifest import export_materials
+    return '{0} materials saved to {1}'.format(export_materials(path, materials), path)
+
+def run_import_materials(path: str, revalidate: bool = False) -> str:
+    """
+     Rebuild the materials of a manifest saved by run_export_materials.
+     
+     @param path - JSON Lines file to read.
+     @param revalidate - True to skip the materials whose textures changed since the export.
+     
+     @return Report of the import.
+    """
+    from .material_manifest import import_materials, format_import
+    return format_import(import_materials(path, revalidate))
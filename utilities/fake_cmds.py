@@ -0,0 +1,550 @@
+from __future__ import annotations
+from fnmatch import fnmatchcase
+import os
+import re
+
+# Component names of meshes and surfaces, for example f[0:3] or sf[1][2]
+COMPONENT_PATTERN = re.compile(r'(f|sf|vtx|e|cv|map)\[')
+
+def _compound(name: str, default: tuple, children: str = 'RGB') -> dict:
+    """
+     Build the attribute defaults of a compound attribute and its children.
+
+     @param name - Name of the compound attribute.
+     @param default - Default value of each child.
+     @param children - Suffixes of the children, RGB for colors or XYZ for vectors.
+
+     @return Dictionary of attribute names and default values.
+    """
+    attributes = {name: tuple(default)}
+    for child, value in zip(children, default):
+        attributes['{0}{1}'.format(name, child)] = value
+    return attributes
+
+def _attributes(*tables: dict, **values) -> dict:
+    """
+     Merge attribute tables into one.
+
+     @return Dictionary of attribute names and default values.
+    """
+    attributes = {'message': None, 'caching': False, 'frozen': False, 'isHistoricallyInteresting': 2, 'nodeState': 0, 'binMembership': None}
+    for table in tables:
+        attributes.update(table)
+    attributes.update(values)
+    return attributes
+
+_SURFACE = _attributes(_compound('outColor', (0.0, 0.0, 0.0)), _compound('outTransparency', (0.0, 0.0, 0.0)), _compound('normalCamera', (1.0, 1.0, 1.0), 'XYZ'))
+_LAMBERT = _attributes(_SURFACE, _compound('color', (0.5, 0.5, 0.5)), _compound('transparency', (0.0, 0.0, 0.0)), _compound('ambientColor', (0.0, 0.0, 0.0)), _compound('incandescence', (0.0, 0.0, 0.0)), diffuse=0.8, translucence=0.0, translucenceDepth=0.5, translucenceFocus=0.5)
+_REFLECT = _attributes(_LAMBERT, _compound('specularColor', (0.5, 0.5, 0.5)), _compound('reflectedColor', (0.0, 0.0, 0.0)), reflectivity=0.5)
+_STANDARD_SURFACE = _attributes(_SURFACE, _compound('baseColor', (0.8, 0.8, 0.8)), _compound('specularColor', (1.0, 1.0, 1.0)), _compound('transmissionColor', (1.0, 1.0, 1.0)), _compound('subsurfaceColor', (1.0, 1.0, 1.0)), _compound('emissionColor', (1.0, 1.0, 1.0)), _compound('opacity', (1.0, 1.0, 1.0)), base=0.8, diffuseRoughness=0.0, metalness=0.0, specular=1.0, specularRoughness=0.2, specularIOR=1.5, transmission=0.0, subsurface=0.0, subsurfaceScale=1.0, coat=0.0, coatRoughness=0.1, sheen=0.0, emission=0.0, thinWalled=False)
+_PLACEMENT = _attributes(_compound('coverage', (1.0, 1.0), 'UV'), _compound('translateFrame', (0.0, 0.0), 'UV'), _compound('repeatUV', (1.0, 1.0), 'UV'), _compound('offset', (0.0, 0.0), 'UV'), _compound('noiseUV', (0.0, 0.0), 'UV'), _compound('vertexUvOne', (0.0, 0.0), 'UV'), _compound('vertexUvTwo', (0.0, 0.0), 'UV'), _compound('vertexUvThree', (0.0, 0.0), 'UV'), _compound('vertexCameraOne', (0.0, 0.0, 0.0), 'XYZ'), rotateFrame=0.0, mirrorU=False, mirrorV=False, stagger=False, wrapU=True, wrapV=True, rotateUV=0.0)
+_DAG = _attributes(visibility=True, intermediateObject=False, instObjGroups=None)
+
+NODE_TYPES = {
+    'lambert': ('shader/surface', _LAMBERT),
+    'blinn': ('shader/surface', _attributes(_REFLECT, eccentricity=0.3, specularRollOff=0.7)),
+    'phong': ('shader/surface', _attributes(_REFLECT, cosinePower=20.0)),
+    'layeredShader': ('shader/surface', _attributes(_SURFACE, _compound('color', (0.0, 0.0, 0.0)), _compound('transparency', (0.0, 0.0, 0.0)))),
+    'rampShader': ('shader/surface', _attributes(_SURFACE, _compound('color', (0.5, 0.5, 0.5)), _compound('specularColor', (0.5, 0.5, 0.5)), diffuse=0.8, specularity=1.0)),
+    'surfaceShader': ('shader/surface', _attributes(_SURFACE, _compound('outMatteOpacity', (1.0, 1.0, 1.0)))),
+    'aiStandardSurface': ('rendernode/arnold/shader/surface:shader/surface', _STANDARD_SURFACE),
+    'aiStandardHair': ('rendernode/arnold/shader/surface:shader/surface', _attributes(_SURFACE, _compound('baseColor', (1.0, 1.0, 1.0)), _compound('specularTint', (1.0, 1.0, 1.0)), base=1.0, melanin=1.0, specular=1.0, roughness=0.2)),
+    'aiLambert': ('rendernode/arnold/shader/surface:shader/surface', _attributes(_SURFACE, _compound('color', (1.0, 1.0, 1.0)), Kd=0.8)),
+    'aiCarPaint': ('rendernode/arnold/shader/surface:shader/surface', _attributes(_SURFACE, _compound('baseColor', (1.0, 1.0, 1.0)), _compound('specularColor', (1.0, 1.0, 1.0)), base=0.8, specular=1.0, specularRoughness=0.05, coat=1.0)),
+    'aiToon': ('rendernode/arnold/shader/surface:shader/surface', _attributes(_SURFACE, _compound('baseColor', (1.0, 1.0, 1.0)), _compound('specularColor', (1.0, 1.0, 1.0)), _compound('transmissionColor', (1.0, 1.0, 1.0)), base=1.0, specular=0.0, specularRoughness=0.1, transmission=0.0)),
+    'aiMatte': ('rendernode/arnold/shader/surface:shader/surface', _attributes(_SURFACE, _compound('color', (0.0, 0.0, 0.0)))),
+    'aiShadowMatte': ('rendernode/arnold/shader/surface:shader/surface', _SURFACE),
+    'aiAmbientOcclusion': ('rendernode/arnold/shader/surface:shader/surface', _SURFACE),
+    'aiMixShader': ('rendernode/arnold/shader/surface:shader/surface', _attributes(_SURFACE, mix=0.5)),
+    'aiTwoSided': ('rendernode/arnold/shader/surface:shader/surface', _SURFACE),
+    'aiLayeredTexture': ('rendernode/arnold/shader/surface:shader/surface', _SURFACE),
+    'aiAtmosphereVolume': ('rendernode/arnold/shader/volume:shader/volume', _attributes(_compound('outColor', (0.0, 0.0, 0.0)), density=0.0)),
+    'volumeFog': ('shader/volume', _attributes(_compound('outColor', (0.0, 0.0, 0.0)), density=1.0)),
+    'file': ('texture/2d', _attributes(_PLACEMENT, _compound('outColor', (0.5, 0.5, 0.5)), _compound('uvCoord', (0.0, 0.0), 'UV'), _compound('uvFilterSize', (0.0, 0.0), 'XY'), fileTextureName='', uvTilingMode=0, colorSpace='sRGB', ignoreColorSpaceFileRules=False, alphaIsLuminance=False, outAlpha=1.0)),
+    'place2dTexture': ('utility/general/placement', _attributes(_PLACEMENT, _compound('outUV', (0.0, 0.0), 'UV'), _compound('outUvFilterSize', (0.0, 0.0), 'XY'))),
+    'colorCorrect': ('utility/color', _attributes(_compound('inColor', (0.0, 0.0, 0.0)), _compound('outColor', (0.0, 0.0, 0.0)), _compound('colGain', (1.0, 1.0, 1.0)), _compound('colOffset', (0.0, 0.0, 0.0)), inAlpha=0.0, outAlpha=0.0, hueShift=0.0, satGain=1.0, valGain=1.0, alphaGain=1.0, alphaOffset=0.0, alphaGamma=1.0, colGamma=(1.0, 1.0, 1.0), colClamp=False, alphaClamp=False, unpremultiply=False, premultiplyResult=False)),
+    'aiColorCorrect': ('rendernode/arnold/utility/color:utility/color', _attributes(_compound('input', (0.0, 0.0, 0.0)), _compound('outColor', (0.0, 0.0, 0.0)), _compound('multiply', (1.0, 1.0, 1.0)), _compound('add', (0.0, 0.0, 0.0)), gamma=1.0, hueShift=0.0, saturation=1.0, contrast=1.0, contrastPivot=0.18, exposure=0.0, invert=False, alphaIsLuminance=False, alphaMultiply=1.0, alphaAdd=0.0, invertAlpha=False, outAlpha=0.0)),
+    'aiRange': ('rendernode/arnold/utility/color:utility/color', _attributes(_compound('input', (0.0, 0.0, 0.0)), _compound('outColor', (0.0, 0.0, 0.0)), inputMin=0.0, inputMax=1.0, outputMin=0.0, outputMax=1.0, smoothstep=False, contrast=1.0, contrastPivot=0.5, bias=0.5, gain=0.5)),
+    'bump2d': ('utility/general', _attributes(_compound('outNormal', (0.0, 0.0, 0.0), 'XYZ'), bumpValue=0.0, bumpDepth=1.0, bumpInterp=0)),
+    'aiBump2d': ('rendernode/arnold/utility/bump:utility/general', _attributes(_compound('outValue', (0.0, 0.0, 0.0), 'XYZ'), bumpMap=0.0, bumpHeight=1.0)),
+    'aiNormalMap': ('rendernode/arnold/utility/bump:utility/general', _attributes(_compound('input', (0.0, 0.0, 0.0), 'XYZ'), _compound('outValue', (0.0, 0.0, 0.0), 'XYZ'), strength=1.0, invertX=False, invertY=False)),
+    'displacementShader': ('shader/displacement', _attributes(displacement=0.0, scale=1.0, aiDisplacementZeroValue=0.0)),
+    'setRange': ('utility/general', _attributes(_compound('value', (0.0, 0.0, 0.0), 'XYZ'), _compound('min', (0.0, 0.0, 0.0), 'XYZ'), _compound('max', (0.0, 0.0, 0.0), 'XYZ'), _compound('oldMin', (0.0, 0.0, 0.0), 'XYZ'), _compound('oldMax', (0.0, 0.0, 0.0), 'XYZ'), _compound('outValue', (0.0, 0.0, 0.0), 'XYZ'))),
+    'shadingEngine': ('', _attributes(surfaceShader=None, displacementShader=None, volumeShader=None, dagSetMembers=None, memberWireframeColor=-1)),
+    'transform': ('', _DAG),
+    'mesh': ('', _DAG),
+    'nurbsSurface': ('', _DAG),
+    'nurbsCurve': ('', _DAG),
+    'locator': ('', _DAG),
+}
+
+_PLACEMENT_CONNECTIONS = [
+    ('coverage', 'coverage'), ('translateFrame', 'translateFrame'), ('rotateFrame', 'rotateFrame'),
+    ('mirrorU', 'mirrorU'), ('mirrorV', 'mirrorV'), ('stagger', 'stagger'), ('wrapU', 'wrapU'),
+    ('wrapV', 'wrapV'), ('repeatUV', 'repeatUV'), ('offset', 'offset'), ('rotateUV', 'rotateUV'),
+    ('noiseUV', 'noiseUV'), ('vertexUvOne', 'vertexUvOne'), ('vertexUvTwo', 'vertexUvTwo'),
+    ('vertexUvThree', 'vertexUvThree'), ('vertexCameraOne', 'vertexCameraOne'),
+    ('outUV', 'uvCoord'), ('outUvFilterSize', 'uvFilterSize'),
+]
+
+class FakeNode(object):
+    """
+     A node of the fake scene.
+
+     @param name - Name of the node.
+     @param node_type - Type of the node.
+     @param parent - Name of the parent transform for DAG nodes.
+    """
+    def __init__(self, name: str, node_type: str, parent: str|None = None):
+        self.name = name
+        self.node_type = node_type
+        self.parent = parent
+        self.values = dict()
+        self.extra_attributes = dict()
+        self.members = list()
+
+class FakeCmds(object):
+    """
+     In-memory stand in for maya.cmds. It keeps a graph of nodes, attribute values and connections
+     so the tool can run, be tested and benchmarked without Maya.
+     Give it to maya_backend.set_backend to use it.
+
+     @param node_types - Extra node types as a dictionary of type names and (classification, attributes) tuples.
+    """
+    def __init__(self, node_types: dict|None = None):
+        self.node_types = dict(NODE_TYPES)
+        if node_types:
+            self.node_types.update(node_types)
+        self.nodes = dict()
+        self.connections = dict()
+        # Destination plugs of the connections of each node, so a node never looks through the whole scene
+        self.node_plugs = dict()
+        self.selection = list()
+        self.calls = dict()
+        self.undo_chunks = 0
+        self.undo_depth = 0
+        self.undo_state = True
+        self.file_dialog_result = None
+        self.plugins = dict()
+        self.loaded_plugins = dict()
+        self.plugin_callbacks = list()
+
+    def _count(self, command: str) -> None:
+        self.calls[command] = self.calls.get(command, 0) + 1
+
+    def reset_calls(self) -> None:
+        """
+         Reset the counter of commands called.
+        """
+        self.calls.clear()
+
+    def _unique_name(self, name: str) -> str:
+        if name not in self.nodes:
+            return name
+        base = name.rstrip('0123456789') or name
+        index = 1
+        while '{0}{1}'.format(base, index) in self.nodes:
+            index += 1
+        return '{0}{1}'.format(base, index)
+
+    def _node(self, name: str) -> FakeNode:
+        node = self.nodes.get(name.rsplit('|', 1)[-1])
+        if node is None:
+            raise ValueError('No object matches name: {}'.format(name))
+        return node
+
+    def _create(self, node_type: str, name: str|None = None, parent: str|None = None) -> str:
+        if node_type not in self.node_types:
+            raise RuntimeError('Unknown object type: {}'.format(node_type))
+        name = self._unique_name(name or '{}1'.format(node_type))
+        self.nodes[name] = FakeNode(name, node_type, parent)
+        return name
+
+    def _split_plug(self, plug: str) -> tuple:
+        node_name, attr = plug.split('.', 1)
+        node = self._node(node_name)
+        attr_root = re.split(r'[\[\.]', attr)[0]
+        if attr_root not in self.node_types[node.node_type][1] and attr_root not in node.extra_attributes:
+            raise RuntimeError('No object matches name: {}'.format(plug))
+        return node, attr
+
+    def _link(self, destination: str, source: str) -> None:
+        self._unlink(destination)
+        self.connections[destination] = source
+        for plug in (destination, source):
+            self.node_plugs.setdefault(plug.split('.', 1)[0], dict())[destination] = None
+
+    def _unlink(self, destination: str) -> None:
+        source = self.connections.pop(destination, None)
+        if source is None:
+            return
+        for plug in (destination, source):
+            self.node_plugs.get(plug.split('.', 1)[0], dict()).pop(destination, None)
+
+    def _long_name(self, name: str) -> str:
+        path = list()
+        node = self.nodes.get(name)
+        while node is not None:
+            path.insert(0, node.name)
+            node = self.nodes.get(node.parent) if node.parent else None
+        return '|{}'.format('|'.join(path))
+
+    def _match(self, pattern: str) -> list[str]:
+        pattern = pattern.rsplit('|', 1)[-1]
+        # Plain names are looked up, only wildcards go through every node
+        if not any(character in pattern for character in '*?['):
+            return [pattern] if pattern in self.nodes else list()
+        return [name for name in self.nodes if fnmatchcase(name, pattern)]
+
+    def _children(self, name: str) -> list[str]:
+        return [node.name for node in self.nodes.values() if node.parent == name]
+
+    # Node creation and deletion
+
+    def createNode(self, node_type: str, name: str|None = None, parent: str|None = None, **flags) -> str:
+        self._count('createNode')
+        if parent is not None:
+            self._node(parent)
+        return self._create(node_type, name, parent)
+
+    def shadingNode(self, node_type: str, name: str|None = None, asShader: bool = False, asTexture: bool = False, asUtility: bool = False, asLight: bool = False, **flags) -> str:
+        self._count('shadingNode')
+        if not (asShader or asTexture or asUtility or asLight):
+            raise RuntimeError('shadingNode needs a category flag')
+        return self._create(node_type, name)
+
+    def delete(self, *names, **flags) -> None:
+        self._count('delete')
+        names = [name for item in names for name in ([item] if isinstance(item, str) else item)]
+        for name in names:
+            node = self._node(name)
+            for child in self._children(node.name):
+                self.delete(child)
+            del self.nodes[node.name]
+            for destination in list(self.node_plugs.pop(node.name, dict())):
+                self._unlink(destination)
+            for other in self.nodes.values():
+                if node.name in other.members:
+                    other.members.remove(node.name)
+            if node.name in self.selection:
+                self.selection.remove(node.name)
+
+    def duplicate(self, *names, upstreamNodes: bool = False, **flags) -> list[str]:
+        self._count('duplicate')
+        names = [name for item in names for name in ([item] if isinstance(item, str) else item)]
+        originals = [self._node(name).name for name in names]
+        # The nodes feeding the duplicated nodes are duplicated with them
+        if upstreamNodes or flags.get('un', False):
+            index = 0
+            while index < len(originals):
+                for destination in self.node_plugs.get(originals[index], dict()):
+                    source_node = self.connections[destination].split('.', 1)[0]
+                    if destination.split('.', 1)[0] == originals[index] and source_node not in originals:
+                        originals.append(source_node)
+                index += 1
+        copies = dict()
+        for name in originals:
+            node = self.nodes[name]
+            copies[name] = self._create(node.node_type, name, node.parent)
+            copy = self.nodes[copies[name]]
+            copy.values = dict(node.values)
+            copy.extra_attributes = dict(node.extra_attributes)
+        for name in originals:
+            for destination in list(self.node_plugs.get(name, dict())):
+                source = self.connections[destination]
+                if destination.split('.', 1)[0] == name and source.split('.', 1)[0] in copies:
+                    self._link(self._rename_plug(destination, name, copies[name]), self._rename_plug(source, source.split('.', 1)[0], copies[source.split('.', 1)[0]]))
+        return [copies[name] for name in originals]
+
+    def rename(self, name: str, new_name: str) -> str:
+        self._count('rename')
+        node = self._node(name)
+        new_name = self._unique_name(new_name)
+        del self.nodes[node.name]
+        renamed = dict()
+        for destination in self.node_plugs.pop(node.name, dict()):
+            source = self.connections.pop(destination)
+            new_destination = self._rename_plug(destination, node.name, new_name)
+            self.connections[new_destination] = self._rename_plug(source, node.name, new_name)
+            renamed[new_destination] = None
+            # The node at the other end keeps the new plug
+            for plug in (destination, source):
+                other = plug.split('.', 1)[0]
+                if other != node.name:
+                    self.node_plugs[other].pop(destination, None)
+                    self.node_plugs[other][new_destination] = None
+        self.node_plugs[new_name] = renamed
+        # Only DAG nodes have children and belong to sets
+        if 'intermediateObject' in self.node_types[node.node_type][1]:
+            for other in self.nodes.values():
+                if other.parent == node.name:
+                    other.parent = new_name
+                other.members = [new_name if member == node.name else member for member in other.members]
+        node.name = new_name
+        self.nodes[new_name] = node
+        return new_name
+
+    @staticmethod
+    def _rename_plug(plug: str, old_name: str, new_name: str) -> str:
+        node_name, attr = plug.split('.', 1)
+        return '{0}.{1}'.format(new_name, attr) if node_name == old_name else plug
+
+    def objExists(self, name: str) -> bool:
+        self._count('objExists')
+        if '.' in name:
+            try:
+                self._split_plug(name)
+            except (ValueError, RuntimeError):
+                return False
+            return True
+        return name.rsplit('|', 1)[-1] in self.nodes
+
+    def nodeType(self, name: str, **flags) -> str:
+        self._count('nodeType')
+        return self._node(name.split('.', 1)[0]).node_type
+
+    def listNodeTypes(self, classification: str, ex: str|None = None, **flags) -> list[str]:
+        self._count('listNodeTypes')
+        node_types = list()
+        for node_type, (classifications, _) in self.node_types.items():
+            classifications = classifications.split(':') if classifications else list()
+            if not any(found.startswith(classification) for found in classifications):
+                continue
+            if ex and any(ex in found for found in classifications):
+                continue
+            node_types.append(node_type)
+        return node_types
+
+    # Sets
+
+    def sets(self, *objects, name: str|None = None, empty: bool = False, renderable: bool = False, noSurfaceShader: bool = False, forceElement: str|None = None, **flags):
+        self._count('sets')
+        members = [member for item in objects for member in ([item] if isinstance(item, str) else item)]
+        if forceElement:
+            sg = self._node(forceElement)
+            for member in members:
+                self._node(member.split('.', 1)[0])
+            # A member belongs to one shading engine, it leaves the others
+            moved = set(members)
+            for other in self.nodes.values():
+                if other.node_type == 'shadingEngine' and other is not sg and other.members:
+                    other.members = [member for member in other.members if member not in moved]
+            current = set(sg.members)
+            sg.members.extend(member for member in members if member not in current)
+            return None
+        node_type = 'shadingEngine' if renderable else 'objectSet'
+        if node_type not in self.node_types:
+            self.node_types[node_type] = ('', _attributes())
+        set_name = self._create(node_type, name or '{}1'.format('set' if node_type == 'objectSet' else node_type))
+        if not empty:
+            self.nodes[set_name].members.extend(members)
+        return set_name
+
+    # Attributes
+
+    def listAttr(self, name: str, **flags) -> list[str]:
+        self._count('listAttr')
+        node = self._node(name)
+        return list(self.node_types[node.node_type][1]) + list(node.extra_attributes)
+
+    def attributeQuery(self, attr: str, node: str|None = None, type: str|None = None, exists: bool = False, **flags):
+        self._count('attributeQuery')
+        if node is not None:
+            fake_node = self._node(node)
+            return attr in self.node_types[fake_node.node_type][1] or attr in fake_node.extra_attributes
+        return attr in self.node_types.get(type, ('', dict()))[1]
+
+    def addAttr(self, name: str, longName: str|None = None, dataType: str|None = None, attributeType: str|None = None, defaultValue=None, **flags) -> None:
+        self._count('addAttr')
+        node = self._node(name)
+        if longName in node.extra_attributes or longName in self.node_types[node.node_type][1]:
+            raise RuntimeError('Found an attribute with the same name: {0}.{1}'.format(name, longName))
+        node.extra_attributes[longName] = '' if dataType == 'string' else defaultValue
+
+    def setAttr(self, plug: str, *values, type: str|None = None, **flags) -> None:
+        self._count('setAttr')
+        node, attr = self._split_plug(plug)
+        if plug in self.connections:
+            raise RuntimeError('The attribute {} is locked or connected and cannot be modified.'.format(plug))
+        node.values[attr] = values[0] if len(values) == 1 else tuple(values)
+
+    def getAttr(self, plug: str, **flags):
+        self._count('getAttr')
+        node, attr = self._split_plug(plug)
+        if attr in node.values:
+            return node.values[attr]
+        if attr in node.extra_attributes:
+            return node.extra_attributes[attr]
+        return self.node_types[node.node_type][1].get(attr)
+
+    # Connections
+
+    def connectAttr(self, source: str, destination: str, force: bool = False, **flags) -> None:
+        self._count('connectAttr')
+        self._split_plug(source)
+        self._split_plug(destination)
+        if destination in self.connections and not force:
+            raise RuntimeError('{0} is already connected to {1}'.format(self.connections[destination], destination))
+        self._link(destination, source)
+
+    def disconnectAttr(self, source: str, destination: str, **flags) -> None:
+        self._count('disconnectAttr')
+        if self.connections.get(destination) != source:
+            raise RuntimeError('There is no connection from {0} to {1} to disconnect'.format(source, destination))
+        self._unlink(destination)
+
+    def defaultNavigation(self, connectToExisting: bool = False, source: str|None = None, destination: str|None = None, **flags) -> None:
+        self._count('defaultNavigation')
+        for out_attr, in_attr in _PLACEMENT_CONNECTIONS:
+            self._link('{0}.{1}'.format(destination, in_attr), '{0}.{1}'.format(source, out_attr))
+
+    def listConnections(self, name: str, source: bool = True, destination: bool = True, plugs: bool = False, connections: bool = False, type: str|None = None, **flags) -> list[str]:
+        self._count('listConnections')
+        found = list()
+        node_name = name.split('.', 1)[0]
+        is_plug = '.' in name
+        for in_plug in list(self.node_plugs.get(node_name, dict())):
+            out_plug = self.connections[in_plug]
+            pairs = list()
+            if source and (in_plug == name if is_plug else in_plug.split('.', 1)[0] == node_name):
+                pairs.append((in_plug, out_plug))
+            if destination and (out_plug == name if is_plug else out_plug.split('.', 1)[0] == node_name):
+                pairs.append((out_plug, in_plug))
+            for own_plug, other_plug in pairs:
+                if type and self.nodes[other_plug.split('.', 1)[0]].node_type != type:
+                    continue
+                if connections:
+                    found.append(own_plug)
+                found.append(other_plug if plugs else other_plug.split('.', 1)[0])
+        return found
+
+    # Scene queries
+
+    def select(self, *names, clear: bool = False, add: bool = False, **flags) -> None:
+        self._count('select')
+        names = [name for item in names for name in ([item] if isinstance(item, str) else item)]
+        if clear or not add:
+            self.selection = list()
+        for name in names:
+            self._node(name.split('.', 1)[0])
+            self.selection.append(name)
+
+    def ls(self, *names, selection: bool = False, dag: bool = False, type=None, noIntermediate: bool = False, long: bool = False, objectsOnly: bool = False, **flags) -> list[str]:
+        self._count('ls')
+        selection = selection or flags.get('sl', False)
+        noIntermediate = noIntermediate or flags.get('ni', False)
+        long = long or flags.get('l', False)
+        objectsOnly = objectsOnly or flags.get('o', False)
+        type = type or flags.get('typ')
+        patterns = [name for item in names for name in ([item] if isinstance(item, str) else item)]
+        if selection:
+            patterns = list(self.selection)
+        if patterns or selection:
+            found = list()
+            for pattern in patterns:
+                if '.' in pattern:
+                    node_pattern, attr = pattern.split('.', 1)
+                    # Components like pCube1.f[0:3] exist on every mesh or surface
+                    if COMPONENT_PATTERN.match(attr):
+                        found.extend(name if objectsOnly else '{0}.{1}'.format(name, attr) for name in self._match(node_pattern))
+                        continue
+                    attr_root = re.split(r'[\[\.]', attr)[0]
+                    for name in self._match(node_pattern):
+                        node = self.nodes[name]
+                        if attr_root in self.node_types[node.node_type][1] or attr_root in node.extra_attributes:
+                            found.append(name if objectsOnly else '{0}.{1}'.format(name, attr))
+                    continue
+                found.extend(self._match(pattern))
+        else:
+            found = list(self.nodes)
+        if dag:
+            children = dict()
+            for node in self.nodes.values():
+                if node.parent:
+                    children.setdefault(node.parent, list()).append(node.name)
+            expanded = dict()
+            stack = list(reversed(found))
+            while stack:
+                name = stack.pop()
+                if name in expanded:
+                    continue
+                expanded[name] = None
+                if '.' not in name:
+                    stack.extend(reversed(children.get(name, list())))
+            found = list(expanded)
+        if type:
+            node_types = [type] if isinstance(type, str) else list(type)
+            found = [name for name in found if self.nodes[name.split('.', 1)[0]].node_type in node_types]
+        if noIntermediate:
+            found = [name for name in found if not self.nodes[name.split('.', 1)[0]].values.get('intermediateObject')]
+        unique = list(dict.fromkeys(found))
+        if long:
+            unique = [self._long_name(name) if '.' not in name else '{0}.{1}'.format(self._long_name(name.split('.', 1)[0]), name.split('.', 1)[1]) for name in unique]
+        return unique
+
+    # Plugins
+
+    def register_plugin(self, name: str, node_types: dict) -> None:
+        """
+         Make a plugin available to loadPlugin.
+
+         @param name - Name of the plugin.
+         @param node_types - Node types of the plugin as a dictionary of type names and (classification, attributes) tuples.
+        """
+        self.plugins[name] = dict(node_types)
+
+    def loadPlugin(self, name: str, quiet: bool = False, **flags) -> list[str]:
+        self._count('loadPlugin')
+        if name not in self.plugins:
+            raise RuntimeError('Plug-in, "{}", was not found on MAYA_PLUG_IN_PATH.'.format(name))
+        if name not in self.loaded_plugins:
+            self.loaded_plugins[name] = self.plugins[name]
+            self.node_types.update(self.plugins[name])
+            for callback in list(self.plugin_callbacks):
+                callback([name, name])
+        return [name]
+
+    def unloadPlugin(self, name: str, force: bool = False, **flags) -> list[str]:
+        self._count('unloadPlugin')
+        node_types = self.loaded_plugins.pop(name)
+        for node_type in node_types:
+            self.node_types.pop(node_type, None)
+        for callback in list(self.plugin_callbacks):
+            callback([name, name])
+        return [name]
+
+    def pluginInfo(self, name: str, query: bool = False, loaded: bool = False, **flags):
+        self._count('pluginInfo')
+        return name in self.loaded_plugins
+
+    # Undo and dialogs
+
+    def memory(self, heapMemory: bool = False, megaByte: bool = False, **flags) -> float:
+        self._count('memory')
+        # The resident memory of the process stands in for the heap of Maya
+        try:
+            with open('/proc/self/statm') as statm:
+                used = int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError, AttributeError):
+            used = 0
+        return used / (1024.0 * 1024.0) if megaByte else float(used)
+
+    def undoInfo(self, openChunk: bool = False, closeChunk: bool = False, chunkName: str|None = None, state: bool|None = None, stateWithoutFlush: bool|None = None, query: bool = False, **flags):
+        self._count('undoInfo')
+        if query:
+            return self.undo_state
+        if openChunk:
+            self.undo_depth += 1
+            if self.undo_depth == 1:
+                self.undo_chunks += 1
+        if closeChunk:
+            self.undo_depth = max(0, self.undo_depth - 1)
+        if state is not None:
+            self.undo_state = state
+        if stateWithoutFlush is not None:
+            self.undo_state = stateWithoutFlush
+        return None
+
+    def fileDialog2(self, **flags):
+        self._count('fileDialog2')
+        return self.file_dialog_result
@@ -0,0 +1,88 @@
+from __future__ import annotations
+import os
+
+_FILE_NODE_INDEX = dict()
+
+def file_node_key(file_path: str, udim_mode: int|None, colorspace: str|None) -> tuple:
+    """
+     Key of a file node: two nodes with the same key read the same texture the same way.
+
+     @param file_path - fileTextureName of the node.
+     @param udim_mode - uvTilingMode of the node.
+     @param colorspace - colorSpace of the node.
+
+     @return Tuple with the normalized path, the UDIM mode and the colorspace.
+    """
+    return os.path.normcase(os.path.normpath(file_path)).replace('\\', '/'), int(udim_mode or 0), colorspace or str()
+
+class FileNodeIndex(object):
+    """
+     Index of the file nodes created by the tool, keyed by file_node_key. It is filled from the scene with one query
+     the first time it is used and kept up to date with the nodes the tool creates. A node is checked in the scene
+     before it is reused, so deleted or repointed nodes are dropped.
+    """
+    def __init__(self):
+        self.nodes = None
+
+    def _load(self) -> None:
+        from .mel_helper import cmds, find_tagged_nodes
+        nodes = dict()
+        for node in find_tagged_nodes('file'):
+            key = file_node_key(cmds.getAttr('{}.fileTextureName'.format(node)) or str(), cmds.getAttr('{}.uvTilingMode'.format(node)), cmds.getAttr('{}.colorSpace'.format(node)))
+            nodes.setdefault(key, node)
+        self.nodes = nodes
+
+    def get(self, key: tuple, default=None) -> str|None:
+        """
+         Find a file node to reuse.
+
+         @param key - Key of the node, from file_node_key.
+         @param default - Value returned if there is no node.
+
+         @return Name of the node or default.
+        """
+        from .mel_helper import cmds
+        if self.nodes is None:
+            self._load()
+        node = self.nodes.get(key)
+        if node is None:
+            return default
+        # The node can be deleted or pointed to another texture since it was indexed
+        if not cmds.objExists(node) or file_node_key(cmds.getAttr('{}.fileTextureName'.format(node)) or str(), key[1], key[2])[0] != key[0]:
+            del self.nodes[key]
+            return default
+        return node
+
+    def add(self, key: tuple, node: str) -> None:
+        """
+         Add a file node created by the tool.
+
+         @param key - Key of the node, from file_node_key.
+         @param node - Name of the node.
+
+         @return None
+        """
+        if self.nodes is None:
+            self._load()
+        self.nodes.setdefault(key, node)
+
+    def clear(self) -> None:
+        """
+         Forget every node, the scene is queried again the next time the index is used.
+
+         @return None
+        """
+        self.nodes = None
+
+def get_file_node_index() -> FileNodeIndex:
+    """
+     Get the file node index of the current commands backend.
+
+     @return The FileNodeIndex shared by the session.
+    """
+    from .maya_backend import get_backend
+    backend = get_backend()
+    if _FILE_NODE_INDEX.get('backend') is not backend:
+        _FILE_NODE_INDEX['backend'] = backend
+        _FILE_NODE_INDEX['index'] = FileNodeIndex()
+    return _FILE_NODE_INDEX['index']
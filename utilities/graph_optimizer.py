@@ -0,0 +1,192 @@
+from __future__ import annotations
+from typing import NamedTuple
+
+# Attributes of the utility nodes the tool creates and the values that leave the input untouched
+IDENTITY_ATTRIBUTES = {
+    'colorCorrect': {
+        'colGain': (1.0, 1.0, 1.0),
+        'colOffset': (0.0, 0.0, 0.0),
+        'colGamma': (1.0, 1.0, 1.0),
+        'hueShift': 0.0,
+        'satGain': 1.0,
+        'valGain': 1.0,
+        'alphaGain': 1.0,
+        'alphaOffset': 0.0,
+        'alphaGamma': 1.0,
+        'colClamp': False,
+        'alphaClamp': False,
+        'unpremultiply': False,
+        'premultiplyResult': False,
+    },
+    'aiColorCorrect': {
+        'multiply': (1.0, 1.0, 1.0),
+        'add': (0.0, 0.0, 0.0),
+        'gamma': 1.0,
+        'hueShift': 0.0,
+        'saturation': 1.0,
+        'contrast': 1.0,
+        'exposure': 0.0,
+        'invert': False,
+        'alphaIsLuminance': False,
+        'alphaMultiply': 1.0,
+        'alphaAdd': 0.0,
+        'invertAlpha': False,
+    },
+    'aiRange': {
+        'inputMin': 0.0,
+        'inputMax': 1.0,
+        'outputMin': 0.0,
+        'outputMax': 1.0,
+        'smoothstep': False,
+        'contrast': 1.0,
+        'bias': 0.5,
+        'gain': 0.5,
+    },
+}
+# Attribute of each utility node receiving the texture
+INPUT_ATTRIBUTES = {
+    'colorCorrect': 'inColor',
+    'aiColorCorrect': 'input',
+    'aiRange': 'input',
+}
+
+class CompactionReport(NamedTuple):
+    """
+     Utility nodes removed, or that can be removed, from one material.
+
+     @param material - Name of the material.
+     @param nodes_removed - Number of nodes removed.
+     @param connections_removed - Number of connections removed, the new direct connections are subtracted.
+     @param removed - Names of the removed nodes.
+    """
+    material: str
+    nodes_removed: int
+    connections_removed: int
+    removed: list
+
+def _value(value):
+    # Maya returns compound attributes as a list with one tuple
+    if isinstance(value, list) and len(value) == 1:
+        value = value[0]
+    if isinstance(value, (list, tuple)):
+        return tuple(float(item) for item in value)
+    return float(value)
+
+def is_identity(node: str, node_type: str) -> bool:
+    """
+     Check if a utility node leaves its input untouched: every parameter at its identity value and not connected.
+
+     @param node - Name of the node.
+     @param node_type - Type of the node.
+
+     @return True if the node can be removed without changing the render.
+    """
+    from .mel_helper import cmds
+    identity = IDENTITY_ATTRIBUTES.get(node_type)
+    if identity is None:
+        return False
+    input_attrs = [INPUT_ATTRIBUTES[node_type] + suffix for suffix in ('', 'R', 'G', 'B')]
+    # Only the texture can drive the node
+    inputs = cmds.listConnections(node, source=True, destination=False, connections=True, plugs=True) or list()
+    if any(own_plug.split('.', 1)[1] not in input_attrs for own_plug in inputs[::2]):
+        return False
+    for attr, expected in identity.items():
+        current = _value(cmds.getAttr('{0}.{1}'.format(node, attr)))
+        expected = _value(expected)
+        if isinstance(expected, tuple):
+            if any(abs(current_item - expected_item) > 1e-6 for current_item, expected_item in zip(current, expected)):
+                return False
+        elif abs(current - expected) > 1e-6:
+            return False
+    return True
+
+def _direct_plug(source_plug: str, output_attr: str) -> str|None:
+    """
+     Find the plug of the texture that gives the same value as the output of the utility node.
+    """
+    source_node, source_attr = source_plug.split('.', 1)
+    if output_attr == 'outColor':
+        return source_plug
+    # A single channel of the output comes from the same channel of the texture
+    if output_attr.startswith('outColor') and source_attr == 'outColor':
+        return '{0}.{1}'.format(source_node, output_attr)
+    return None
+
+def compact_material(material: str, dry_run: bool = False) -> CompactionReport:
+    """
+     Remove the identity utility nodes between the textures and a material, connecting the textures straight to it.
+
+     @param material - Name of the material.
+     @param dry_run - True to only report what would be removed.
+
+     @return CompactionReport of the material.
+    """
+    from .mel_helper import cmds
+    removed = list()
+    connections_removed = 0
+    rewires = list()
+    inputs = cmds.listConnections(material, source=True, destination=False, connections=True, plugs=True) or list()
+    for material_plug, utility_plug in zip(inputs[::2], inputs[1::2]):
+        utility, output_attr = utility_plug.split('.', 1)
+        node_type = cmds.nodeType(utility)
+        if node_type not in IDENTITY_ATTRIBUTES or utility in removed:
+            continue
+        # The node must only feed this material plug, the message connections of Maya lists don't count
+        outputs = cmds.listConnections(utility, source=False, destination=True, connections=True, plugs=True) or list()
+        if [plug for own_plug, plug in zip(outputs[::2], outputs[1::2]) if not own_plug.endswith('.message')] != [material_plug]:
+            continue
+        texture = cmds.listConnections('{0}.{1}'.format(utility, INPUT_ATTRIBUTES[node_type]), source=True, destination=False, plugs=True) or list()
+        if len(texture) != 1 or not is_identity(utility, node_type):
+            continue
+        direct_plug = _direct_plug(texture[0], output_attr)
+        if direct_plug is None:
+            continue
+        rewires.append((direct_plug, material_plug, utility))
+        removed.append(utility)
+        # Every connection of the node goes away and one direct connection is made
+        all_connections = cmds.listConnections(utility, connections=True, plugs=True) or list()
+        connections_removed += len(all_connections) // 2 - 1
+    if rewires and not dry_run:
+        cmds.undoInfo(openChunk=True, chunkName='ShaderCreatorCompact')
+        try:
+            for direct_plug, material_plug, utility in rewires:
+                cmds.connectAttr(direct_plug, material_plug, force=True)
+                cmds.delete(utility)
+        finally:
+            cmds.undoInfo(closeChunk=True)
+    return CompactionReport(material, len(removed), connections_removed, removed)
+
+def compact_materials(materials: list[str]|None = None, dry_run: bool = False) -> list[CompactionReport]:
+    """
+     Remove the identity utility nodes of many materials in one undoable step.
+
+     @param materials - Materials to compact. None for every material created by the tool.
+     @param dry_run - True to only report what would be removed.
+
+     @return List of CompactionReport, one for each material.
+    """
+    from .mel_helper import cmds, find_tagged_nodes
+    from .network_plan import TAG_ATTRIBUTE
+    if materials is None:
+        materials = [node for node in find_tagged_nodes() if cmds.getAttr('{0}.{1}'.format(node, TAG_ATTRIBUTE)) == 'material']
+    cmds.undoInfo(openChunk=True, chunkName='ShaderCreatorCompact')
+    try:
+        return [compact_material(material, dry_run) for material in sorted(materials)]
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+def format_compaction(reports: list[CompactionReport], dry_run: bool = False) -> str:
+    """
+     Describe the compaction of materials for the artist.
+
+     @param reports - List of CompactionReport.
+     @param dry_run - True if nothing was removed.
+
+     @return The report as text.
+    """
+    action = 'can be removed' if dry_run else 'removed'
+    lines = list()
+    for report in reports:
+        lines.append('{0}: {1} nodes and {2} connections {3}'.format(report.material, report.nodes_removed, report.connections_removed, action))
+    lines.append('Total: {0} nodes and {1} connections {2}'.format(sum(report.nodes_removed for report in reports), sum(report.connections_removed for report in reports), action))
+    return '\n'.join(lines)
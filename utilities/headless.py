@@ -0,0 +1,268 @@
+from __future__ import annotations
+from typing import NamedTuple
+import argparse
+import json
+import re
+import sys
+import time
+
+BACKENDS = ('maya', 'fake')
+# Errors worth running the scene again for: Maya commands and the disk can fail once, a wrong manifest fails every time
+RETRIED_ERRORS = (RuntimeError, OSError)
+
+class JobResult(NamedTuple):
+    """
+     Result of one material of a manifest.
+
+     @param scene - Scene the material was built in, None for a new scene.
+     @param name - Name of the material.
+     @param success - True if the material was created.
+     @param material - Name of the created material or None.
+     @param sg - Name of the created shading group or None.
+     @param assigned - Number of shapes assigned by the rules of the job.
+     @param attempts - Number of times the scene was run.
+     @param seconds - Time spent on the material in its last attempt.
+     @param errors - List of errors, empty if the material was created.
+    """
+    scene: str|None
+    name: str
+    success: bool
+    material: str|None
+    sg: str|None
+    assigned: int
+    attempts: int
+    seconds: float
+    errors: list
+
+def load_manifest(manifest) -> list[dict]:
+    """
+     Read the jobs of a manifest. A manifest is a list of jobs or a dictionary with a jobs list and defaults for every job.
+     Each job has a name and optionally scene, shader_type, texture_root (with asset, the name by default), textures,
+     rules, reuse, lean and save (save the scene after its jobs).
+
+     @param manifest - Path of a .json or .yaml file, or the manifest already read.
+
+     @return List of job dictionaries with the defaults applied.
+    """
+    if isinstance(manifest, str):
+        with open(manifest) as manifest_file:
+            if manifest.lower().endswith(('.yaml', '.yml')):
+                try:
+                    import yaml
+                except ImportError:
+                    raise ValueError('PyYAML is needed to read {}, use a JSON manifest instead'.format(manifest))
+                manifest = yaml.safe_load(manifest_file)
+            else:
+                manifest = json.load(manifest_file)
+    defaults = dict()
+    jobs = manifest
+    if isinstance(manifest, dict):
+        defaults = manifest.get('defaults', dict())
+        jobs = manifest.get('jobs', list())
+    loaded = list()
+    for job in jobs:
+        job = dict(defaults, **job)
+        if not job.get('name'):
+            raise ValueError('Every job of the manifest needs a name: {}'.format(job))
+        if not job.get('textures') and not job.get('texture_root'):
+            raise ValueError('The job {} needs textures or a texture_root'.format(job['name']))
+        job.setdefault('shader_type', 'aiStandardSurface')
+        loaded.append(job)
+    return loaded
+
+def _job_textures(job: dict) -> dict:
+    """
+     Get the textures of a job, given in the manifest or found in its texture root.
+    """
+    from .path_helper import discover_texture_sets
+    if job.get('textures'):
+        return dict(job['textures'])
+    texture_sets = discover_texture_sets(job['texture_root'], recursive=job.get('recursive', True))
+    asset = job.get('asset', job['name'])
+    if asset in texture_sets:
+        return texture_sets[asset]
+    # A root with a single asset doesn't need its name
+    if len(texture_sets) == 1:
+        return list(texture_sets.values())[0]
+    raise ValueError('No textures of {0} found in {1}'.format(asset, job['texture_root']))
+
+def _open_scene(scene: str|None, backend: str) -> None:
+    """
+     Give the worker a clean scene: the scene of the jobs opened from disk or a new one. The fake backend always
+     starts from an empty scene.
+    """
+    from .maya_backend import set_backend
+    if backend == 'fake':
+        from .fake_cmds import FakeCmds
+        set_backend(FakeCmds())
+        return
+    from .mel_helper import cmds
+    if scene:
+        cmds.file(scene, open=True, force=True)
+    else:
+        cmds.file(new=True, force=True)
+
+def _inside_maya() -> bool:
+    """
+     Tell if this process already runs Maya, the interactive session or an initialized standalone.
+    """
+    commands = sys.modules.get('maya.cmds')
+    return commands is not None and hasattr(commands, 'file')
+
+def _init_worker(backend: str) -> None:
+    """
+     Start the commands backend of a worker process, Maya standalone once for each process.
+    """
+    if backend == 'maya':
+        import maya.standalone
+        maya.standalone.initialize(name='python')
+
+def _run_job(job: dict) -> tuple:
+    """
+     Create the material of a job and assign it with its rules, like run_create without the UI.
+
+     @return Tuple with the material, the shading group, the number of shapes assigned and the sanity errors.
+    """
+    from .sanity_checks import main_sanity_checks
+    from .btn_actions import run_create_material
+    from .assignment_rules import rules_from_dicts, apply_rules
+    textures = _job_textures(job)
+    sanity_errors = main_sanity_checks(job['name'], list(), textures)
+    if sanity_errors:
+        # The sanity checks are written for the message box of the UI
+        plain = re.sub(r'<[^>]+>', '', sanity_errors.replace('<br />', '\n'))
+        return None, None, 0, [line.strip() for line in plain.splitlines() if line.strip()]
+    material, sg = run_create_material(job['name'], job['shader_type'], textures, reuse=job.get('reuse', False), lean=job.get('lean', False))
+    assigned = 0
+    if job.get('rules'):
+        # The rules assign the material of the job unless they name another one
+        rules = rules_from_dicts([dict({'material': material}, **rule) for rule in job['rules']])
+        _, reports, _ = apply_rules(rules)
+        assigned = sum(report.members for report in reports)
+    return material, sg, assigned, list()
+
+def run_scene(task: tuple) -> list[JobResult]:
+    """
+     Run the jobs of one scene in the current process. The scene is opened again and every job run again if a Maya
+     command or the disk fails, up to the number of retries. Sanity errors and other exceptions aren't retried.
+
+     @param task - Tuple with the scene or None, the list of jobs, the backend name and the number of retries.
+
+     @return List of JobResult, one for each job.
+    """
+    from .mel_helper import cmds
+    scene, jobs, backend, retries = task
+    attempt = 0
+    while True:
+        attempt += 1
+        results = list()
+        try:
+            _open_scene(scene, backend)
+            for job in jobs:
+                start = time.perf_counter()
+                material, sg, assigned, errors = _run_job(job)
+                results.append(JobResult(scene, job['name'], not errors, material, sg, assigned, attempt, time.perf_counter() - start, errors))
+            if scene and backend != 'fake' and any(job.get('save', False) for job in jobs):
+                cmds.file(save=True, force=True)
+            return results
+        except Exception as err:
+            # The scene isn't complete, none of its jobs count as done
+            if attempt > retries or not isinstance(err, RETRIED_ERRORS):
+                error = '{0}: {1}'.format(type(err).__name__, err)
+                return [JobResult(scene, job['name'], False, None, None, 0, attempt, 0.0, [error]) for job in jobs]
+
+def run_manifest(manifest, workers: int|None = None, backend: str = 'maya', retries: int = 1) -> list[JobResult]:
+    """
+     Run the jobs of a manifest without the UI on a pool of processes, each with its own commands backend.
+     The jobs of a scene run in order in the same process, the scenes run in parallel.
+
+     @param manifest - Path of a manifest or the manifest already read, see load_manifest.
+     @param workers - Number of processes. None for the number of CPUs, 1 to run in this process. Inside a Maya session
+     the maya backend always runs in worker processes, the scene of the artist is never replaced.
+     @param backend - maya for Maya standalone or fake for the in-memory scene of fake_cmds.
+     @param retries - Times a scene is run again when a job raises.
+
+     @return List of JobResult in the order of the manifest.
+    """
+    if backend not in BACKENDS:
+        raise ValueError('Unknown backend {0}, use one of {1}'.format(backend, ', '.join(BACKENDS)))
+    jobs = load_manifest(manifest)
+    # Jobs without a scene build their material in a scene of their own
+    tasks = dict()
+    positions = dict()
+    for index, job in enumerate(jobs):
+        key = job.get('scene') or '#{}'.format(index)
+        tasks.setdefault(key, (job.get('scene'), list(), backend, retries))[1].append(job)
+        positions.setdefault(key, list()).append(index)
+    keys = list(tasks)
+    in_process = workers == 1 or len(keys) == 1
+    if in_process and (backend == 'fake' or not _inside_maya()):
+        from .maya_backend import set_backend
+        if backend == 'maya':
+            _init_worker(backend)
+        previous = set_backend(None)
+        try:
+            done = [run_scene(tasks[key]) for key in keys]
+        finally:
+            set_backend(previous)
+    else:
+        from .texture_convert import process_pool
+        with process_pool(workers, _init_worker, (backend,)) as executor:
+            done = list(executor.map(run_scene, [tasks[key] for key in keys]))
+    results = [None] * len(jobs)
+    for key, scene_results in zip(keys, done):
+        for index, result in zip(positions[key], scene_results):
+            results[index] = result
+    return results
+
+def format_summary(results: list[JobResult], seconds: float|None = None) -> str:
+    """
+     Describe the run of a manifest with the time of each job.
+
+     @param results - List of JobResult.
+     @param seconds - Wall time of the whole run.
+
+     @return The report as text.
+    """
+    lines = list()
+    for result in results:
+        status = 'ok' if result.success else 'failed'
+        line = '{0:<8}{1:>10.3f} s  {2}  {3}'.format(status, result.seconds, result.name, result.scene or '(new scene)')
+        if result.attempts > 1:
+            line = '{0}  ({1} attempts)'.format(line, result.attempts)
+        if result.assigned:
+            line = '{0}  {1} shapes assigned'.format(line, result.assigned)
+        lines.append(line)
+        lines.extend('    {}'.format(error) for error in result.errors)
+    succeeded = sum(result.success for result in results)
+    summary = '{0} materials created, {1} failed, {2:.3f} s of work'.format(succeeded, len(results) - succeeded, sum(result.seconds for result in results))
+    if seconds is not None:
+        summary = '{0}, {1:.3f} s wall time'.format(summary, seconds)
+    lines.append(summary)
+    return '\n'.join(lines)
+
+def main(argv: list[str]|None = None) -> int:
+    """
+     Command line entry point: python -m ShaderCreator.utilities.headless manifest.json
+
+     @param argv - Command line arguments. Defaults to sys.argv.
+
+     @return Exit code, 1 if a job failed.
+    """
+    parser = argparse.ArgumentParser(description='Shader Creator headless batch')
+    parser.add_argument('manifest', help='JSON or YAML manifest of the materials to create')
+    parser.add_argument('--backend', choices=BACKENDS, default='maya')
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--retries', type=int, default=1)
+    parser.add_argument('--report', help='Write the results as JSON to this file')
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    results = run_manifest(args.manifest, args.workers, args.backend, args.retries)
+    print(format_summary(results, time.perf_counter() - start))
+    if args.report:
+        with open(args.report, 'w') as report_file:
+            json.dump([result._asdict() for result in results], report_file, indent=1)
+    return 0 if all(result.success for result in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
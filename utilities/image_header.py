@@ -0,0 +1,269 @@
+from __future__ import annotations
+from typing import NamedTuple
+import os
+import struct
+
+MAX_WORKERS = 8
+# Bytes read first, jpg and tif jump to their header. PNG and EXR headers longer than this are read on demand up to
+# MAX_HEADER_SIZE, large metadata can push them further.
+HEADER_SIZE = 8192
+MAX_HEADER_SIZE = 1048576
+LINEAR_COLORSPACE = 'scene-linear Rec.709-sRGB'
+SRGB_COLORSPACE = 'sRGB'
+RAW_COLORSPACE = 'Raw'
+
+_HEADER_CACHE = dict()
+
+class ImageHeader(NamedTuple):
+    """
+     Image properties read from the first bytes of a file, without decoding the pixels.
+
+     @param format - Format of the file: jpg, png, tif, tga or exr.
+     @param width - Width in pixels.
+     @param height - Height in pixels.
+     @param channels - Number of channels, alpha included.
+     @param bit_depth - Bits of each channel.
+     @param linear - True if the data is stored linear (float images), False if it is display encoded.
+    """
+    format: str
+    width: int
+    height: int
+    channels: int
+    bit_depth: int
+    linear: bool
+
+def _read_png(data: bytes, complete: bool = True) -> ImageHeader|None:
+    if not data.startswith(b'\x89PNG\r\n\x1a\n') or data[12:16] != b'IHDR':
+        return None
+    width, height, bit_depth, color_type = struct.unpack('>IIBB', data[16:26])
+    channels = {0: 1, 2: 3, 3: 3, 4: 2, 6: 4}.get(color_type, 3)
+    # A palette image has 8 bit colors, bit_depth is the size of the index
+    if color_type == 3:
+        bit_depth = 8
+    linear = False
+    # A gamma of 1.0 is a linear image
+    gamma_index = data.find(b'gAMA', 33)
+    # The gamma chunk comes before the pixels, it can still be further in the file
+    if not complete and (gamma_index == -1 and data.find(b'IDAT', 33) == -1 or gamma_index + 8 > len(data)):
+        raise EOFError
+    if gamma_index != -1 and data.find(b'IDAT', 33, gamma_index) == -1:
+        linear = struct.unpack('>I', data[gamma_index + 4:gamma_index + 8])[0] == 100000
+    return ImageHeader('png', width, height, channels, bit_depth, linear)
+
+def _read_jpg(image_file) -> ImageHeader|None:
+    if image_file.read(2) != b'\xff\xd8':
+        return None
+    # Jump from segment to segment until the frame header
+    while True:
+        marker = image_file.read(2)
+        if len(marker) < 2 or marker[0] != 0xff:
+            return None
+        if marker[1] in (0xd8, 0x01) or 0xd0 <= marker[1] <= 0xd7:
+            continue
+        length_data = image_file.read(2)
+        if len(length_data) < 2:
+            return None
+        length = struct.unpack('>H', length_data)[0]
+        if 0xc0 <= marker[1] <= 0xcf and marker[1] not in (0xc4, 0xc8, 0xcc):
+            bit_depth, height, width, channels = struct.unpack('>BHHB', image_file.read(6))
+            return ImageHeader('jpg', width, height, channels, bit_depth, False)
+        image_file.seek(length - 2, os.SEEK_CUR)
+
+def _read_tif(image_file) -> ImageHeader|None:
+    data = image_file.read(8)
+    if data[:4] in (b'II*\x00', b'MM\x00*'):
+        endian = '<' if data[:2] == b'II' else '>'
+        entry_format, value_size, offset_format = 'HHI', 4, 'I'
+        offset = struct.unpack(endian + 'I', data[4:8])[0]
+        count_format = 'H'
+    elif data[:4] in (b'II+\x00', b'MM\x00+'):
+        # BigTIFF, the first directory offset is after the header
+        endian = '<' if data[:2] == b'II' else '>'
+        entry_format, value_size, offset_format = 'HHQ', 8, 'Q'
+        offset = struct.unpack(endian + 'Q', image_file.read(8))[0]
+        count_format = 'Q'
+    else:
+        return None
+    entry_size = struct.calcsize(endian + entry_format) + value_size
+    image_file.seek(offset)
+    count = struct.unpack(endian + count_format, image_file.read(struct.calcsize(endian + count_format)))[0]
+    directory = image_file.read(count * entry_size)
+    tags = dict()
+    for index in range(min(count, len(directory) // entry_size)):
+        entry = directory[index * entry_size:(index + 1) * entry_size]
+        tag, field_type, field_count = struct.unpack(endian + entry_format, entry[:entry_size - value_size])
+        value = entry[entry_size - value_size:]
+        if field_type == 3:
+            # Values that don't fit in the entry are stored at an offset, the first one is enough
+            if field_count * 2 > value_size:
+                tags[tag] = ('offset', struct.unpack(endian + offset_format, value)[0])
+            else:
+                tags[tag] = struct.unpack(endian + 'H', value[:2])[0]
+        elif field_type == 4:
+            tags[tag] = struct.unpack(endian + 'I', value[:4])[0]
+        elif field_type == 16:
+            tags[tag] = struct.unpack(endian + 'Q', value[:8])[0]
+    for tag, value in tags.items():
+        if isinstance(value, tuple):
+            image_file.seek(value[1])
+            tags[tag] = struct.unpack(endian + 'H', image_file.read(2))[0]
+    # SampleFormat 3 is floating point data
+    linear = tags.get(339, 1) == 3
+    return ImageHeader('tif', tags.get(256, 0), tags.get(257, 0), tags.get(277, 1), tags.get(258, 1), linear)
+
+def _read_tga(data: bytes) -> ImageHeader|None:
+    if len(data) < 18:
+        return None
+    image_type = data[2]
+    if image_type not in (1, 2, 3, 9, 10, 11):
+        return None
+    width, height, pixel_depth, descriptor = struct.unpack('<HHBB', data[12:18])
+    if image_type in (3, 11):
+        channels = 1
+    elif pixel_depth == 32 or descriptor & 0x0f:
+        channels = 4
+    else:
+        channels = 3
+    return ImageHeader('tga', width, height, channels, 8, False)
+
+def _read_exr(data: bytes, complete: bool = True) -> ImageHeader|None:
+    if not data.startswith(b'\x76\x2f\x31\x01'):
+        return None
+    position = 8
+    channels = list()
+    width = height = 0
+    # Attributes are name, type, size and value until an empty name
+    while position >= len(data) or data[position] != 0:
+        name_end = data.find(b'\x00', position)
+        type_end = data.find(b'\x00', name_end + 1) if name_end != -1 else -1
+        if type_end == -1 or type_end + 5 > len(data) or type_end + 5 + struct.unpack('<i', data[type_end + 1:type_end + 5])[0] > len(data):
+            # The header goes on after the data read
+            if not complete:
+                raise EOFError
+            return None
+        name = data[position:name_end]
+        size = struct.unpack('<i', data[type_end + 1:type_end + 5])[0]
+        value = data[type_end + 5:type_end + 5 + size]
+        position = type_end + 5 + size
+        if name == b'channels':
+            channel_position = 0
+            while channel_position < len(value) and value[channel_position] != 0:
+                channel_end = value.index(b'\x00', channel_position)
+                channels.append(struct.unpack('<i', value[channel_end + 1:channel_end + 5])[0])
+                channel_position = channel_end + 17
+        elif name == b'dataWindow':
+            x_min, y_min, x_max, y_max = struct.unpack('<iiii', value[:16])
+            width, height = x_max - x_min + 1, y_max - y_min + 1
+    if not channels:
+        return None
+    # Pixel types: 0 uint, 1 half, 2 float
+    bit_depth = max([{0: 32, 1: 16, 2: 32}.get(pixel_type, 32) for pixel_type in channels] or [16])
+    return ImageHeader('exr', width, height, len(channels), bit_depth, True)
+
+def read_image_header(path: str) -> ImageHeader|None:
+    """
+     Read the header of an image. Only the first bytes of the file are read, more only if the header is longer.
+
+     @param path - Image to read.
+
+     @return ImageHeader or None if the file can't be read or the format isn't known.
+    """
+    extension = path.rsplit('.', 1)[-1].lower()
+    try:
+        with open(path, 'rb') as image_file:
+            if extension in ('jpg', 'jpeg'):
+                return _read_jpg(image_file)
+            if extension in ('tif', 'tiff', 'tx'):
+                return _read_tif(image_file)
+            if extension == 'tga':
+                return _read_tga(image_file.read(18))
+            if extension not in ('png', 'exr'):
+                return None
+            size = HEADER_SIZE
+            data = image_file.read(size)
+            while True:
+                # The file ended or the header is too big to be worth reading
+                complete = len(data) < size or size >= MAX_HEADER_SIZE
+                try:
+                    return _read_png(data, complete) if extension == 'png' else _read_exr(data, complete)
+                except EOFError:
+                    data += image_file.read(size)
+                    size *= 2
+    except (OSError, struct.error, ValueError, IndexError):
+        return None
+
+def probe_header(path: str) -> ImageHeader|None:
+    """
+     Read the header of an image, cached by path, modification time and size.
+     UDIM paths are read from their first tile.
+
+     @param path - Image or UDIM path to read.
+
+     @return ImageHeader or None.
+    """
+    from .texture_validation import expand_udim_path
+    tiles = expand_udim_path(path)
+    if tiles:
+        path = tiles[min(tiles)]
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    if key in _HEADER_CACHE:
+        return _HEADER_CACHE[key]
+    header = read_image_header(path)
+    # Keep the cache bounded for very big libraries
+    if len(_HEADER_CACHE) >= 100000:
+        _HEADER_CACHE.clear()
+    _HEADER_CACHE[key] = header
+    return header
+
+def probe_headers(paths: list[str], max_workers: int = MAX_WORKERS) -> dict:
+    """
+     Read the headers of many images at once on a bounded thread pool.
+
+     @param paths - Images or UDIM paths to read. Empty paths are skipped.
+     @param max_workers - Maximum number of threads.
+
+     @return Dictionary of paths and ImageHeader or None.
+    """
+    from .texture_validation import map_concurrently
+    paths = [path for path in dict.fromkeys(paths) if path]
+    return dict(zip(paths, map_concurrently(probe_header, paths, max_workers)))
+
+def file_settings(header: ImageHeader|None, color: bool, colorspace: str|None = None) -> dict:
+    """
+     Choose the file node settings of an image.
+
+     @param header - Header of the image or None if it is unknown.
+     @param color - True if the image is used as a color, False if it is data like roughness or bump.
+     @param colorspace - Colorspace written in the file name, it wins over the header.
+
+     @return Dictionary of file node attributes and values. Empty if nothing is known about the image.
+    """
+    settings = dict()
+    if colorspace:
+        settings['colorSpace'] = colorspace
+    elif header is not None:
+        if not color:
+            settings['colorSpace'] = RAW_COLORSPACE
+        elif header.linear:
+            settings['colorSpace'] = LINEAR_COLORSPACE
+        else:
+            settings['colorSpace'] = SRGB_COLORSPACE
+    # The file rules would change the colorspace chosen here when the scene is opened
+    if settings:
+        settings['ignoreColorSpaceFileRules'] = 1
+    # Single channel images give their value to the alpha too, network_plan.file_output connects their outAlpha
+    if header is not None and header.channels in (1, 2):
+        settings['alphaIsLuminance'] = 1
+    return settings
+
+def clear_header_cache() -> None:
+    """
+     Forget every header read in this session.
+
+     @return None
+    """
+    _HEADER_CACHE.clear()
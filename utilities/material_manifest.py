@@ -0,0 +1,248 @@
+from __future__ import annotations
+from typing import NamedTuple
+import json
+import os
+import time
+
+MANIFEST_FORMAT = 'shader_creator_materials'
+MANIFEST_VERSION = 1
+# Inputs of the shading group that belong to the material network, the shapes connected to it don't
+SG_INPUTS = ('surfaceShader', 'displacementShader', 'volumeShader')
+# Attributes saved for each node type, the others are left at the values Maya gives new nodes
+FILE_ATTRIBUTES = (('fileTextureName', 'string'), ('uvTilingMode', None), ('colorSpace', 'string'), ('ignoreColorSpaceFileRules', None), ('alphaIsLuminance', None))
+CATEGORIES = {'file': 'asTexture', 'place2dTexture': 'asTexture', 'displacementShader': 'asShader'}
+
+class ImportResult(NamedTuple):
+    """
+     Result of a manifest import.
+
+     @param created - List of (material, shading group) names created.
+     @param stale - List of (material, changed files) skipped because their textures changed since the export.
+     @param seconds - Time spent.
+    """
+    created: list
+    stale: list
+    seconds: float
+
+def _value(value):
+    # Maya returns compound attributes as a list with one tuple
+    if isinstance(value, list) and len(value) == 1 and isinstance(value[0], tuple):
+        value = value[0]
+    if isinstance(value, (list, tuple)):
+        return [float(item) for item in value], 'double{}'.format(len(value))
+    return value, None
+
+def material_record(material: str, tagged: set|None = None) -> dict:
+    """
+     Describe the network of a material as plain data: nodes, attributes set by the tool, connections, tags and the
+     files read with their modification time.
+
+     @param material - Name of the material.
+     @param tagged - Nodes with the tool tag, found once with find_tagged_nodes. None to look for them.
+
+     @return Dictionary that can be written as JSON.
+    """
+    from .mel_helper import cmds, find_tagged_nodes
+    from .network_plan import TAG_ATTRIBUTE
+    from .graph_optimizer import IDENTITY_ATTRIBUTES
+    from .texture_convert import texture_files
+    tagged = set(find_tagged_nodes()) if tagged is None else tagged
+    keys = {material: '@material'}
+    types = {material: cmds.nodeType(material)}
+    sgs = cmds.listConnections(material, source=False, destination=True, type='shadingEngine') or list()
+    if sgs:
+        keys[sgs[0]] = '@sg'
+        types[sgs[0]] = 'shadingEngine'
+    connections = list()
+    # Walk the network upstream from the shading group and the material
+    pending = list(keys)
+    while pending:
+        node = pending.pop(0)
+        inputs = cmds.listConnections(node, source=True, destination=False, connections=True, plugs=True) or list()
+        for own_plug, other_plug in zip(inputs[::2], inputs[1::2]):
+            own_attr = own_plug.split('.', 1)[1]
+            if types[node] == 'shadingEngine' and own_attr.split('.')[0] not in SG_INPUTS:
+                continue
+            other = other_plug.split('.', 1)[0]
+            if other not in keys:
+                keys[other] = '@n{}'.format(len(keys))
+                types[other] = cmds.nodeType(other)
+                pending.append(other)
+            connections.append((other, other_plug.split('.', 1)[1], node, own_attr))
+    record = {'material': material, 'type': types[material], 'nodes': list(), 'attributes': list(), 'connections': list(), 'navigations': list(), 'tags': list(), 'files': list()}
+    for node, key in keys.items():
+        node_type = types[node]
+        category = 'asShader' if node == material else CATEGORIES.get(node_type, 'asUtility')
+        record['nodes'].append([key, node_type, node, category])
+        if node in tagged:
+            record['tags'].append([key, cmds.getAttr('{0}.{1}'.format(node, TAG_ATTRIBUTE))])
+        if node_type == 'file':
+            for attr, attr_type in FILE_ATTRIBUTES:
+                record['attributes'].append([key, attr, cmds.getAttr('{0}.{1}'.format(node, attr)), attr_type])
+            # The files are stat once here, importing only compares them
+            for file in texture_files([cmds.getAttr('{}.fileTextureName'.format(node)) or str()]):
+                stat = os.stat(file)
+                record['files'].append([file, stat.st_mtime_ns, stat.st_size])
+        # Utility values changed by the artist
+        for attr, identity in IDENTITY_ATTRIBUTES.get(node_type, dict()).items():
+            value, attr_type = _value(cmds.getAttr('{0}.{1}'.format(node, attr)))
+            if value is not None and value != _value(identity)[0]:
+                record['attributes'].append([key, attr, value, attr_type])
+    # The placement connections are made again by defaultNavigation
+    navigations = {(source, destination) for source, _, destination, _ in connections if types[source] == 'place2dTexture' and types[destination] == 'file'}
+    record['navigations'] = [[keys[source], keys[destination]] for source, destination in sorted(navigations)]
+    record['connections'] = [[keys[source], out_attr, keys[destination], in_attr] for source, out_attr, destination, in_attr in connections if (source, destination) not in navigations]
+    return record
+
+def export_materials(path: str, materials: list[str]|None = None) -> int:
+    """
+     Write the networks of materials to a JSON Lines manifest: a header line and one line for each material.
+
+     @param path - File to write.
+     @param materials - Materials to export. None for every material created by the tool.
+
+     @return Number of materials written.
+    """
+    from .mel_helper import cmds, find_tagged_nodes
+    from .network_plan import TAG_ATTRIBUTE
+    tagged = set(find_tagged_nodes())
+    if materials is None:
+        materials = sorted(node for node in tagged if cmds.getAttr('{0}.{1}'.format(node, TAG_ATTRIBUTE)) == 'material')
+    with open('{}.tmp'.format(path), 'w') as manifest_file:
+        manifest_file.write(json.dumps({'format': MANIFEST_FORMAT, 'version': MANIFEST_VERSION}) + '\n')
+        for material in materials:
+            manifest_file.write(json.dumps(material_record(material, tagged), separators=(',', ':')) + '\n')
+    os.replace('{}.tmp'.format(path), path)
+    return len(materials)
+
+def iter_manifest(path: str):
+    """
+     Read the materials of a manifest one line at a time, large manifests are never loaded whole.
+
+     @param path - Manifest written by export_materials.
+
+     @return Iterator of material dictionaries.
+    """
+    with open(path) as manifest_file:
+        header = json.loads(manifest_file.readline() or '{}')
+        if header.get('format') != MANIFEST_FORMAT:
+            raise ValueError('{} is not a Shader Creator material manifest'.format(path))
+        if header.get('version', 0) > MANIFEST_VERSION:
+            raise ValueError('{0} has version {1}, this tool reads up to version {2}'.format(path, header.get('version'), MANIFEST_VERSION))
+        for line in manifest_file:
+            if line.strip():
+                yield json.loads(line)
+
+def changed_files(record: dict) -> list[str]:
+    """
+     Compare the files of a material with their modification time and size at export.
+
+     @param record - Material dictionary of a manifest.
+
+     @return List of files missing or changed.
+    """
+    changed = list()
+    for file, mtime, size in record.get('files', list()):
+        try:
+            stat = os.stat(file)
+        except OSError:
+            changed.append(file)
+            continue
+        if stat.st_mtime_ns != mtime or stat.st_size != size:
+            changed.append(file)
+    return changed
+
+def plan_record(plan, record: dict, prefix: str = '', shared: dict|None = None) -> None:
+    """
+     Add the network of a material dictionary to a NetworkPlan.
+
+     @param plan - NetworkPlan to fill.
+     @param record - Material dictionary of a manifest.
+     @param prefix - Text added to the keys, so many materials fit in one plan.
+     @param shared - Dictionary of the exported node names already planned or created and their plan key or new name.
+     A node shared by many materials, like a reused file node, is exported with each of them and only created once.
+     None to create every node.
+
+     @return None
+    """
+    shared = dict() if shared is None else shared
+    keys = dict()
+    reused = set()
+    for node_key, node_type, name, category in record['nodes']:
+        if name in shared:
+            keys[node_key] = shared[name]
+            reused.add(node_key)
+            continue
+        keys[node_key] = shared[name] = plan.add_node('{0}{1}'.format(prefix, node_key), node_type, name, category)
+    # A shared node already has its values and its own inputs
+    for node_key, role in record['tags']:
+        if node_key not in reused:
+            plan.tag(keys[node_key], role)
+    for node_key, attr, value, attr_type in record['attributes']:
+        if node_key not in reused:
+            plan.set_attribute(keys[node_key], attr, tuple(value) if isinstance(value, list) else value, attr_type)
+    for source, destination in record['navigations']:
+        if destination not in reused:
+            plan.navigate(keys[source], keys[destination])
+    for out_node, out_attr, in_node, in_attr in record['connections']:
+        if in_node not in reused:
+            plan.connect(keys[out_node], out_attr, keys[in_node], in_attr)
+
+def import_materials(path: str, revalidate: bool = False, batch_size: int = 100) -> ImportResult:
+    """
+     Rebuild the materials of a manifest without looking at the texture folders. The manifest is streamed and the
+     materials are created in batches, each batch is one plan executed in one undo chunk.
+
+     @param path - Manifest written by export_materials.
+     @param revalidate - True to compare the modification time of every file and skip the materials whose files changed.
+     @param batch_size - Materials created together.
+
+     @return ImportResult.
+    """
+    from .mel_helper import execute_plan
+    from .network_plan import NetworkPlan
+    from .file_reuse import get_file_node_index
+    start = time.perf_counter()
+    created = list()
+    stale = list()
+    batch = list()
+
+    # Exported names of the nodes created so far, the nodes shared by many materials are created once
+    shared = dict()
+
+    def flush():
+        plan = NetworkPlan()
+        for index, record in enumerate(batch):
+            plan_record(plan, record, '@{}'.format(index), shared)
+        names = execute_plan(plan)
+        for name, node in shared.items():
+            shared[name] = names.get(node, node)
+        created.extend((names['@{}@material'.format(index)], names.get('@{}@sg'.format(index))) for index in range(len(batch)))
+        del batch[:]
+
+    for record in iter_manifest(path):
+        changed = changed_files(record) if revalidate else list()
+        if changed:
+            stale.append((record['material'], changed))
+            continue
+        batch.append(record)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    # The new file nodes are found the next time the index is used
+    get_file_node_index().clear()
+    return ImportResult(created, stale, time.perf_counter() - start)
+
+def format_import(result: ImportResult) -> str:
+    """
+     Describe a manifest import.
+
+     @param result - ImportResult.
+
+     @return The report as text.
+    """
+    lines = ['{0} materials rebuilt in {1:.3f} s'.format(len(result.created), result.seconds)]
+    for material, changed in result.stale:
+        lines.append('{0} skipped, its textures changed: {1}'.format(material, ', '.join(changed)))
+    return '\n'.join(lines)
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+_BACKEND = None
+
+def get_backend():
+    """
+     Get the module or object used to run Maya commands. maya.cmds is imported the first time it is needed.
+
+     @return The current commands backend.
+    """
+    global _BACKEND
+    if _BACKEND is None:
+        import maya.cmds
+        _BACKEND = maya.cmds
+    return _BACKEND
+
+def set_backend(backend) -> object:
+    """
+     Replace the commands backend, for example with fake_cmds.FakeCmds to run without Maya.
+
+     @param backend - Object with the same functions as maya.cmds. None to go back to maya.cmds.
+
+     @return The previous backend.
+    """
+    global _BACKEND
+    previous = _BACKEND
+    _BACKEND = backend
+    return previous
+
+class _CommandsProxy(object):
+    """
+     Stand in for maya.cmds that sends every command to the current backend.
+    """
+    def __getattr__(self, name: str):
+        return getattr(get_backend(), name)
+
+cmds = _CommandsProxy()
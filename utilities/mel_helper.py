@@ -1,255 +1,276 @@
 from __future__ import annotations
-import maya.cmds as cmds
-import re
+from .maya_backend import cmds, get_backend
+
+_SHADERS_CACHE = dict()
+_ATTRIBUTES_CACHE = dict()
+_MAPPING_CACHE = dict()
+_PLUGIN_CALLBACKS = list()
 
 def get_all_shaders() -> list[str]:
     """
      Get all shaders that maya knows about. This is used to determine which shaders should be used for the scene
+     The list is cached for the session and refreshed when a plugin is loaded or unloaded.
      
      
      @return A list of shader
     """
-    shader_maya = cmds.listNodeTypes('shader', ex = "volume")
-    default_shaders = [
-        'aiAmbientOcclusion',
-        'aiAtmosphereVolume',
-        'aiCarPaint',
-        'aiLambert',
-        'aiLayeredTexture',
-        'aiMatte',
-        'aiMixShader',
-        'aiShadowMatte',
-        'aiStandardHair',
-        'aiStandardSurface',
-        'aiToon',
-        'aiTwoSided',
-        'blinn',
-        'lambert',
-        'layeredShader',
-        'phong',
-        'rampShader',
-        'surfaceShader',
-        'RedshiftStandardMaterial',
-        'RedshiftCarPaint',
-    ]
-    shaders_found = list(set(default_shaders) & set(shader_maya))
-    return shaders_found
+    backend = get_backend()
+    if _SHADERS_CACHE.get('backend') is not backend:
+        register_plugin_callbacks()
+        shader_maya = cmds.listNodeTypes('shader', ex = "volume")
+        default_shaders = [
+            'aiAmbientOcclusion',
+            'aiAtmosphereVolume',
+            'aiCarPaint',
+            'aiLambert',
+            'aiLayeredTexture',
+            'aiMatte',
+            'aiMixShader',
+            'aiShadowMatte',
+            'aiStandardHair',
+            'aiStandardSurface',
+            'aiToon',
+            'aiTwoSided',
+            'blinn',
+            'lambert',
+            'layeredShader',
+            'phong',
+            'rampShader',
+            'surfaceShader',
+            'RedshiftStandardMaterial',
+            'RedshiftCarPaint',
+        ]
+        _SHADERS_CACHE['shaders'] = list(set(default_shaders) & set(shader_maya))
+        _SHADERS_CACHE['backend'] = backend
+    return list(_SHADERS_CACHE['shaders'])
 
-def create_shader(name:str, node_type:str) -> tuple:
+def get_type_attributes(node_type:str) -> list[str]:
     """
-     Create a shading node and set it as a surface shader. The node will be named _SG where name is the name of the shader and outColor is the color of the node.
+     Get the attributes the tool can connect textures to that exist on a node type. Maya is queried only the first time
+     for each node type, the table is kept for the session and refreshed when a plugin is loaded or unloaded.
      
-     @param name - The name of the shader. If None a random name will be generated.
-     @param node_type - The type of node to create.
+     @param node_type - type of the node, for example aiStandardSurface or shadingEngine
      
-     @return A tuple containing the created node and the created surface shader.
+     @return list of attributes of the node type that can receive a texture
     """
-    flags = {'asShader':True}
-    # Set the name of the flag.
-    if name:
-        flags["name"] = name
-    material = cmds.shadingNode(node_type, **flags)
-    sg = cmds.sets(name="{}_SG".format(name), empty=True, renderable=True, noSurfaceShader=True)
-    cmds.connectAttr("%s.outColor" % material, "%s.surfaceShader" % sg)
-    return material, sg
+    from .network_plan import ATTRIBUTES_CHANNELS
+    backend = get_backend()
+    if _ATTRIBUTES_CACHE.get('backend') is not backend:
+        register_plugin_callbacks()
+        _ATTRIBUTES_CACHE.clear()
+        _ATTRIBUTES_CACHE['backend'] = backend
+    attributes = _ATTRIBUTES_CACHE.get(node_type)
+    if attributes is None:
+        candidates = [attr for attrs in ATTRIBUTES_CHANNELS.values() for attr in attrs]
+        attributes = [attr for attr in candidates if cmds.attributeQuery(attr, type=node_type, exists=True)]
+        _ATTRIBUTES_CACHE[node_type] = attributes
+    return list(attributes)
 
-def assign_shader(obj_list: list[str], SG: str) -> None:
+def get_channel_mapping(node_type:str) -> dict:
     """
-     Assign a shaders to objects.
+     Get where each texture channel is connected for a shader type. It is built once for each node type and
+     shared for the session, so connecting textures doesn't query Maya.
      
-     @param obj_list - List of objects to assign the shaders to
-     @param SG - Name of the shader to assign the objects to
+     @param node_type - type of the shader
      
-     @return None
+     @return Dictionary of channels and network_plan.ChannelTarget
     """
-    cmds.sets(obj_list, forceElement=SG)
+    from .network_plan import build_channel_mapping
+    backend = get_backend()
+    if _MAPPING_CACHE.get('backend') is not backend:
+        _MAPPING_CACHE.clear()
+        _MAPPING_CACHE['backend'] = backend
+    mapping = _MAPPING_CACHE.get(node_type)
+    if mapping is None:
+        mapping = build_channel_mapping(node_type, get_type_attributes(node_type), get_type_attributes('shadingEngine'))
+        _MAPPING_CACHE[node_type] = mapping
+    return mapping
 
-def selection_shapes_meshes() -> list[str]:
+def invalidate_shader_cache(*args) -> None:
     """
-     List shapes in DAG with meshes and nurbsSurfaces.
-     
+     Forget the shaders, attribute tables and channel mappings cached. Called when a plugin is loaded or unloaded.
      
-     @return list of shapes in DAG with meshes and nurbsSurfaces.
+     @return None
     """
-    return cmds.ls(selection = True, dag=True, type=["mesh", "nurbsSurface"], noIntermediate=True)
+    _SHADERS_CACHE.clear()
+    _ATTRIBUTES_CACHE.clear()
+    _MAPPING_CACHE.clear()
 
-def get_attributes_shaders(shader: str, sg:str)-> list[str]:
+def register_plugin_callbacks() -> None:
     """
-     Get attributes shaders. This is a helper function to get a list of shader attributes
-     
-     @param shader - name of the shader to search for
-     @param sg - name of the shader group to search for
+     Register the callbacks that refresh the cached shaders when a plugin is loaded or unloaded.
+     Inside Maya they are scene message callbacks, backends without them can give a plugin_callbacks list.
      
-     @return list of shader attributes in the order they were found in the shaders.
+     @return None
     """
-    shader_attr = cmds.listAttr(shader)
-    shader_attr.extend(cmds.listAttr(sg))
-    return shader_attr
+    backend = get_backend()
+    if any(registered is backend for registered, _ in _PLUGIN_CALLBACKS):
+        return
+    # Backends like fake_cmds keep their own list of callbacks
+    if hasattr(backend, 'plugin_callbacks'):
+        backend.plugin_callbacks.append(invalidate_shader_cache)
+        _PLUGIN_CALLBACKS.append((backend, invalidate_shader_cache))
+        return
+    try:
+        from maya.api import OpenMaya
+    except ImportError:
+        return
+    for message in (OpenMaya.MSceneMessage.kAfterPluginLoad, OpenMaya.MSceneMessage.kAfterPluginUnload):
+        _PLUGIN_CALLBACKS.append((backend, OpenMaya.MSceneMessage.addStringArrayCallback(message, invalidate_shader_cache)))
 
-def create_texture_file(shader_name:str, attr_type:str, file_path:str) -> str:
+def create_shader(name:str, node_type:str) -> tuple:
     """
-     Create a file node that is used to place shaders.
+     Create a shading node and set it as a surface shader. The node will be named _SG where name is the name of the shader and outColor is the color of the node.
      
-     @param shader_name - Name of the shader to create
-     @param attr_type - Type of attribute to use
-     @param file_path - Path to file
+     @param name - The name of the shader. If None a random name will be generated.
+     @param node_type - The type of node to create.
      
-     @return The created node
+     @return A tuple containing the created node and the created surface shader.
     """
-    from .path_helper import path_udim
-    file_node = cmds.shadingNode('file', name = '{0}_{1}'.format(shader_name, attr_type), asTexture=True)
-    # Set the file texture name attribute to file_path
-    if file_path:
-        # Check path before adding to the node for UDIM format
-        file_path, udim_format = path_udim(file_path)
-        cmds.setAttr('{0}.fileTextureName'.format(file_node), file_path, type='string')
-        # Check if using UDIM format mode to set the attribute to the corresponding format
-        if udim_format:
-            cmds.setAttr('{0}.uvTilingMode'.format(file_node), udim_format)
-    # Adds the 2d placement for the file node
-    create_2d_placement(file_node)
-    return file_node
+    flags = {'asShader':True}
+    # Set the name of the flag.
+    if name:
+        flags["name"] = name
+    material = cmds.shadingNode(node_type, **flags)
+    sg = cmds.sets(name="{}_SG".format(name), empty=True, renderable=True, noSurfaceShader=True)
+    cmds.connectAttr("%s.outColor" % material, "%s.surfaceShader" % sg)
+    return material, sg
 
-def create_2d_placement(texture_node:str) -> None:
+def assign_shader(obj_list: list[str], SG: str, chunk_size: int|None = None):
     """
-     Create a 2D placement node. This is used to place a texture in the scene.
+     Assign a shaders to objects. Long lists are assigned in chunks inside one undo chunk.
      
-     @param texture_node - The name of the node to place.
+     @param obj_list - List of objects or face components to assign the shaders to
+     @param SG - Name of the shader to assign the objects to
+     @param chunk_size - Members given to each sets command. None for assignment.ASSIGN_CHUNK_SIZE.
      
-     @return None
+     @return assignment.AssignmentReport with the time spent
     """
-    placement_node = cmds.shadingNode("place2dTexture", asTexture=True, name='place2d_{0}'.format(texture_node))
-    cmds.defaultNavigation(connectToExisting=True, source=placement_node, destination=texture_node)
+    from .assignment import assign_members, ASSIGN_CHUNK_SIZE
+    return assign_members(obj_list, SG, chunk_size or ASSIGN_CHUNK_SIZE)
 
-def connect_attributes(out_obj:str, out_attr:str, in_obj:str, in_attr:str) -> None:
+def selection_shapes_meshes() -> list[str]:
     """
-     Connect attributes between two objects. This is a wrapper around cmds. connectAttr that uses { 0 }. { 1 } to connect the out_obj's attribute to the in_obj's attribute.
+     List shapes in DAG with meshes and nurbsSurfaces and the selected faces, with bulk queries.
+     Long names are returned so each instance of a shape is assigned on its own.
      
-     @param out_obj - Name of the output object. It should be a string like'p1'or'p2 '.
-     @param out_attr - Name of the attribute to connect the out_obj's attribute to.
-     @param in_obj - Name of the input object. It should be a string like'p1'or'p2 '.
-     @param in_attr - Name of the attribute to connect the in_obj's attribute to.
      
-     @return None
+     @return list of shapes in DAG with meshes and nurbsSurfaces and face components.
     """
-    cmds.connectAttr('{0}.{1}'.format(out_obj, out_attr), '{0}.{1}'.format(in_obj, in_attr))
+    from .assignment import collect_targets
+    return collect_targets().members
 
-def create_bump(shader_name:str, texture_node:str, file_path:str, shader_attr:str) -> None:
+def dialog_window() -> list:
     """
-     Create a bump shading node. If shader_name is AI or Bb it will be used as a shader.
+     Create and return a dialog window to select images. It is called by the command line and can be used to modify the list of images in the GUI.
      
-     @param shader_name - name of the shader to create
-     @param texture_node - name of the texture node to connect the shader to
-     @param file_path - path to the shader file that will be used
-     @param shader_attr - attributes to set on the shader node
      
-     @return None
+     @return The list of images in the GUI or None
     """
-    shader_type = cmds.nodeType(shader_name)
-    # If the shader type is arnold
-    if shader_type.startswith('ai'):
-        # If the file is a bump file or a normal map it will use different type of node.
-        if re.search('[Bb]ump', file_path):
-            bump_node = cmds.shadingNode('aiBump2d', name = '{0}_bump2d'.format(shader_name), asUtility=True)
-            connect_attributes(texture_node, 'outColorR', bump_node, 'bumpMap')
-        else:
-            bump_node = cmds.shadingNode('aiNormalMap', name = '{0}_normal'.format(shader_name), asUtility=True)
-            connect_attributes(texture_node, 'outColor', bump_node, 'input')
-        connect_attributes(bump_node, 'outValue', shader_name, shader_attr)
-        return bump_node
-    bump_node = cmds.shadingNode('bump2d', name = '{0}_bump2d'.format(shader_name), asUtility=True)
-    connect_attributes(texture_node, 'outColorR', bump_node, 'bumpValue')
-    connect_attributes(bump_node, 'outNormal', shader_name, shader_attr)
+    imageFilter = "Images Files (*.jpg *.jpeg *.tif *.png *.tga *.exr)"
+    return cmds.fileDialog2(fileFilter=imageFilter, dialogStyle=2, okc='Ok', fm=1)
 
-def create_displacement(shader_name:str, texture_node:str) -> str:
+def surface_check(objs_list:list[str]) -> list[str]|None:
     """
-     Create displacement Shader. This is used to render textures with different color in each direction.
+     Checks if nodes are surfaces or nurbsSurface. This is to avoid problems with node types that don't have mesh or nurbsSurface in them.
      
-     @param shader_name - Name of the shader to create.
-     @param texture_node - Node to be connected to the shader.
+     @param objs_list - list of nodes to check
      
-     @return The created node.
+     @return list of nodes that do not have mesh or nurbs
     """
-    displacement_node = cmds.shadingNode('displacementShader', name = '{0}_dispShd'.format(shader_name), asShader=True)
-    setRange_node = cmds.shadingNode('setRange', name = '{0}_displacement_setRange'.format(shader_name), asUtility=True)
-    connect_attributes(texture_node, 'outColor', setRange_node, 'value')
-    connect_attributes(setRange_node, 'outValueX', displacement_node, 'displacement')
-    return displacement_node
+    from .assignment import SURFACE_TYPES
+    # One query for every object, components are checked by the node they belong to
+    nodes = sorted({obj.split('.', 1)[0] for obj in objs_list})
+    surfaces = set(cmds.ls(nodes, type=SURFACE_TYPES) or list()) | set(cmds.ls(nodes, type=SURFACE_TYPES, long=True) or list())
+    # Add any objects that are not mesh nurbsSurface objects
+    wrong_objs = [obj for obj in objs_list if obj.split('.', 1)[0] not in surfaces]
+    return wrong_objs if wrong_objs else None
 
-def create_color_correct(shader_name:str, texture_node:str, attr_type:str) -> str:
+def existing_nodes(names:list[str]) -> list[str]:
     """
-     Create colorCorrect node for shader. This is used to correct color of texture
+     Checks which of the given names are already used by nodes in the scene.
      
-     @param shader_name - name of shader to create node for
-     @param texture_node - name of texture node to create node for
-     @param attr_type - attribute type of node to create
-
-     @return The created node.
+     @param names - list of node names to look for
+     
+     @return list of names that already exist in the scene
     """
-    shader_type = cmds.nodeType(shader_name)
-    node_name = '{0}_{1}'.format(shader_name, attr_type)
-    # Creates a color correct node for the shader type.
-    if shader_type.startswith('ai'):
-        color_correct_node = create_nodes('aiColorCorrect', node_name)
-        connect_attributes(texture_node, 'outColor', color_correct_node, 'input')
-    else:
-        color_correct_node = create_nodes('colorCorrect', node_name)
-        connect_attributes(texture_node, 'outColor', color_correct_node, 'inColor')
-    return color_correct_node
+    if not names:
+        return list()
+    return cmds.ls(names) or list()
 
-def create_range(shader_name:str, texture_node:str, attr_type:str) -> str:
+def get_node_type(node:str) -> str:
     """
-     Create a range node to be used.
+     Get the type of a node.
      
-     @param shader_name - name of the shader to be used
-     @param texture_node - name of the texture node to be used
-     @param attr_type - type of attribute to be used
+     @param node - name of the node
      
-     @return name of the created node or the shader name
+     @return type of the node
     """
-    shader_type = cmds.nodeType(shader_name)
-    node_name = '{0}_{1}'.format(shader_name, attr_type)
-    # If shader_type starts with ai return shader_name
-    if shader_type.startswith('ai'):
-        color_correct_node = create_nodes('aiRange', node_name)
-        connect_attributes(texture_node, 'outColor', color_correct_node, 'input')
-    else:
-        return shader_name
-    return color_correct_node
+    return cmds.nodeType(node)
 
-def create_nodes(node_type:str, name:str) -> str:
+def execute_plan(plan) -> dict:
     """
-     Create shading nodes of type node_type.
+     Create the nodes, set the attributes and make the connections of a NetworkPlan in one undo chunk.
+     If a command fails the nodes already created are deleted.
      
-     @param node_type - Type of node to create. Can be one of the following :'colorCorrect', 'setRange''
-     @param name - Name to give the node. It is used as a prefix to the node name.
+     @param plan - NetworkPlan to execute.
      
-     @return The name of the created node or None if there was an error
+     @return Dictionary of plan keys and names of the created nodes.
     """
-    return cmds.shadingNode(node_type, name = '{0}_{1}'.format(name, node_type), asUtility=True)
+    from .network_plan import TAG_ATTRIBUTE
+    from .transaction import Transaction, track_nodes
+    names = dict()
+    with Transaction('ShaderCreator'):
+        # Creates every node first, Maya can rename them so the real names are saved
+        for node in plan.nodes:
+            if node.node_type == 'shadingEngine':
+                names[node.key] = cmds.sets(name=node.name, empty=True, renderable=True, noSurfaceShader=True)
+            else:
+                names[node.key] = cmds.shadingNode(node.node_type, name=node.name, **{node.category: True})
+            track_nodes([names[node.key]])
+        # Tag the nodes so the tool can find them later
+        for node, role in plan.tags:
+            node_name = names.get(node, node)
+            cmds.addAttr(node_name, longName=TAG_ATTRIBUTE, dataType='string')
+            cmds.setAttr('{0}.{1}'.format(node_name, TAG_ATTRIBUTE), role, type='string')
+        for node, attr, value, attr_type in plan.attributes:
+            flags = {'type': attr_type} if attr_type else dict()
+            # Compound values like colors are given as one value for each child
+            values = value if isinstance(value, (tuple, list)) else (value,)
+            cmds.setAttr('{0}.{1}'.format(names.get(node, node), attr), *values, **flags)
+        for source, destination in plan.navigations:
+            cmds.defaultNavigation(connectToExisting=True, source=names.get(source, source), destination=names.get(destination, destination))
+        for out_node, out_attr, in_node, in_attr in plan.connections:
+            cmds.connectAttr('{0}.{1}'.format(names.get(out_node, out_node), out_attr), '{0}.{1}'.format(names.get(in_node, in_node), in_attr))
+    return names
 
-def dialog_window() -> list:
+def find_tagged_nodes(node_type:str|None = None) -> list[str]:
     """
-     Create and return a dialog window to select images. It is called by the command line and can be used to modify the list of images in the GUI.
+     Find every node created by the tool with one query. The template networks of network_template are left out.
      
+     @param node_type - Only return nodes of this type. None for every type.
      
-     @return The list of images in the GUI or None
+     @return List of node names.
     """
-    imageFilter = "Images Files (*.jpg *.jpeg *.tif *.png *.tga *.exr)"
-    return cmds.fileDialog2(fileFilter=imageFilter, dialogStyle=2, okc='Ok', fm=1)
+    from .network_plan import TAG_ATTRIBUTE
+    from .network_template import TEMPLATE_PREFIX
+    flags = {'type': node_type} if node_type else dict()
+    nodes = cmds.ls('*.{}'.format(TAG_ATTRIBUTE), objectsOnly=True, recursive=True, **flags) or list()
+    return [node for node in nodes if not node.rsplit(':', 1)[-1].startswith(TEMPLATE_PREFIX)]
 
-def surface_check(objs_list:list[str]) -> list[str]|None:
+def set_attributes(values:list[tuple], chunk_name:str = 'ShaderCreator') -> None:
     """
-     Checks if nodes are surfaces or nurbsSurface. This is to avoid problems with node types that don't have mesh or nurbsSurface in them.
+     Set many attributes in one undo chunk.
      
-     @param objs_list - list of nodes to check
+     @param values - List of (plug, value, type) tuples, type is the setAttr type flag or None.
+     @param chunk_name - Name of the undo chunk.
      
-     @return list of nodes that do not have mesh or nurbs
+     @return None
     """
-    wrong_objs = list()
-    # Add any objects that are not mesh nurbsSurface objects
-    for obj in objs_list:
-        # Add obj to wrong_objs list if not mesh nurbsSurface
-        if not re.findall('mesh|nurbsSurface', cmds.nodeType(obj)):
-            wrong_objs.append(obj)
-    return wrong_objs if wrong_objs else None
\ No newline at end of file
+    cmds.undoInfo(openChunk=True, chunkName=chunk_name)
+    try:
+        for plug, value, attr_type in values:
+            flags = {'type': attr_type} if attr_type else dict()
+            cmds.setAttr(plug, value, **flags)
+    finally:
+        cmds.undoInfo(closeChunk=True)
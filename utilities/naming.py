@@ -0,0 +1,260 @@
+from __future__ import annotations
+from typing import NamedTuple
+import re
+
+DEFAULT_ALIASES = {
+    'diffuse': ['Diffuse'],
+    'specular': ['Specular'],
+    'roughness': ['Roughness'],
+    'transmission': ['Transmission'],
+    'sss': ['Sss'],
+    'ssscolor': ['SssColor'],
+    'bump': ['Bump', 'Normal'],
+    'displacement': ['Displacement'],
+}
+
+# Example of a studio convention with the usual aliases of each map type
+STUDIO_ALIASES = {
+    'diffuse': ['Diffuse', 'BaseColor', 'Albedo', 'Color'],
+    'specular': ['Specular', 'Spec'],
+    'roughness': ['Roughness', 'Rough'],
+    'transmission': ['Transmission'],
+    'sss': ['Sss', 'Subsurface'],
+    'ssscolor': ['SssColor', 'SubsurfaceColor'],
+    'bump': ['Bump', 'Normal', 'Nrm'],
+    'displacement': ['Displacement', 'Height', 'Disp'],
+}
+
+DEFAULT_COLORSPACES = {
+    'srgb': 'sRGB',
+    'linear': 'scene-linear Rec.709-sRGB',
+    'acescg': 'ACEScg',
+    'raw': 'Raw',
+}
+
+VERSION_TOKEN = '<version>'
+_MISSING = object()
+
+class TextureName(NamedTuple):
+    """
+     A texture file name split in tokens by a NamingConvention.
+
+     @param root - Asset root, everything before the map type.
+     @param map_type - Map type as written in the name.
+     @param channel - Channel of the tool the map type belongs to: diffuse, bump...
+     @param version - Version number or None if the name has no version.
+     @param version_text - Version as written in the name or None.
+     @param colorspace - Maya colorspace of the colorspace suffix or None.
+     @param extension - File extension without the dot.
+     @param name - File name with extension.
+     @param udim - UDIM tile (1001, u1_v1...) or None if not a tiled texture.
+     @param end - Everything after the map type without the colorspace and with the version replaced by a token.
+    """
+    root: str
+    map_type: str
+    channel: str
+    version: int|None
+    version_text: str|None
+    colorspace: str|None
+    extension: str
+    name: str
+    udim: str|None
+    end: str
+
+    @property
+    def key(self) -> tuple:
+        """
+         Key shared by all the maps and versions of the same texture set.
+        """
+        return self.root, self.end, self.extension
+
+def _alias_pattern(alias: str) -> str:
+    """
+     Regex of an alias accepting both cases for the first letter, Diffuse -> [Dd]iffuse.
+    """
+    first = alias[0]
+    if first.isalpha():
+        return '[{0}{1}]{2}'.format(first.upper(), first.lower(), re.escape(alias[1:]))
+    return re.escape(alias)
+
+def _alias_key(text: str) -> str:
+    return text[0].lower() + text[1:]
+
+class NamingConvention(object):
+    """
+     Precompiled classifier of texture file names. All the regexes are built once when the convention is created,
+     every file name is classified only once and the tiles of a UDIM texture share the tokens of the first tile.
+
+     @param aliases - Dictionary of channels and the map type names used for them. Defaults to DEFAULT_ALIASES.
+     @param colorspaces - Dictionary of colorspace suffixes and Maya colorspaces. Defaults to DEFAULT_COLORSPACES.
+     @param version_pattern - Regex of the version token, any number of digits by default. The last token of a name is its version.
+    """
+    def __init__(self, aliases: dict|None = None, colorspaces: dict|None = None, version_pattern: str = r'[Vv]\d+'):
+        self.aliases = dict(aliases or DEFAULT_ALIASES)
+        self.colorspaces = dict(colorspaces or DEFAULT_COLORSPACES)
+        self.channels = dict()
+        for channel, names in self.aliases.items():
+            for alias in names:
+                self.channels[_alias_key(alias)] = channel
+        # Longest names first so SssColor wins over Sss
+        alternation = '|'.join(_alias_pattern(alias) for alias in sorted(self.channels, key=len, reverse=True))
+        self.map_pattern = re.compile('({})'.format(alternation))
+        self.name_pattern = re.compile(r'^(?P<root>.*?)(?P<map>{0})(?P<end>.*)\.(?P<extension>[^./]+)$'.format(alternation))
+        self.tile_pattern = re.compile(r'\d{4}$|u\d+_v\d+$')
+        self.version_pattern = re.compile(version_pattern)
+        colorspace_names = '|'.join(re.escape(suffix) for suffix in sorted(self.colorspaces, key=len, reverse=True))
+        self.colorspace_pattern = re.compile(r'[_\.\-]({0})(?=$|[_\.\-])'.format(colorspace_names), re.IGNORECASE)
+        self._cache = dict()
+        self._templates = dict()
+
+    def _last_version(self, text: str, stop: int|None = None):
+        """
+         Find the last version token of a text.
+
+         @param text - Text to look into.
+         @param stop - Position to stop looking at. Defaults to the end of the text.
+
+         @return The match of the last version token or None.
+        """
+        version_match = None
+        for version_match in self.version_pattern.finditer(text, 0, len(text) if stop is None else stop):
+            pass
+        return version_match
+
+    def _classify_template(self, file: str) -> TextureName|None:
+        """
+         Split in tokens a file name without UDIM tile. The result is cached.
+
+         @param file - File name without the tile.
+
+         @return TextureName or None if the name has no extension or map type.
+        """
+        texture_name = self._templates.get(file, _MISSING)
+        if texture_name is not _MISSING:
+            return texture_name
+        texture_name = None
+        name_match = self.name_pattern.match(file)
+        if name_match:
+            root, map_type, end, extension = name_match.group('root', 'map', 'end', 'extension')
+            version = version_text = None
+            version_match = self._last_version(file, name_match.start('extension') - 1)
+            # Replace the version so every version of the same file shares a key
+            if version_match:
+                version_text = version_match.group()
+                version = int(re.sub(r'\D', '', version_text))
+                if version_match.start() >= name_match.start('end'):
+                    start, stop = version_match.start() - name_match.start('end'), version_match.end() - name_match.start('end')
+                    end = end[:start] + VERSION_TOKEN + end[stop:]
+                elif version_match.end() <= name_match.end('root'):
+                    root = root[:version_match.start()] + VERSION_TOKEN + root[version_match.end():]
+            colorspace = None
+            colorspace_match = self.colorspace_pattern.search(end)
+            # Remove the colorspace so maps with different colorspaces share a key
+            if colorspace_match:
+                colorspace = self.colorspaces[colorspace_match.group(1).lower()]
+                end = end[:colorspace_match.start()] + end[colorspace_match.end():]
+            texture_name = TextureName(root, map_type, self.channels[_alias_key(map_type)], version, version_text, colorspace, extension, file, None, end)
+        self._templates[file] = texture_name
+        return texture_name
+
+    def classify(self, file: str) -> TextureName|None:
+        """
+         Split a texture file name in tokens.
+
+         @param file - File name to classify, without the folder.
+
+         @return TextureName or None if the name has no extension or map type.
+        """
+        texture_name = self._cache.get(file, _MISSING)
+        if texture_name is not _MISSING:
+            return texture_name
+        parts = file.rsplit('.', 2)
+        # Every tile of a UDIM texture shares the tokens of the name without the tile
+        if len(parts) == 3 and self.tile_pattern.match(parts[1]):
+            template = self._classify_template('{0}.{1}'.format(parts[0], parts[2]))
+            if template is not None:
+                texture_name = TextureName(template.root, template.map_type, template.channel, template.version, template.version_text, template.colorspace, template.extension, file, parts[1], '{0}.{1}'.format(template.end, parts[1]))
+            else:
+                texture_name = None
+        else:
+            texture_name = self._classify_template(file)
+        # Keep the caches bounded for very big libraries
+        if len(self._cache) >= 1000000:
+            self._cache.clear()
+            self._templates.clear()
+        self._cache[file] = texture_name
+        return texture_name
+
+    def classify_many(self, files: list[str]) -> list[TextureName|None]:
+        """
+         Classify many file names at once.
+
+         @param files - File names to classify, without the folder.
+
+         @return List of TextureName or None, in the same order as the files.
+        """
+        classify = self.classify
+        return [classify(file) for file in files]
+
+    def find_map_type(self, file: str) -> str|None:
+        """
+         Find the first map type written in a file name.
+
+         @param file - File name to look into.
+
+         @return The map type as written in the name or None.
+        """
+        map_match = self.map_pattern.search(file)
+        return map_match.group() if map_match else None
+
+    def find_version(self, file: str) -> int|None:
+        """
+         Find the version written in a file name.
+
+         @param file - File name to look into.
+
+         @return The version number or None.
+        """
+        texture_name = self.classify(file)
+        if texture_name is not None:
+            return texture_name.version
+        # Names without map type, the UDIM tile and extension are not part of the version
+        parts = file.rsplit('.', 2)
+        if len(parts) == 3 and self.tile_pattern.match(parts[1]):
+            file = parts[0]
+        version_match = self._last_version(file)
+        return int(re.sub(r'\D', '', version_match.group())) if version_match else None
+
+_CONVENTION = NamingConvention()
+
+def get_naming_convention() -> NamingConvention:
+    """
+     Get the naming convention used by the tool.
+
+     @return The current NamingConvention.
+    """
+    return _CONVENTION
+
+def set_naming_convention(convention: NamingConvention) -> None:
+    """
+     Change the naming convention used by the tool, for example NamingConvention(STUDIO_ALIASES).
+     The folder indexes are cleared because they were built with the previous convention.
+
+     @param convention - NamingConvention to use.
+
+     @return None
+    """
+    global _CONVENTION
+    from .texture_index import clear_index_cache
+    _CONVENTION = convention
+    clear_index_cache()
+
+def classify_texture(file: str) -> TextureName|None:
+    """
+     Split a texture file name in tokens with the current naming convention.
+
+     @param file - File name to classify, without the folder.
+
+     @return TextureName or None if the name has no extension or map type.
+    """
+    return _CONVENTION.classify(file)
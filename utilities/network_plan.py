@@ -0,0 +1,367 @@
+from __future__ import annotations
+from typing import NamedTuple
+import re
+
+ATTRIBUTES_CHANNELS = {
+    'diffuse': [
+        'color',
+        'baseColor',
+        'diffuseColor'
+                ],
+    'specular': [
+        'specular',
+        'specularReflection',
+        'specularIntensity',
+        'specularColor',
+                 ],
+    'roughness': [
+        'roughness',
+        'specularRoughness'
+        ],
+    'transmission': [
+        'transmission',
+        'transparent',
+        # 'transmissionColor',
+        ],
+    'sss': [
+        'subsurface'
+        ],
+    'ssscolor': [
+        'subsurfaceColor'
+        ],
+    'bump': [
+        'normalCamera'
+        ],
+    'displacement': [
+        'displacementShader'
+    ]
+}
+
+# String attribute added to the nodes created by the tool, its value is the role of the node: material or file:<channel>
+TAG_ATTRIBUTE = 'shaderCreatorTag'
+
+class PlanNode(NamedTuple):
+    """
+     A node to create when the plan is executed.
+
+     @param key - Id of the node inside the plan, used by the attributes and connections.
+     @param node_type - Type of node to create. shadingEngine nodes are created as sets.
+     @param name - Name requested for the node, Maya can rename it if it is already used.
+     @param category - Shading node category: asShader, asTexture or asUtility.
+    """
+    key: str
+    node_type: str
+    name: str
+    category: str
+
+class ChannelTarget(NamedTuple):
+    """
+     Where a texture channel is connected for a shader type.
+
+     @param attribute - Attribute receiving the texture.
+     @param on_sg - True if the attribute belongs to the shading group instead of the shader.
+     @param utility - Type of the utility node between the file and the attribute, None to connect the file directly.
+     @param utility_input - Attribute of the utility node receiving the file.
+     @param utility_output - Attribute of the utility node connected to the target attribute.
+     @param file_output - Attribute of the file node to connect.
+    """
+    attribute: str
+    on_sg: bool
+    utility: str|None
+    utility_input: str|None
+    utility_output: str|None
+    file_output: str
+
+NORMAL_MAP_TARGET = ChannelTarget('normalCamera', False, 'aiNormalMap', 'input', 'outValue', 'outColor')
+
+COLOR_UTILITIES = ('colorCorrect', 'aiColorCorrect')
+# Utility nodes created at their identity values and the file output used instead of them in lean networks
+LEAN_FILE_OUTPUTS = {
+    'colorCorrect': 'outColor',
+    'aiColorCorrect': 'outColor',
+    'aiRange': 'outColorR',
+}
+
+UTILITY_NAMES = {
+    'aiColorCorrect': '{shader}_{channel}_aiColorCorrect',
+    'colorCorrect': '{shader}_{channel}_colorCorrect',
+    'aiRange': '{shader}_{channel}_aiRange',
+    'bump2d': '{shader}_bump2d',
+    'aiBump2d': '{shader}_bump2d',
+    'aiNormalMap': '{shader}_normal',
+}
+
+def build_channel_mapping(shader_type: str, shader_attrs: list[str], sg_attrs: list[str]) -> dict:
+    """
+     Build the table of where each texture channel is connected for a shader type.
+     The first attribute of ATTRIBUTES_CHANNELS found wins, so the same attribute is always chosen.
+
+     @param shader_type - Type of the shader, used to choose Arnold or Maya utility nodes.
+     @param shader_attrs - Attributes of the shader type.
+     @param sg_attrs - Attributes of a shading group.
+
+     @return Dictionary of channels and ChannelTarget. Channels the shader can't receive are not included.
+    """
+    arnold = shader_type.startswith('ai')
+    mapping = dict()
+    for channel, candidates in ATTRIBUTES_CHANNELS.items():
+        attribute = next((attr for attr in candidates if attr in shader_attrs or attr in sg_attrs), None)
+        if attribute is None:
+            continue
+        on_sg = attribute not in shader_attrs
+        if channel == 'bump':
+            if arnold:
+                mapping[channel] = ChannelTarget(attribute, on_sg, 'aiBump2d', 'bumpMap', 'outValue', 'outColorR')
+            else:
+                mapping[channel] = ChannelTarget(attribute, on_sg, 'bump2d', 'bumpValue', 'outNormal', 'outColorR')
+        elif channel == 'displacement':
+            mapping[channel] = ChannelTarget(attribute, on_sg, 'displacementShader', 'displacement', 'displacement', 'outColor')
+        elif re.search('[Cc]olor', attribute):
+            if arnold:
+                mapping[channel] = ChannelTarget(attribute, on_sg, 'aiColorCorrect', 'input', 'outColor', 'outColor')
+            else:
+                mapping[channel] = ChannelTarget(attribute, on_sg, 'colorCorrect', 'inColor', 'outColor', 'outColor')
+        elif arnold:
+            mapping[channel] = ChannelTarget(attribute, on_sg, 'aiRange', 'input', 'outColorR', 'outColor')
+        else:
+            mapping[channel] = ChannelTarget(attribute, on_sg, None, None, None, 'outColorR')
+    return mapping
+
+class NetworkPlan(object):
+    """
+     Shading network described as plain data: nodes to create, attribute values and connections.
+     Nothing is created until the plan is given to mel_helper.execute_plan.
+     Attributes and connections can point to plan node keys or to names of nodes already in the scene.
+     Plan keys start with @ so they never clash with Maya node names.
+     file_keys keeps the file_reuse key of each new file node so it can be reused once it exists.
+    """
+    def __init__(self):
+        self.nodes = list()
+        self.attributes = list()
+        self.connections = list()
+        self.navigations = list()
+        self.tags = list()
+        self.file_keys = list()
+
+    def add_node(self, key: str, node_type: str, name: str, category: str = 'asUtility') -> str:
+        """
+         Add a node to create.
+
+         @param key - Id of the node inside the plan.
+         @param node_type - Type of node to create.
+         @param name - Name requested for the node.
+         @param category - Shading node category: asShader, asTexture or asUtility.
+
+         @return The key of the node.
+        """
+        self.nodes.append(PlanNode(key, node_type, name, category))
+        return key
+
+    def set_attribute(self, node: str, attr: str, value, attr_type: str|None = None) -> None:
+        """
+         Add an attribute value to set.
+
+         @param node - Plan key or name of the node.
+         @param attr - Name of the attribute.
+         @param value - Value to set.
+         @param attr_type - Type flag for setAttr, for example string. None for numeric values.
+
+         @return None
+        """
+        self.attributes.append((node, attr, value, attr_type))
+
+    def connect(self, out_node: str, out_attr: str, in_node: str, in_attr: str) -> None:
+        """
+         Add a connection between two attributes.
+
+         @param out_node - Plan key or name of the output node.
+         @param out_attr - Name of the output attribute.
+         @param in_node - Plan key or name of the input node.
+         @param in_attr - Name of the input attribute.
+
+         @return None
+        """
+        self.connections.append((out_node, out_attr, in_node, in_attr))
+
+    def tag(self, node: str, role: str) -> None:
+        """
+         Add the tool tag to a node, so it can be found later in the scene with one query.
+
+         @param node - Plan key or name of the node.
+         @param role - Value of the tag, for example material or file:diffuse.
+
+         @return None
+        """
+        self.tags.append((node, role))
+
+    def navigate(self, source: str, destination: str) -> None:
+        """
+         Add a default navigation connection, used to connect placement nodes to file nodes.
+
+         @param source - Plan key or name of the source node.
+         @param destination - Plan key or name of the destination node.
+
+         @return None
+        """
+        self.navigations.append((source, destination))
+
+def plan_shader(plan: NetworkPlan, name: str, node_type: str) -> tuple:
+    """
+     Add a shader and its shading group to the plan.
+
+     @param plan - Plan to fill.
+     @param name - Name of the shader.
+     @param node_type - Type of the shader.
+
+     @return Tuple with the plan keys of the material and the shading group.
+    """
+    material = plan.add_node('@material', node_type, name, 'asShader')
+    plan.tag(material, 'material')
+    sg = plan.add_node('@sg', 'shadingEngine', '{}_SG'.format(name), 'asShader')
+    plan.connect(material, 'outColor', sg, 'surfaceShader')
+    return material, sg
+
+def is_normal_map(path: str|None, header=None) -> bool:
+    """
+     Tell a normal map from a bump or height map. A Bump, Height or Normal token in the file name decides, height maps
+     are often saved as RGB. The channels of the header only decide when the name doesn't, and a single channel image
+     is never a normal map.
+
+     @param path - Path of the texture.
+     @param header - image_header.ImageHeader of the texture or None.
+
+     @return True for a normal map.
+    """
+    if header is not None and header.channels < 3:
+        return False
+    file = (path or '').replace('\\', '/').rsplit('/', 1)[-1]
+    if re.search('bump|height', file, re.IGNORECASE):
+        return False
+    if re.search('normal', file, re.IGNORECASE):
+        return True
+    if header is not None:
+        return header.channels >= 3
+    return True
+
+def file_output(output: str, header=None) -> str:
+    """
+     Choose the plug of a file node from the channels of its image. A greyscale image gives its value to a scalar input
+     through outAlpha, file_settings turns alphaIsLuminance on for it. Color images keep outColor or outColorR.
+
+     @param output - Plug of the channel mapping, outColor for color inputs and outColorR for scalar ones.
+     @param header - image_header.ImageHeader of the texture or None.
+
+     @return Name of the file node attribute to connect.
+    """
+    if output == 'outColorR' and header is not None and header.channels in (1, 2):
+        return 'outAlpha'
+    return output
+
+def plan_textures(plan: NetworkPlan, shader: str, sg: str, textures: dict, mapping: dict, shader_name: str|None = None, headers: dict|None = None, file_nodes=None, share_placement: bool = False, lean: bool = False) -> None:
+    """
+     Add the texture network of each texture to the plan.
+
+     @param plan - Plan to fill.
+     @param shader - Plan key or name of the shader to connect to.
+     @param sg - Plan key or name of the shading group, used for the displacement.
+     @param textures - Dictionary of map types and paths to connect.
+     @param mapping - Channel mapping of the shader type, from build_channel_mapping.
+     @param shader_name - Name used as prefix of the new nodes. Defaults to shader.
+     @param headers - Dictionary of paths and image_header.ImageHeader, used for the file settings, the bump type and the
+     plug of the file node.
+     @param file_nodes - File nodes to reuse, a dictionary or file_reuse.FileNodeIndex of file_node_key and node names. None to always create new file nodes.
+     @param share_placement - True to use one place2dTexture for every new file node of the material.
+     @param lean - True to connect the files straight to the shader instead of going through color correct and range nodes at their default values.
+
+     @return None
+    """
+    from .path_helper import path_udim
+    from .image_header import file_settings
+    from .image_header import SRGB_COLORSPACE
+    from .naming import classify_texture
+    from .file_reuse import file_node_key
+    shader_name = shader_name or shader
+    headers = headers or dict()
+    planned_files = dict()
+    placement_node = None
+    # Creates a texture file for each texture attribute.
+    for attr, value in textures.items():
+        target = mapping.get(attr)
+        # If the shader has no attribute for the texture.
+        if not target:
+            continue
+        settings = dict()
+        key = None
+        # Check path before adding to the node for UDIM format
+        if value:
+            file_path, udim_format = path_udim(value)
+            # Colorspace and alpha from the image header, a colorspace in the file name wins
+            texture_name = classify_texture(value.replace('\\', '/').rsplit('/', 1)[-1])
+            colorspace = texture_name.colorspace if texture_name else None
+            settings = file_settings(headers.get(value), target.utility in COLOR_UTILITIES, colorspace)
+            key = file_node_key(file_path, udim_format, settings.get('colorSpace', SRGB_COLORSPACE))
+        # Reuse a file node reading the same texture the same way
+        file_node = None
+        if file_nodes is not None and key is not None:
+            file_node = planned_files.get(key) or file_nodes.get(key)
+        if file_node is None:
+            file_node = plan.add_node('@file_{}'.format(attr), 'file', '{0}_{1}'.format(shader_name, attr), 'asTexture')
+            plan.tag(file_node, 'file:{}'.format(attr))
+            if value:
+                plan.set_attribute(file_node, 'fileTextureName', file_path, 'string')
+                if udim_format:
+                    plan.set_attribute(file_node, 'uvTilingMode', udim_format)
+                for setting, setting_value in settings.items():
+                    plan.set_attribute(file_node, setting, setting_value, 'string' if setting == 'colorSpace' else None)
+                plan.file_keys.append((file_node, key))
+                planned_files[key] = file_node
+            # Adds the 2d placement for the file node, the material can share one for all its files
+            if share_placement:
+                if placement_node is None:
+                    placement_node = plan.add_node('@place2d', 'place2dTexture', 'place2d_{0}'.format(shader_name), 'asTexture')
+                plan.navigate(placement_node, file_node)
+            else:
+                plan.navigate(plan.add_node('@place2d_{}'.format(attr), 'place2dTexture', 'place2d_{0}_{1}'.format(shader_name, attr), 'asTexture'), file_node)
+        destination = sg if target.on_sg else shader
+        # The displacement goes through a set range and a displacement shader.
+        if target.utility == 'displacementShader':
+            displacement_node = plan.add_node('@displacement', 'displacementShader', '{0}_dispShd'.format(shader_name), 'asShader')
+            set_range_node = plan.add_node('@displacement_setRange', 'setRange', '{0}_displacement_setRange'.format(shader_name))
+            plan.connect(file_node, target.file_output, set_range_node, 'value')
+            plan.connect(set_range_node, 'outValueX', displacement_node, target.utility_input)
+            plan.connect(displacement_node, target.utility_output, destination, target.attribute)
+            continue
+        # Utility nodes at their default values don't change the texture
+        if lean and target.utility in LEAN_FILE_OUTPUTS:
+            target = target._replace(utility=None, utility_input=None, utility_output=None, file_output=LEAN_FILE_OUTPUTS[target.utility])
+        # The header picks the plug of the file, a greyscale image has no red channel of its own
+        target = target._replace(file_output=file_output(target.file_output, headers.get(value)))
+        if not target.utility:
+            plan.connect(file_node, target.file_output, destination, target.attribute)
+            continue
+        # If the file is a bump file or a normal map it will use different type of node.
+        if target.utility == 'aiBump2d' and is_normal_map(value, headers.get(value)):
+            target = NORMAL_MAP_TARGET._replace(attribute=target.attribute, on_sg=target.on_sg)
+        utility_node = plan.add_node('@utility_{}'.format(attr), target.utility, UTILITY_NAMES[target.utility].format(shader=shader_name, channel=attr))
+        plan.connect(file_node, target.file_output, utility_node, target.utility_input)
+        plan.connect(utility_node, target.utility_output, destination, target.attribute)
+
+def plan_material(name: str, node_type: str, textures: dict, mapping: dict, headers: dict|None = None, file_nodes=None, share_placement: bool = False, lean: bool = False) -> NetworkPlan:
+    """
+     Plan a full material: shader, shading group and texture networks.
+
+     @param name - Name of the shader.
+     @param node_type - Type of the shader.
+     @param textures - Dictionary of map types and paths to connect.
+     @param mapping - Channel mapping of the shader type, from build_channel_mapping.
+     @param headers - Dictionary of paths and image_header.ImageHeader.
+     @param file_nodes - File nodes to reuse, see plan_textures.
+     @param share_placement - True to use one place2dTexture for every new file node of the material.
+     @param lean - True to skip the color correct and range nodes, see plan_textures.
+
+     @return The NetworkPlan of the material.
+    """
+    plan = NetworkPlan()
+    material, sg = plan_shader(plan, name, node_type)
+    plan_textures(plan, material, sg, textures, mapping, shader_name=name, headers=headers, file_nodes=file_nodes, share_placement=share_placement, lean=lean)
+    return plan
@@ -0,0 +1,144 @@
+from __future__ import annotations
+import hashlib
+import re
+
+TEMPLATE_PREFIX = 'shaderCreatorTemplate'
+# Role of the template nodes, so the tool doesn't mistake them for materials and file nodes in use
+TEMPLATE_ROLE = 'template:{}'
+_TEMPLATES = dict()
+
+def plan_signature(plan) -> tuple|None:
+    """
+     Get the topology of a plan: its nodes, connections and tags without names and attribute values.
+     Plans with the same signature only differ in names and values, so one can be duplicated into the other.
+
+     @param plan - NetworkPlan.
+
+     @return The signature, None if the plan can't be built from a template: it connects to nodes already in the
+     scene or has nodes not upstream of its shading group.
+    """
+    keys = {node.key for node in plan.nodes}
+    links = [(out_node, in_node) for out_node, _, in_node, _ in plan.connections] + list(plan.navigations)
+    if any(out_node not in keys or in_node not in keys for out_node, in_node in links):
+        return None
+    if any(node not in keys for node, _ in plan.tags) or any(node not in keys for node, _, _, _ in plan.attributes):
+        return None
+    # Every node has to be duplicated with the root
+    root = _root(plan)
+    upstream = {root}
+    pending = [root]
+    while pending:
+        node = pending.pop()
+        for out_node, in_node in links:
+            if in_node == node and out_node not in upstream:
+                upstream.add(out_node)
+                pending.append(out_node)
+    if upstream != keys:
+        return None
+    return tuple((node.key, node.node_type, node.category) for node in plan.nodes), tuple(plan.connections), tuple(plan.navigations), tuple(plan.tags)
+
+def _root(plan) -> str:
+    """
+     Get the key of the node the network is duplicated from, the shading group or else the first node.
+    """
+    for node in plan.nodes:
+        if node.node_type == 'shadingEngine':
+            return node.key
+    return plan.nodes[0].key
+
+def _templates() -> dict:
+    """
+     Get the templates of the current commands backend, a new backend has a new scene.
+    """
+    from .maya_backend import get_backend
+    backend = get_backend()
+    if _TEMPLATES.get('backend') is not backend:
+        _TEMPLATES['backend'] = backend
+        _TEMPLATES['templates'] = dict()
+    return _TEMPLATES['templates']
+
+def build_template(plan, signature: tuple) -> dict:
+    """
+     Create the template network of a plan: the same nodes and connections without attribute values, tagged as template.
+
+     @param plan - NetworkPlan.
+     @param signature - Signature of the plan, from plan_signature.
+
+     @return Dictionary of template node names and plan keys.
+    """
+    from .mel_helper import execute_plan
+    from .network_plan import NetworkPlan
+    prefix = '{0}{1}_'.format(TEMPLATE_PREFIX, hashlib.sha1(repr(signature).encode('utf-8')).hexdigest()[:8])
+    template = NetworkPlan()
+    for node in plan.nodes:
+        # The trailing underscore keeps the number Maya adds to the duplicates apart from the name
+        template.add_node(node.key, node.node_type, '{0}{1}_'.format(prefix, node.key.strip('@')), node.category)
+    for node, role in plan.tags:
+        template.tag(node, TEMPLATE_ROLE.format(role))
+    template.connections = list(plan.connections)
+    template.navigations = list(plan.navigations)
+    names = execute_plan(template)
+    return {name: key for key, name in names.items()}
+
+def execute_template(plan) -> dict:
+    """
+     Create a NetworkPlan by duplicating a template network of the same topology, then renaming the copies and
+     setting their attributes, all in one undo chunk. The template is built the first time its topology is used.
+     If a command fails the copies are deleted.
+     Plans that can't come from a template are given to mel_helper.execute_plan.
+     A template material needs about a third fewer commands, but Maya renames one node for each command and the
+     duplicate copies every placement connection. The benchmark measures it at less than half the speed of
+     execute_plan, so the tool builds its materials with execute_plan and this is only kept to be measured.
+
+     @param plan - NetworkPlan to execute.
+
+     @return Dictionary of plan keys and names of the created nodes.
+    """
+    from .mel_helper import cmds, execute_plan
+    from .network_plan import TAG_ATTRIBUTE
+    from .transaction import Transaction
+    signature = plan_signature(plan)
+    if signature is None:
+        return execute_plan(plan)
+    templates = _templates()
+    template = templates.get(signature)
+    root_key = _root(plan)
+    # The template can be deleted with the scene or by the user
+    if template is None or not cmds.objExists(next(name for name, key in template.items() if key == root_key)):
+        template = templates[signature] = build_template(plan, signature)
+    root = next(name for name, key in template.items() if key == root_key)
+    requested = {node.key: node.name for node in plan.nodes}
+    names = dict()
+    with Transaction('ShaderCreator') as transaction:
+        transaction.created.extend(cmds.duplicate(root, upstreamNodes=True))
+        # The copies are tracked by their new names as they are renamed
+        for index, copy in enumerate(list(transaction.created)):
+            # Maya adds a number to the name of each copy
+            key = template.get(re.sub(r'\d+$', '', copy.rsplit('|', 1)[-1]))
+            if key is not None:
+                names[key] = transaction.created[index] = cmds.rename(copy, requested[key])
+        for node, role in plan.tags:
+            cmds.setAttr('{0}.{1}'.format(names[node], TAG_ATTRIBUTE), role, type='string')
+        for node, attr, value, attr_type in plan.attributes:
+            flags = {'type': attr_type} if attr_type else dict()
+            values = value if isinstance(value, (tuple, list)) else (value,)
+            cmds.setAttr('{0}.{1}'.format(names[node], attr), *values, **flags)
+    return names
+
+def clear_templates(delete: bool = True) -> int:
+    """
+     Forget the template networks, the next materials build them again.
+
+     @param delete - True to delete the template nodes from the scene.
+
+     @return Number of template nodes deleted.
+    """
+    from .mel_helper import cmds
+    templates = _templates()
+    nodes = list()
+    if delete:
+        nodes = [name for template in templates.values() for name in template if cmds.objExists(name)]
+        if nodes:
+            cmds.delete(nodes)
+    templates.clear()
+    return len(nodes)
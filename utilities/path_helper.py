@@ -1,6 +1,5 @@
 from __future__ import annotations
 import re
-import os
 
 def path_udim(file_path: str) -> tuple:
     """
@@ -29,63 +28,114 @@ def path_udim(file_path: str) -> tuple:
             udim_attr = 2
     return file_path, udim_attr
 
-def path_look_relatives(file_path: str) -> dict:
+def path_look_relatives(file_path: str, version: int|None = None) -> dict:
     """
      Look for relatives in a path and return a dictionary. This is a helper function for path_look ()
      
      @param file_path - path to look for relatives
+     @param version - Version to pin the files to, the closest older version is used if a map doesn't have it. None for the latest
      
-     @return dict with relative paths as keys and lists of file
+     @return dict with the channels (diffuse, bump...) as keys and the latest version of each file
     """
+    from .texture_index import get_directory_index
     # Split the path and file name of the given path
     path, file = file_path.rsplit("/", 1)
-    # Look if the giving file has an specific map type
-    map_type = re.search('([Dd]iffuse)|([Ss]pecular)|([Rr]oughness)|([Tt]ransmission)|([Ss]ssColor)|([Ss]ss)|([Bb]ump)|([Dd]isplacement)', file)
-    if map_type:
-        # Look for all the file in the same path of the file given
-        files_found = [file_found for file_found in os.listdir(path) if os.path.isfile(os.path.join(path,file_found))]
-        file_name, file_extension = file.rsplit('.', 1)
-        file_version = re.search('([Vv]\d{2})', file_name)
-        file_name = file_name.replace(file_version.group(), '([Vv]\d{2})')
-        file_root, file_end = file_name.split(map_type.group())
-        re_pattern = r'{0}(([Dd]iffuse)|([Ss]pecular)|([Rr]oughness)|([Tt]ransmission)|([Ss]ssColor)|([Ss]ss)|([Bb]ump)|([Nn]ormal)|([Dd]isplacement)){1}.{2}'.format(file_root, file_end, file_extension)
-        re_compile = re.compile(re_pattern)
-        files_relative = dict()
-        
-        # Loop through the files looking for a pattern similar of the given file
-        for file in files_found:
-            re_match = re.search(re_compile, file)
-            if re_match:
-                map_type = (re.search('([Dd]iffuse)|([Ss]pecular)|([Rr]oughness)|([Tt]ransmission)|([Ss]ssColor)|([Ss]ss)|([Bb]ump)|([Nn]ormal)|([Dd]isplacement)', file)).group()
-                if re.search('([Nn]ormal)', map_type):
-                    map_type = 'Bump'
-                if not files_relative.get(map_type):
-                    files_relative[map_type] = list()
-                files_relative[map_type].append('{0}/{1}'.format(path,file))
-        # Returns a dictionary of the map type and path founded
-        files_latest_version = file_latest_version(files_relative)
-        return files_latest_version
+    # Look for all the files in the same path of the file given using the cached folder index
+    index = get_directory_index(path)
+    record = index.records.get(file)
+    # The given file needs a map type and a version to look for relatives
+    if record and record.version is not None:
+        # The version history of each map is sorted once for each folder scan
+        histories = index.histories(record.key)
+        if version is None:
+            return {map_type: history.latest() for map_type, history in histories.items()}
+        files_pinned = {map_type: history.pin(version) for map_type, history in histories.items()}
+        return {map_type: found for map_type, found in files_pinned.items() if found}
     
+def _files_histories(files_dict: dict) -> dict:
+    """
+     Build the version history of each map type of a dictionary of map types and lists of files.
+    """
+    from .naming import get_naming_convention
+    from .versions import VersionHistory
+    convention = get_naming_convention()
+    histories = dict()
+    for map_type, files in files_dict.items():
+        history = VersionHistory()
+        for file in files:
+            name = file.rsplit('/', 1)[-1]
+            record = convention.classify(name)
+            if record is not None and record.version is not None:
+                history.add(record.version, file, (record.udim or '', record.extension, name))
+                continue
+            version = convention.find_version(name)
+            if version is not None:
+                history.add(version, file, ('', '', name))
+        histories[map_type] = history
+    return histories
+
 def file_latest_version(files_dict: dict) -> dict:
     """
      Given a dictionary of map types and a list of files find the latest version
      
      @param files_dict - Dictionary of map types and lists of files
      
-     @return Dictionary of map types and latest version of each file
+     @return Dictionary of map types and latest version of each file. The first file is used if none has a version
     """
     files_latest_version = dict()
-    # This function will find the latest version of the files in the files_dict and update the files_latest_version map_type.
-    for map_type, files in files_dict.items():
-        current_version = int()
-        latest_version = str()
-        # Find the latest version of the given files.
-        for file in files:
-            re_match = re.search('([Vv]\d{2})', file)
-            match_version = int(re_match.group()[1:])
-            # Set current_version to the latest version
-            if match_version > current_version:
-                current_version = match_version
-                latest_version = file
-        files_latest_version[map_type] = latest_version
-    return files_latest_version
\ No newline at end of file
+    # Every name is parsed only once, v00 and versions of any width are valid.
+    for map_type, history in _files_histories(files_dict).items():
+        latest_version = history.latest()
+        if latest_version is None and files_dict[map_type]:
+            latest_version = sorted(files_dict[map_type])[0]
+        files_latest_version[map_type] = latest_version or str()
+    return files_latest_version
+
+def file_pinned_version(files_dict: dict, version: int) -> dict:
+    """
+     Given a dictionary of map types and a list of files find the files of a version
+     
+     @param files_dict - Dictionary of map types and lists of files
+     @param version - Version to look for. The closest older version is used if a map doesn't have it
+     
+     @return Dictionary of map types and files. Map types without a version at or before the given one are not included
+    """
+    files_pinned = {map_type: history.pin(version) for map_type, history in _files_histories(files_dict).items()}
+    return {map_type: found for map_type, found in files_pinned.items() if found}
+
+def discover_texture_sets(root_folder: str, recursive: bool = True) -> dict:
+    """
+     Group the textures of a folder by asset root to build one material per asset.
+     
+     @param root_folder - Folder to look for textures.
+     @param recursive - True to look in the sub folders too.
+     
+     @return Dictionary of material names and dictionaries of map types and latest version of each file
+    """
+    from .texture_index import get_directory_index
+    from .naming import VERSION_TOKEN
+    from .versions import build_histories
+    texture_sets = dict()
+    folders = [root_folder.replace('\\', '/').rstrip('/')]
+    # Look in every folder only once using the cached folder index
+    while folders:
+        path = folders.pop(0)
+        index = get_directory_index(path)
+        if recursive:
+            folders.extend('{0}/{1}'.format(path, folder) for folder in index.folders)
+        assets = dict()
+        # Group every versioned file by the asset root and map type
+        for record in index.records.values():
+            if record.version is None:
+                continue
+            asset = record.root.replace(VERSION_TOKEN, '').rstrip('_.- ') or path.rsplit('/', 1)[-1]
+            assets.setdefault(asset, list()).append(record)
+        for asset, records in sorted(assets.items()):
+            # Keep the latest version, the first tile and extension win if there are many
+            histories = build_histories(records, path)
+            textures = {map_type: histories[map_type].latest() for map_type in sorted(histories)}
+            # Assets with the same name in different folders are kept apart by the folder name
+            if asset in texture_sets:
+                asset = '{0}_{1}'.format(path.rsplit('/', 1)[-1], asset)
+            texture_sets[asset] = textures
+    return texture_sets
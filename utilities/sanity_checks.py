@@ -12,8 +12,12 @@ def main_sanity_checks(name:str, objs_list: list[str], textures: dict) -> str:
      @return Error message or empty string if everything is OK
     """
     from .mel_helper import surface_check
+    from .texture_validation import validate_textures
     error_message = ""
     surface_error = list()
+    empty_textures = list()
+    path_not_found = list()
+    texture_errors = list()
     # Check if the name is valid
     name_error = name_check(name)
     # Check if the surface is valid.
@@ -22,7 +26,10 @@ def main_sanity_checks(name:str, objs_list: list[str], textures: dict) -> str:
     # Check if the path is empty or not.
     if textures:
         empty_textures = path_is_empty_check(textures)
-        path_not_found = path_exists_check(textures)
+        # Every file and UDIM tile is checked in one pass
+        texture_checks = validate_textures(textures)
+        path_not_found = ['{0}: {1}'.format(check.map_type, check.path) for check in texture_checks.values() if check.missing]
+        texture_errors = [error for check in texture_checks.values() if not check.missing for error in check.errors()]
 
     # Add text if there is some errors found, depending where it didn't pass the sanity check.
     # If name_error is true the name is not a name error message.
@@ -37,6 +44,9 @@ def main_sanity_checks(name:str, objs_list: list[str], textures: dict) -> str:
     # If path_not_found is true the path is not found in your computer.
     if path_not_found:
         error_message = '{0}<br /><font color="orange", size="25"><b>Path not Found Warning:</b></font><br />There are some files that doesn\'t exist in your computer, select an existing one.<br /><font color="red", size="4"><b>{1}</b></font><br />'.format(error_message,"<br />".join(path_not_found))
+    # If texture_errors is set some tiles are missing or some files can't be read.
+    if texture_errors:
+        error_message = '{0}<br /><font color="orange", size="25"><b>Texture Files Warning:</b></font><br />There are some missing tiles, empty files or images that can\'t be read.<br /><font color="red", size="4"><b>{1}</b></font><br />'.format(error_message,"<br />".join(texture_errors))
 
     return error_message
 
@@ -71,10 +81,10 @@ def path_exists_check(textures: dict) -> list[str]:
      
      @param textures - dictionary of map types and paths
      
-     @return list of paths that don't exist in file
+     @return list of paths that don't exist in file. UDIM paths are missing if none of their tiles exist.
     """
-    import os
-    path_not_found = ['{0}: {1}'.format(map_type, texture_path) for map_type,texture_path in textures.items() if texture_path and not os.path.isfile(texture_path)]
+    from .texture_validation import validate_textures
+    path_not_found = ['{0}: {1}'.format(check.map_type, check.path) for check in validate_textures(textures).values() if check.missing]
     return path_not_found
 
 def file_bad_naming(file: str) -> str:
@@ -85,15 +95,48 @@ def file_bad_naming(file: str) -> str:
      
      @return Error message. The error message is a human readable string
     """
+    from .naming import get_naming_convention
     error_message = "<b>{}</b><br />".format(file)
-    map_type = re.search('([Dd]iffuse)|([Ss]pecular)|([Rr]oughness)|([Tt]ransmission)|([Ss]ssColor)|([Ss]ss)|([Bb]ump)|([Dd]isplacement)', file)
-    file_version = re.search('([Vv]\d{2})', file)
+    convention = get_naming_convention()
+    map_type = convention.find_map_type(file)
+    file_version = convention.find_version(file)
     # If map_type is not set the map type is missing.
     if not map_type:
         error_message = '{}<font color="red">Missing the map type in the texture file name. For example: Diffuse</font><br />'.format(error_message)
     # If file_version is not set to v01 or V01
-    if not file_version:
+    if file_version is None:
         error_message = '{}<font color="red">Missing the file version. For example v01</font><br />'.format(error_message)
     error_message = '{}<b>Auto-search disable to load textures manually.</b><br />'.format(error_message)
     return error_message
 
+def batch_sanity_checks(texture_sets: dict) -> dict:
+    """
+     Performs the sanity checks of many materials at once. The scene is queried only once for all the names.
+     
+     @param texture_sets - Dictionary of material names and dictionaries of map types and paths
+     
+     @return Dictionary of material names and lists of errors found. Materials without errors are not included
+    """
+    from .mel_helper import existing_nodes
+    from .texture_validation import validate_texture_sets
+    batch_errors = dict()
+    # Check the files of every material in one pass
+    texture_checks = validate_texture_sets(texture_sets)
+    # Look for every material and shading group name in the scene in one query
+    names = list(texture_sets.keys())
+    names.extend(['{}_SG'.format(name) for name in texture_sets.keys()])
+    nodes_found = set(existing_nodes(names))
+    for name, textures in texture_sets.items():
+        errors = list()
+        # Check if the name is valid
+        if name_check(name):
+            errors.append('There are some special characters in the name: {}'.format(name))
+        if name in nodes_found or '{}_SG'.format(name) in nodes_found:
+            errors.append('There is already a node named: {}'.format(name))
+        # Check if the path is empty or not.
+        if textures:
+            errors.extend(['Empty texture path: {}'.format(map_type) for map_type in path_is_empty_check(textures)])
+            errors.extend([error for check in texture_checks[name].values() for error in check.errors()])
+        if errors:
+            batch_errors[name] = errors
+    return batch_errors
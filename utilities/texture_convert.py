@@ -0,0 +1,342 @@
+from __future__ import annotations
+from typing import NamedTuple
+from contextlib import contextmanager
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+
+MANIFEST_NAME = '.shader_creator_convert.json'
+MAKETX_COMMAND = ('maketx', '-v', '-u', '--oiio', '--monochrome-detect', '{input}', '-o', '{output}')
+
+class ConverterSettings(NamedTuple):
+    """
+     Command used to convert the textures.
+
+     @param command - Command and arguments, {input} and {output} are replaced by the paths of each file.
+     @param extension - Extension of the converted files.
+     @param workers - Number of processes. None for the number of CPUs.
+    """
+    command: tuple = MAKETX_COMMAND
+    extension: str = 'tx'
+    workers: int|None = None
+
+    @property
+    def key(self) -> str:
+        """
+         Hash of the settings that change the converted files.
+        """
+        return hashlib.sha1(json.dumps([list(self.command), self.extension]).encode('utf-8')).hexdigest()
+
+class ConversionResult(NamedTuple):
+    """
+     Result of the conversion of one file.
+
+     @param source - Path of the texture.
+     @param output - Path of the converted texture.
+     @param status - converted, skipped (content and settings unchanged or already in the converted format) or failed.
+     @param seconds - Time spent on the file, hashing included.
+     @param source_bytes - Size of the texture.
+     @param output_bytes - Size of the converted texture, 0 if it failed.
+     @param error - Error message if it failed.
+    """
+    source: str
+    output: str
+    status: str
+    seconds: float
+    source_bytes: int
+    output_bytes: int
+    error: str|None
+
+def python_executable() -> str:
+    """
+     Get the Python interpreter for child processes. Inside Maya it is mayapy, not the Maya executable.
+
+     @return Path of the interpreter.
+    """
+    executable = sys.executable
+    name = os.path.basename(executable).lower()
+    if name.startswith('maya') and not name.startswith('mayapy'):
+        mayapy = os.path.join(os.path.dirname(executable), 'mayapy' + ('.exe' if name.endswith('.exe') else ''))
+        if os.path.isfile(mayapy):
+            return mayapy
+    return executable
+
+@contextmanager
+def process_pool(workers: int|None = None, initializer=None, initargs: tuple = ()):
+    """
+     Open a pool of spawned processes running python_executable. The executable of multiprocessing is global, it is
+     only changed while the pool is open and put back after, so the host application keeps its own.
+
+     @param workers - Number of processes. None for the number of CPUs.
+     @param initializer - Function run once in each process.
+     @param initargs - Arguments of the initializer.
+
+     @return Context manager giving a ProcessPoolExecutor.
+    """
+    import multiprocessing
+    from multiprocessing import spawn
+    from concurrent.futures import ProcessPoolExecutor
+    context = multiprocessing.get_context('spawn')
+    previous = spawn.get_executable()
+    # The processes are started as work arrives, the executable stays set until the pool is closed
+    context.set_executable(python_executable())
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=initializer, initargs=initargs) as executor:
+            yield executor
+    finally:
+        context.set_executable(previous)
+
+def stand_in_settings(workers: int|None = None) -> ConverterSettings:
+    """
+     Settings of a stand in converter that copies the files, to run the stage where maketx isn't installed.
+
+     @param workers - Number of processes.
+
+     @return ConverterSettings.
+    """
+    return ConverterSettings((python_executable(), '-c', 'import shutil, sys; shutil.copyfile(sys.argv[1], sys.argv[2])', '{input}', '{output}'), 'tx', workers)
+
+def output_path(source: str, extension: str) -> str:
+    """
+     Path of the converted texture: same folder and name, UDIM tile included, with the new extension.
+
+     @param source - Path of the texture.
+     @param extension - Extension of the converted files.
+
+     @return Path of the converted texture.
+    """
+    return '{0}.{1}'.format(source.rsplit('.', 1)[0], extension)
+
+def file_hash(path: str) -> str:
+    """
+     Hash the content of a file.
+
+     @param path - File to hash.
+
+     @return Hexadecimal digest.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as source_file:
+        for block in iter(lambda: source_file.read(1048576), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _convert_job(job: tuple) -> tuple:
+    """
+     Convert one file in a worker process.
+
+     @param job - Tuple with the source, output, command and the hash of the last conversion with the same settings or None.
+
+     @return Tuple with the ConversionResult fields and the content hash.
+    """
+    source, output, command, known_hash = job
+    start = time.perf_counter()
+    source_bytes = 0
+    arguments = [argument.format(input=source, output=output) for argument in command]
+    # The texture can be deleted or locked after it was found, only this file fails
+    try:
+        source_bytes = os.path.getsize(source)
+        content_hash = file_hash(source)
+        # Same content converted with the same settings
+        if content_hash == known_hash and os.path.isfile(output):
+            return (source, output, 'skipped', time.perf_counter() - start, source_bytes, os.path.getsize(output), None), content_hash
+        process = subprocess.run(arguments, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except OSError as err:
+        return (source, output, 'failed', time.perf_counter() - start, source_bytes, 0, str(err)), None
+    if process.returncode or not os.path.isfile(output):
+        error = process.stderr.decode('utf-8', 'replace').strip().splitlines()[-1:] or ['exit code {}'.format(process.returncode)]
+        return (source, output, 'failed', time.perf_counter() - start, source_bytes, 0, error[0]), None
+    return (source, output, 'converted', time.perf_counter() - start, source_bytes, os.path.getsize(output), None), content_hash
+
+def _load_manifest(folder: str) -> dict:
+    try:
+        with open(os.path.join(folder, MANIFEST_NAME)) as manifest_file:
+            return json.load(manifest_file)
+    except (OSError, ValueError):
+        return dict()
+
+def _save_manifest(folder: str, manifest: dict) -> None:
+    path = os.path.join(folder, MANIFEST_NAME)
+    try:
+        with open('{}.tmp'.format(path), 'w') as manifest_file:
+            json.dump(manifest, manifest_file, indent=1, sort_keys=True)
+        os.replace('{}.tmp'.format(path), path)
+    except OSError:
+        pass
+
+def texture_files(paths: list[str]) -> list[str]:
+    """
+     Expand texture paths to the files to convert, every tile of the UDIM paths.
+
+     @param paths - Texture paths, they can have UDIM tokens or be one tile of a UDIM texture.
+
+     @return Sorted list of existing files without duplicates.
+    """
+    from .texture_validation import expand_udim_path
+    files = set()
+    for path in paths:
+        if not path:
+            continue
+        tiles = expand_udim_path(path)
+        if tiles:
+            files.update(tiles.values())
+        elif os.path.isfile(path):
+            files.add(path)
+    return sorted(file.replace('\\', '/') for file in files)
+
+def convert_textures(paths: list[str], settings: ConverterSettings|None = None) -> list[ConversionResult]:
+    """
+     Convert textures to tiled mipmaps on a process pool. Files whose content and settings didn't change since
+     the last conversion are skipped, each folder keeps a manifest with the hashes.
+
+     @param paths - Texture paths, UDIM paths are expanded to their tiles.
+     @param settings - Converter settings. Defaults to maketx.
+
+     @return List of ConversionResult in the same order as the files.
+    """
+    settings = settings or ConverterSettings()
+    files = texture_files(paths)
+    manifests = dict()
+    results = dict()
+    jobs = list()
+    for source in files:
+        folder, name = source.rsplit('/', 1)
+        if folder not in manifests:
+            manifests[folder] = _load_manifest(folder)
+        output = output_path(source, settings.extension)
+        entry = manifests[folder].get(name)
+        try:
+            stat = os.stat(source)
+        except OSError as err:
+            results[source] = ConversionResult(source, output, 'failed', 0.0, 0, 0, str(err))
+            continue
+        # The texture is already converted, maketx would overwrite its own input
+        if name.rsplit('.', 1)[-1].lower() == settings.extension.lower():
+            results[source] = ConversionResult(source, source, 'skipped', 0.0, stat.st_size, stat.st_size, None)
+            continue
+        known_hash = entry['hash'] if entry and entry.get('settings') == settings.key else None
+        # The file wasn't touched since its last conversion, no need to read it
+        if known_hash and entry.get('mtime') == stat.st_mtime_ns and entry.get('size') == stat.st_size and os.path.isfile(output):
+            results[source] = ConversionResult(source, output, 'skipped', 0.0, stat.st_size, os.path.getsize(output), None)
+            continue
+        jobs.append((source, output, tuple(settings.command), known_hash))
+    if jobs:
+        if len(jobs) == 1 or settings.workers == 1:
+            done = [_convert_job(job) for job in jobs]
+        else:
+            with process_pool(settings.workers) as executor:
+                done = list(executor.map(_convert_job, jobs, chunksize=max(1, len(jobs) // (4 * (settings.workers or os.cpu_count() or 1)))))
+        for fields, content_hash in done:
+            result = ConversionResult(*fields)
+            results[result.source] = result
+            if content_hash is None:
+                continue
+            folder, name = result.source.rsplit('/', 1)
+            try:
+                stat = os.stat(result.source)
+            except OSError:
+                continue
+            manifests[folder][name] = {'hash': content_hash, 'settings': settings.key, 'mtime': stat.st_mtime_ns, 'size': stat.st_size, 'output': result.output.rsplit('/', 1)[-1]}
+        for folder in {job[0].rsplit('/', 1)[0] for job in jobs}:
+            _save_manifest(folder, manifests[folder])
+    return [results[source] for source in files]
+
+def converted_paths(paths: list[str], results: list[ConversionResult], extension: str) -> dict:
+    """
+     Find the converted path of each texture path. UDIM paths keep their token and need every tile converted.
+
+     @param paths - Texture paths given to convert_textures.
+     @param results - Results of convert_textures.
+     @param extension - Extension of the converted files.
+
+     @return Dictionary of texture paths and converted paths. Paths with a failed file are not included.
+    """
+    from .texture_validation import expand_udim_path
+    from .path_helper import path_udim
+    status = {result.source: result.status for result in results}
+    converted = dict()
+    for path in paths:
+        if not path:
+            continue
+        tiles = expand_udim_path(path)
+        files = [tile.replace('\\', '/') for tile in tiles.values()] if tiles else [path.replace('\\', '/')]
+        if all(status.get(file) in ('converted', 'skipped') for file in files):
+            converted[path] = output_path(path_udim(path)[0] if tiles else path, extension)
+    return converted
+
+def repoint_file_nodes(converted: dict, nodes: list[str]|None = None) -> list[tuple]:
+    """
+     Point the file nodes at the converted textures in one undo chunk.
+
+     @param converted - Dictionary of texture paths and converted paths, from converted_paths.
+     @param nodes - File nodes to repoint. None for every file node created by the tool.
+
+     @return List of (node, old path, new path) changed.
+    """
+    from .mel_helper import cmds, find_tagged_nodes, set_attributes
+    from .path_helper import path_udim
+    # The nodes hold the UDIM token of the paths
+    lookup = dict()
+    for path, new_path in converted.items():
+        lookup[path.replace('\\', '/')] = new_path
+        lookup[path_udim(path)[0].replace('\\', '/')] = new_path
+    changes = list()
+    for node in (find_tagged_nodes('file') if nodes is None else nodes):
+        old_path = cmds.getAttr('{}.fileTextureName'.format(node)) or str()
+        new_path = lookup.get(old_path.replace('\\', '/'))
+        if new_path and new_path != old_path:
+            changes.append((node, old_path, new_path))
+    if changes:
+        set_attributes([('{}.fileTextureName'.format(node), new_path, 'string') for node, _, new_path in changes], 'ShaderCreatorConvert')
+    return changes
+
+def format_conversion(results: list[ConversionResult]) -> str:
+    """
+     Describe a conversion with the time of each file and the bytes saved.
+
+     @param results - Results of convert_textures.
+
+     @return The report as text.
+    """
+    lines = list()
+    for result in results:
+        line = '{0:<10}{1:>10.3f} s  {2}'.format(result.status, result.seconds, result.source)
+        if result.error:
+            line = '{0}  ({1})'.format(line, result.error)
+        lines.append(line)
+    done = [result for result in results if result.status != 'failed']
+    saved = sum(result.source_bytes - result.output_bytes for result in done)
+    lines.append('{0} converted, {1} skipped, {2} failed, {3:.3f} s, {4} bytes saved'.format(
+        sum(result.status == 'converted' for result in results), sum(result.status == 'skipped' for result in results),
+        sum(result.status == 'failed' for result in results), sum(result.seconds for result in results), saved))
+    return '\n'.join(lines)
+
+def main(argv: list[str]|None = None) -> int:
+    """
+     Command line entry point: python -m ShaderCreator.utilities.texture_convert
+
+     @param argv - Command line arguments. Defaults to sys.argv.
+
+     @return Exit code, 1 if a file failed.
+    """
+    parser = argparse.ArgumentParser(description='Shader Creator texture conversion')
+    parser.add_argument('paths', nargs='+', help='Textures to convert')
+    parser.add_argument('--command', help='Converter command, with {input} and {output}. Defaults to maketx')
+    parser.add_argument('--stand-in', action='store_true', help='Copy the files instead of converting them')
+    parser.add_argument('--extension', default='tx')
+    parser.add_argument('--workers', type=int)
+    args = parser.parse_args(argv)
+    if args.stand_in:
+        settings = stand_in_settings(args.workers)._replace(extension=args.extension)
+    else:
+        settings = ConverterSettings(tuple(args.command.split()) if args.command else MAKETX_COMMAND, args.extension, args.workers)
+    results = convert_textures(args.paths, settings)
+    print(format_conversion(results))
+    return 1 if any(result.status == 'failed' for result in results) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+from __future__ import annotations
+import os
+import re
+from .naming import get_naming_convention
+
+TILE_PATTERN = re.compile(r'^(?P<start>.*\.)(?:(?P<udim>\d{4})|u(?P<u>\d+)_v(?P<v>\d+))(?P<end>\.[^./]+)$')
+
+class DirectoryIndex(object):
+    """
+     Index of the texture files of a folder. It is rebuilt only when the folder modification time changes.
+
+     @param path - Folder to index.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.mtime = None
+        self.convention = None
+        self.files = list()
+        self.folders = list()
+        self.records = dict()
+        self.groups = dict()
+        self._tiles = None
+        self._histories = dict()
+
+    def refresh(self) -> bool:
+        """
+         Rebuild the index if the folder changed since the last scan.
+
+         @return True if the index was rebuilt. False if it was up to date.
+        """
+        mtime = os.stat(self.path).st_mtime_ns
+        convention = get_naming_convention()
+        if mtime == self.mtime and convention is self.convention:
+            return False
+        records = dict()
+        groups = dict()
+        # Parse every file of the folder only once, the sub folders are kept for the recursive searches
+        files = list()
+        folders = list()
+        with os.scandir(self.path) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    files.append(entry.name)
+                elif entry.is_dir():
+                    folders.append(entry.name)
+        for file, record in zip(files, convention.classify_many(files)):
+            if not record:
+                continue
+            records[file] = record
+            groups.setdefault(record.key, dict()).setdefault(record.channel, list()).append(record)
+        self.files = files
+        self.folders = sorted(folders)
+        self.records = records
+        self.groups = groups
+        self._tiles = None
+        self._histories = dict()
+        self.mtime = mtime
+        self.convention = convention
+        return True
+
+    def histories(self, key: tuple) -> dict:
+        """
+         Get the version history of each channel of a texture set. Each history is built once for each folder scan.
+
+         @param key - Key of the texture set, TextureName.key.
+
+         @return Dictionary of channels and versions.VersionHistory.
+        """
+        from .versions import build_histories
+        histories = self._histories.get(key)
+        if histories is None:
+            records = [record for found_list in self.groups.get(key, dict()).values() for record in found_list]
+            histories = build_histories(records, self.path)
+            self._histories[key] = histories
+        return histories
+
+    def tiles(self, template: str) -> dict:
+        """
+         Find the tiles of a UDIM texture. The tiles of every texture of the folder are grouped the first time.
+
+         @param template - File name with a UDIM token: <UDIM>, u<u>_v<v> or u<U>_v<V>.
+
+         @return Dictionary of UDIM numbers and file names.
+        """
+        if self._tiles is None:
+            tiles = dict()
+            for file in self.files:
+                tile_match = TILE_PATTERN.match(file)
+                if not tile_match:
+                    continue
+                start, end = tile_match.group('start', 'end')
+                if tile_match.group('udim'):
+                    tiles.setdefault('{0}<UDIM>{1}'.format(start, end), dict())[int(tile_match.group('udim'))] = file
+                    continue
+                # Every tiling mode is stored with the UDIM number: 1001 + u + 10 * v
+                u, v = int(tile_match.group('u')), int(tile_match.group('v'))
+                tiles.setdefault('{0}u<u>_v<v>{1}'.format(start, end), dict())[1001 + u + 10 * v] = file
+                tiles.setdefault('{0}u<U>_v<V>{1}'.format(start, end), dict())[1000 + u + 10 * (v - 1)] = file
+            self._tiles = tiles
+        return self._tiles.get(template, dict())
+
+_INDEX_CACHE = dict()
+
+def get_directory_index(path: str) -> DirectoryIndex:
+    """
+     Get the index of a folder, creating or refreshing it if needed.
+
+     @param path - Folder to index.
+
+     @return Up to date DirectoryIndex of the folder.
+    """
+    index = _INDEX_CACHE.get(path)
+    if index is None:
+        index = DirectoryIndex(path)
+        _INDEX_CACHE[path] = index
+    index.refresh()
+    return index
+
+def clear_index_cache() -> None:
+    """
+     Forget every folder indexed in this session.
+
+     @return None
+    """
+    _INDEX_CACHE.clear()
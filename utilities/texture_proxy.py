@@ -0,0 +1,365 @@
+from __future__ import annotations
+from typing import NamedTuple
+import hashlib
+import json
+import os
+import subprocess
+import time
+
+PROXY_COMMAND = ('oiiotool', '{input}', '--fit', '{size}x{size}', '-o', '{output}')
+FULL_PATH_ATTRIBUTE = 'shaderCreatorFullPath'
+PROXY_PATH_ATTRIBUTE = 'shaderCreatorProxyPath'
+TEMPORARY_PREFIX = '.tmp_'
+
+_BACKGROUND = None
+
+def default_cache_folder() -> str:
+    """
+     Get the folder of the proxy cache, SHADER_CREATOR_PROXY_CACHE or a folder in the home of the user.
+
+     @return Path of the folder.
+    """
+    folder = os.environ.get('SHADER_CREATOR_PROXY_CACHE') or os.path.join(os.path.expanduser('~'), '.shader_creator', 'proxies')
+    return folder.replace('\\', '/')
+
+class ProxySettings(NamedTuple):
+    """
+     How the viewport proxies are made and kept.
+
+     @param max_resolution - Largest side of the proxies in pixels.
+     @param cache_folder - Folder of the proxy cache. None for default_cache_folder.
+     @param max_bytes - Size of the cache, the least recently used proxies are deleted past it.
+     @param command - Command and arguments, {input}, {output} and {size} are replaced for each file.
+     @param extension - Extension of the proxies. None to keep the one of the texture.
+     @param workers - Number of files made at the same time.
+    """
+    max_resolution: int = 1024
+    cache_folder: str|None = None
+    max_bytes: int = 4 * 1024 ** 3
+    command: tuple = PROXY_COMMAND
+    extension: str|None = None
+    workers: int = 8
+
+    @property
+    def key(self) -> str:
+        """
+         Hash of the settings that change the proxy files.
+        """
+        return hashlib.sha1(json.dumps([list(self.command), self.max_resolution, self.extension]).encode('utf-8')).hexdigest()
+
+    @property
+    def folder(self) -> str:
+        return (self.cache_folder or default_cache_folder()).replace('\\', '/')
+
+class ProxyResult(NamedTuple):
+    """
+     Result of the proxy of one file.
+
+     @param source - Path of the texture.
+     @param proxy - Path of the proxy.
+     @param status - generated, cached (already up to date) or failed.
+     @param seconds - Time spent on the file.
+     @param error - Error message if it failed.
+    """
+    source: str
+    proxy: str
+    status: str
+    seconds: float
+    error: str|None
+
+def proxy_path(source: str, settings: ProxySettings) -> str:
+    """
+     Path of the proxy of a texture. The textures of one folder share a cache folder and keep their names,
+     so the UDIM tokens of the file nodes still work on the proxies.
+
+     @param source - Path of the texture, it can have a UDIM token.
+     @param settings - ProxySettings.
+
+     @return Path of the proxy.
+    """
+    source = source.replace('\\', '/')
+    folder, name = source.rsplit('/', 1) if '/' in source else ('', source)
+    folder_key = hashlib.sha1('{0}|{1}'.format(os.path.normcase(os.path.abspath(folder or '.')), settings.key).encode('utf-8')).hexdigest()[:16]
+    if settings.extension:
+        name = '{0}.{1}'.format(name.rsplit('.', 1)[0], settings.extension)
+    return '{0}/{1}/{2}'.format(settings.folder, folder_key, name)
+
+def _proxy_job(job: tuple) -> ProxyResult:
+    """
+     Make the proxy of one file if it is missing or older than the texture.
+
+     @param job - Tuple with the source, the proxy, the command and the resolution.
+
+     @return ProxyResult.
+    """
+    source, proxy, command, size = job
+    start = time.perf_counter()
+    try:
+        # Used proxies are touched, so their time is both the last use and newer than the texture they were made from
+        if os.stat(proxy).st_mtime_ns >= os.stat(source).st_mtime_ns:
+            os.utime(proxy)
+            return ProxyResult(source, proxy, 'cached', time.perf_counter() - start, None)
+    except OSError:
+        pass
+    folder, name = proxy.rsplit('/', 1)
+    # The proxy is written next to its final path and moved, the viewport never reads half a file
+    temporary = '{0}/{1}{2}_{3}'.format(folder, TEMPORARY_PREFIX, os.getpid(), name)
+    arguments = [argument.format(input=source, output=temporary, size=size) for argument in command]
+    try:
+        os.makedirs(folder, exist_ok=True)
+        process = subprocess.run(arguments, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        if process.returncode or not os.path.isfile(temporary):
+            error = process.stderr.decode('utf-8', 'replace').strip().splitlines()[-1:] or ['exit code {}'.format(process.returncode)]
+            return ProxyResult(source, proxy, 'failed', time.perf_counter() - start, error[0])
+        os.replace(temporary, proxy)
+    except OSError as err:
+        return ProxyResult(source, proxy, 'failed', time.perf_counter() - start, str(err))
+    finally:
+        if os.path.isfile(temporary):
+            os.remove(temporary)
+    return ProxyResult(source, proxy, 'generated', time.perf_counter() - start, None)
+
+def evict_proxies(settings: ProxySettings, keep: set|None = None) -> list[str]:
+    """
+     Delete the least recently used proxies until the cache fits in its size.
+
+     @param settings - ProxySettings with the folder and size of the cache.
+     @param keep - Proxies that can't be deleted, for example the ones just made.
+
+     @return List of deleted files.
+    """
+    keep = keep or set()
+    entries = list()
+    total = 0
+    try:
+        folders = [entry for entry in os.scandir(settings.folder) if entry.is_dir()]
+    except OSError:
+        return list()
+    for folder in folders:
+        for entry in os.scandir(folder.path):
+            if not entry.is_file() or entry.name.startswith(TEMPORARY_PREFIX):
+                continue
+            stat = entry.stat()
+            total += stat.st_size
+            entries.append((stat.st_mtime_ns, stat.st_size, '{0}/{1}/{2}'.format(settings.folder, folder.name, entry.name)))
+    removed = list()
+    for _, size, path in sorted(entries):
+        if total <= settings.max_bytes:
+            break
+        if path in keep:
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed.append(path)
+    for folder in folders:
+        try:
+            os.rmdir(folder.path)
+        except OSError:
+            pass
+    return removed
+
+def generate_proxies(paths: list[str], settings: ProxySettings|None = None) -> list[ProxyResult]:
+    """
+     Make the proxies of textures on a thread pool, each file is made by its own process. Up to date proxies
+     are reused and the cache is trimmed to its size afterwards. Only the file system is used, so it can run in
+     the background.
+
+     @param paths - Texture paths, UDIM paths are expanded to their tiles.
+     @param settings - ProxySettings. Defaults to 1024 pixels with oiiotool.
+
+     @return List of ProxyResult, one for each file.
+    """
+    from .texture_convert import texture_files
+    from .texture_validation import map_concurrently
+    settings = settings or ProxySettings()
+    jobs = [(source, proxy_path(source, settings), tuple(settings.command), settings.max_resolution) for source in texture_files(paths)]
+    results = map_concurrently(_proxy_job, jobs, settings.workers)
+    evict_proxies(settings, {result.proxy for result in results if result.status != 'failed'})
+    return results
+
+def generate_proxies_in_background(paths: list[str], settings: ProxySettings|None = None, callback=None):
+    """
+     Start generate_proxies on a background thread and return at once.
+
+     @param paths - Texture paths.
+     @param settings - ProxySettings.
+     @param callback - Function called with the list of ProxyResult when it finishes, on the background thread.
+
+     @return concurrent.futures.Future with the list of ProxyResult.
+    """
+    global _BACKGROUND
+    if _BACKGROUND is None:
+        from concurrent.futures import ThreadPoolExecutor
+        _BACKGROUND = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ShaderCreatorProxies')
+    future = _BACKGROUND.submit(generate_proxies, paths, settings)
+    if callback is not None:
+        future.add_done_callback(lambda done: callback(done.result()) if done.exception() is None else None)
+    return future
+
+def proxy_node_paths(nodes: list[str]|None = None) -> dict:
+    """
+     Read the texture paths of file nodes.
+
+     @param nodes - File nodes. None for every file node created by the tool.
+
+     @return Dictionary of nodes and tuples with the full resolution path, the proxy path or None and the current path.
+    """
+    from .mel_helper import cmds, find_tagged_nodes
+    if nodes is None:
+        nodes = find_tagged_nodes('file')
+    # Nodes with recorded paths are found with one query
+    recorded = set(cmds.ls('*.{}'.format(PROXY_PATH_ATTRIBUTE), objectsOnly=True, recursive=True) or list())
+    paths = dict()
+    for node in nodes:
+        current = cmds.getAttr('{}.fileTextureName'.format(node)) or str()
+        full, proxy = current, None
+        if node in recorded:
+            proxy = cmds.getAttr('{0}.{1}'.format(node, PROXY_PATH_ATTRIBUTE)) or None
+            # The node shows its proxy, otherwise its current path is the texture, it can have been repointed since
+            if current == proxy:
+                full = cmds.getAttr('{0}.{1}'.format(node, FULL_PATH_ATTRIBUTE)) or str()
+        paths[node] = (full, proxy, current)
+    return paths
+
+def record_proxy_paths(entries: list[tuple]) -> None:
+    """
+     Save the full resolution and proxy paths on file nodes in one undo chunk.
+
+     @param entries - List of (node, full path, proxy path) tuples.
+
+     @return None
+    """
+    from .mel_helper import cmds
+    cmds.undoInfo(openChunk=True, chunkName='ShaderCreatorProxies')
+    try:
+        for node, full, proxy in entries:
+            for attr, value in ((FULL_PATH_ATTRIBUTE, full), (PROXY_PATH_ATTRIBUTE, proxy)):
+                if not cmds.attributeQuery(attr, node=node, exists=True):
+                    cmds.addAttr(node, longName=attr, dataType='string')
+                cmds.setAttr('{0}.{1}'.format(node, attr), value, type='string')
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+def build_proxies(settings: ProxySettings|None = None, nodes: list[str]|None = None) -> tuple:
+    """
+     Make the proxies of the textures of file nodes and save both paths on the nodes. The nodes keep the path they show.
+
+     @param settings - ProxySettings.
+     @param nodes - File nodes. None for every file node created by the tool.
+
+     @return Tuple with the list of ProxyResult and the list of nodes with a complete proxy.
+    """
+    settings = settings or ProxySettings()
+    paths = proxy_node_paths(nodes)
+    results = generate_proxies(sorted({full for full, _, _ in paths.values() if full}), settings)
+    return results, _record_built(paths, results, settings)
+
+def _record_built(paths: dict, results: list[ProxyResult], settings: ProxySettings) -> list[str]:
+    """
+     Save both paths on the nodes whose every tile has its proxy.
+
+     @return List of the nodes with a complete proxy.
+    """
+    from .texture_convert import texture_files
+    status = {result.source: result.status for result in results}
+    entries = list()
+    for node, (full, proxy, _) in sorted(paths.items()):
+        files = texture_files([full]) if full else list()
+        # Every tile needs its proxy
+        if not files or any(status.get(file) not in ('generated', 'cached') for file in files):
+            continue
+        entries.append((node, full, proxy_path(full, settings)))
+    if entries:
+        record_proxy_paths(entries)
+    return [node for node, _, _ in entries]
+
+def _on_main_thread(function, *args) -> None:
+    """
+     Run a function on the main thread of Maya, Maya commands can't run on other threads. Without Maya it runs at once.
+    """
+    try:
+        import maya.utils
+    except ImportError:
+        function(*args)
+        return
+    maya.utils.executeDeferred(function, *args)
+
+def build_proxies_in_background(settings: ProxySettings|None = None, nodes: list[str]|None = None, callback=None):
+    """
+     Start build_proxies and return at once. The paths of the nodes are read now, the proxies are made on a background
+     thread and both paths are saved on the nodes on the main thread when they are done.
+
+     @param settings - ProxySettings.
+     @param nodes - File nodes. None for every file node created by the tool.
+     @param callback - Function called on the main thread with the list of ProxyResult and the list of nodes with a
+     complete proxy, after the paths are saved.
+
+     @return concurrent.futures.Future with the list of ProxyResult.
+    """
+    settings = settings or ProxySettings()
+    paths = proxy_node_paths(nodes)
+
+    def record(results):
+        built = _record_built(paths, results, settings)
+        if callback is not None:
+            callback(results, built)
+
+    return generate_proxies_in_background(sorted({full for full, _, _ in paths.values() if full}), settings, lambda results: _on_main_thread(record, results))
+
+def switch_resolution(proxy: bool, nodes: list[str]|None = None) -> tuple:
+    """
+     Point file nodes at their proxies or back at the full resolution textures in one undo chunk.
+
+     @param proxy - True for the proxies, False for the full resolution textures.
+     @param nodes - File nodes. None for every file node created by the tool.
+
+     @return Tuple with the list of (node, old path, new path) changed and the list of nodes skipped because their
+             proxy is missing, was evicted or was made for another texture.
+    """
+    from .mel_helper import set_attributes
+    from .texture_convert import texture_files
+    changes = list()
+    skipped = list()
+    for node, (full, proxy_file, current) in sorted(proxy_node_paths(nodes).items()):
+        if proxy_file is None:
+            continue
+        if not proxy:
+            if current == proxy_file and full:
+                changes.append((node, current, full))
+            continue
+        if current == proxy_file:
+            continue
+        sources = texture_files([full])
+        proxies = texture_files([proxy_file])
+        if current != full or not proxies or len(proxies) != len(sources):
+            skipped.append(node)
+            continue
+        # The proxies are used again, they move to the end of the eviction queue
+        for file in proxies:
+            os.utime(file)
+        changes.append((node, current, proxy_file))
+    if changes:
+        set_attributes([('{}.fileTextureName'.format(node), new_path, 'string') for node, _, new_path in changes], 'ShaderCreatorProxySwitch')
+    return changes, skipped
+
+def format_proxies(results: list[ProxyResult]) -> str:
+    """
+     Describe the proxies made with the time of each file.
+
+     @param results - Results of generate_proxies.
+
+     @return The report as text.
+    """
+    lines = list()
+    for result in results:
+        line = '{0:<10}{1:>10.3f} s  {2}'.format(result.status, result.seconds, result.source)
+        if result.error:
+            line = '{0}  ({1})'.format(line, result.error)
+        lines.append(line)
+    lines.append('{0} generated, {1} cached, {2} failed, {3:.3f} s'.format(
+        sum(result.status == 'generated' for result in results), sum(result.status == 'cached' for result in results),
+        sum(result.status == 'failed' for result in results), sum(result.seconds for result in results)))
+    return '\n'.join(lines)
@@ -0,0 +1,216 @@
+from __future__ import annotations
+from typing import NamedTuple
+import os
+
+MAX_WORKERS = 8
+UDIM_TOKENS = ('<UDIM>', 'u<u>_v<v>', 'u<U>_v<V>')
+# First bytes of the image formats the tool knows, files with other extensions are only checked to be readable.
+IMAGE_SIGNATURES = {
+    'exr': [b'\x76\x2f\x31\x01'],
+    'png': [b'\x89PNG\r\n\x1a\n'],
+    'jpg': [b'\xff\xd8\xff'],
+    'jpeg': [b'\xff\xd8\xff'],
+    'tif': [b'II*\x00', b'MM\x00*', b'II+\x00', b'MM\x00+'],
+    'tiff': [b'II*\x00', b'MM\x00*', b'II+\x00', b'MM\x00+'],
+    'tx': [b'II*\x00', b'MM\x00*', b'II+\x00', b'MM\x00+'],
+    'hdr': [b'#?'],
+}
+
+_PROBE_CACHE = dict()
+# Thread pool of the session and its number of workers
+_EXECUTOR = dict()
+
+class TextureCheck(NamedTuple):
+    """
+     Result of the validation of one texture path.
+
+     @param map_type - Map type of the texture.
+     @param path - Path as given, it can have a UDIM token.
+     @param files - Files found for the path, every tile for UDIM textures.
+     @param missing - True if no file was found.
+     @param missing_tiles - UDIM numbers other maps of the material have but this one doesn't.
+     @param empty_files - Files of zero bytes.
+     @param unreadable_files - Files that can't be opened or aren't the image their extension says.
+    """
+    map_type: str
+    path: str
+    files: list
+    missing: bool
+    missing_tiles: list
+    empty_files: list
+    unreadable_files: list
+
+    @property
+    def ok(self) -> bool:
+        return not (self.missing or self.missing_tiles or self.empty_files or self.unreadable_files)
+
+    def errors(self) -> list[str]:
+        """
+         Describe the problems found.
+
+         @return List of plain text errors, empty if the texture is valid.
+        """
+        errors = list()
+        if self.missing:
+            errors.append('Path not found: {0}: {1}'.format(self.map_type, self.path))
+        if self.missing_tiles:
+            errors.append('Missing tiles: {0}: {1}'.format(self.map_type, ', '.join(str(tile) for tile in self.missing_tiles)))
+        errors.extend(['Empty file: {0}: {1}'.format(self.map_type, file) for file in self.empty_files])
+        errors.extend(['Unreadable image: {0}: {1}'.format(self.map_type, file) for file in self.unreadable_files])
+        return errors
+
+def expand_udim_path(path: str) -> dict:
+    """
+     Find the tiles of a UDIM texture in its folder. The tiles come from the texture index of the folder.
+
+     @param path - Path with a UDIM token (<UDIM>, u<u>_v<v>, u<U>_v<V>) or the path of one tile.
+
+     @return Dictionary of UDIM numbers and tile paths. Empty if the path isn't a UDIM path or nothing was found.
+    """
+    from .path_helper import path_udim
+    from .texture_index import get_directory_index
+    # A single tile is converted to its token, the same way the file node receives it
+    path = path_udim(path)[0]
+    if not any(token in path for token in UDIM_TOKENS):
+        return dict()
+    folder, file = os.path.split(path)
+    try:
+        tiles = get_directory_index(folder or '.').tiles(file)
+    except OSError:
+        return dict()
+    return {udim: '{0}/{1}'.format(folder, tile) if folder else tile for udim, tile in tiles.items()}
+
+def map_concurrently(function, items: list, max_workers: int = MAX_WORKERS) -> list:
+    """
+     Call a function for each item on a thread pool kept for the session, for slow file system calls.
+
+     @param function - Function to call with each item.
+     @param items - Items to process.
+     @param max_workers - Maximum number of threads. 1 runs everything in the calling thread.
+
+     @return List of results in the same order as the items.
+    """
+    if len(items) <= 1 or max_workers <= 1:
+        return [function(item) for item in items]
+    if _EXECUTOR.get('workers') != max_workers:
+        from concurrent.futures import ThreadPoolExecutor
+        if _EXECUTOR.get('executor') is not None:
+            # The threads of the previous pool finish their work and exit
+            _EXECUTOR['executor'].shutdown(wait=False)
+        _EXECUTOR['executor'] = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ShaderCreatorFiles')
+        _EXECUTOR['workers'] = max_workers
+    return list(_EXECUTOR['executor'].map(function, items))
+
+def _read_header(path: str, extension: str) -> bool:
+    """
+     Check the first bytes of a file against the signature of its format.
+
+     @return True if the file can be read and looks like its format.
+    """
+    signatures = IMAGE_SIGNATURES.get(extension)
+    try:
+        with open(path, 'rb') as image_file:
+            header = image_file.read(8)
+    except OSError:
+        return False
+    if not signatures:
+        return bool(header)
+    return any(header.startswith(signature) for signature in signatures)
+
+def probe_file(path: str) -> str:
+    """
+     Stat a file and check its header. The header result is cached by path, modification time and size.
+
+     @param path - File to check.
+
+     @return Status of the file: ok, missing, empty or unreadable.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return 'missing'
+    if stat.st_size == 0:
+        return 'empty'
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    status = _PROBE_CACHE.get(key)
+    if status is None:
+        status = 'ok' if _read_header(path, path.rsplit('.', 1)[-1].lower()) else 'unreadable'
+        # Keep the cache bounded for very big libraries
+        if len(_PROBE_CACHE) >= 100000:
+            _PROBE_CACHE.clear()
+        _PROBE_CACHE[key] = status
+    return status
+
+def probe_files(paths: list[str], max_workers: int = MAX_WORKERS) -> dict:
+    """
+     Probe many files at once on a bounded thread pool, stats on network storage are slow but don't need the CPU.
+
+     @param paths - Files to check.
+     @param max_workers - Maximum number of threads.
+
+     @return Dictionary of paths and status.
+    """
+    paths = list(dict.fromkeys(paths))
+    return dict(zip(paths, map_concurrently(probe_file, paths, max_workers)))
+
+def validate_texture_sets(texture_sets: dict, max_workers: int = MAX_WORKERS) -> dict:
+    """
+     Validate the textures of many materials in one pass: UDIM paths are expanded to their tiles and every file
+     of every material is probed in the same thread pool.
+
+     @param texture_sets - Dictionary of material names and dictionaries of map types and paths.
+     @param max_workers - Maximum number of threads.
+
+     @return Dictionary of material names and dictionaries of map types and TextureCheck. Empty paths are skipped.
+    """
+    expanded = dict()
+    all_files = list()
+    for name, textures in texture_sets.items():
+        for map_type, path in (textures or dict()).items():
+            if not path:
+                continue
+            tiles = expand_udim_path(path)
+            expanded[(name, map_type)] = tiles
+            all_files.extend(tiles.values() if tiles else [path])
+    status = probe_files(all_files, max_workers)
+    checks = dict()
+    for name, textures in texture_sets.items():
+        material_checks = dict()
+        # Tiles any UDIM map of the material has, the other UDIM maps should have them too
+        material_tiles = set()
+        for map_type, path in (textures or dict()).items():
+            if path:
+                material_tiles.update(expanded[(name, map_type)])
+        for map_type, path in (textures or dict()).items():
+            if not path:
+                continue
+            tiles = expanded[(name, map_type)]
+            files = [tiles[udim] for udim in sorted(tiles)] if tiles else [path]
+            found = [file for file in files if status[file] != 'missing']
+            missing_tiles = sorted(material_tiles.difference(tiles)) if tiles else list()
+            material_checks[map_type] = TextureCheck(
+                map_type, path, found, not found, missing_tiles,
+                [file for file in files if status[file] == 'empty'],
+                [file for file in files if status[file] == 'unreadable'],
+            )
+        checks[name] = material_checks
+    return checks
+
+def validate_textures(textures: dict, max_workers: int = MAX_WORKERS) -> dict:
+    """
+     Validate the textures of one material.
+
+     @param textures - Dictionary of map types and paths.
+     @param max_workers - Maximum number of threads.
+
+     @return Dictionary of map types and TextureCheck. Empty paths are skipped.
+    """
+    return validate_texture_sets({None: textures}, max_workers)[None]
+
+def clear_probe_cache() -> None:
+    """
+     Forget every file checked in this session.
+
+     @return None
+    """
+    _PROBE_CACHE.clear()
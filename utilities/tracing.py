@@ -0,0 +1,341 @@
+from __future__ import annotations
+from typing import NamedTuple
+import importlib
+import json
+import os
+import threading
+import time
+
+# Modules whose cmds and os globals are swapped for traced ones while tracing, nothing is wrapped when it is off
+TRACED_COMMANDS = ('mel_helper',)
+TRACED_FILESYSTEM = ('path_helper', 'texture_index', 'texture_validation', 'sanity_checks')
+FILESYSTEM_FUNCTIONS = ('scandir', 'listdir', 'stat', 'walk')
+PATH_FUNCTIONS = ('exists', 'isfile', 'isdir', 'getmtime', 'getsize')
+# Functions timed as a whole, the name matching and the checks around the commands
+TRACED_FUNCTIONS = {
+    'path_helper': ('path_udim', 'path_look_relatives', 'file_latest_version', 'discover_texture_sets'),
+    'naming': ('classify_texture',),
+    'sanity_checks': ('main_sanity_checks', 'batch_sanity_checks', 'file_bad_naming'),
+    'image_header': ('probe_headers',),
+}
+# Functions that create one material, the first argument is its name
+MATERIAL_FUNCTIONS = {'btn_actions': ('run_create', 'run_create_material')}
+MAX_EVENTS = 200000
+_TRACING = {'tracer': None, 'patches': list()}
+
+class OperationStats(NamedTuple):
+    """
+     Time spent in one traced operation.
+
+     @param name - Operation, for example cmds.connectAttr or os.scandir.
+     @param category - cmds, fs or python.
+     @param calls - Number of calls.
+     @param seconds - Cumulative time, nested operations are also counted in the operations around them.
+     @param mean_ms - Mean time of a call in milliseconds.
+     @param p95_ms - 95th percentile of a call in milliseconds.
+    """
+    name: str
+    category: str
+    calls: int
+    seconds: float
+    mean_ms: float
+    p95_ms: float
+
+class Tracer(object):
+    """
+     Records the calls made while tracing: the time of every call for each operation, the totals of each material
+     and a bounded list of events for a Chrome trace.
+
+     @param max_events - Events kept for the trace, the statistics keep counting after the limit.
+    """
+    def __init__(self, max_events: int = MAX_EVENTS):
+        self.max_events = max_events
+        self.start = time.perf_counter()
+        self.durations = dict()
+        self.categories = dict()
+        self.materials = dict()
+        self.events = list()
+        self.dropped = 0
+        self.local = threading.local()
+        self.lock = threading.Lock()
+
+    def current_material(self) -> str|None:
+        stack = getattr(self.local, 'materials', None)
+        return stack[-1] if stack else None
+
+    def record(self, name: str, category: str, start: float, seconds: float, detail=None) -> None:
+        """
+         Add one call.
+
+         @param name - Operation.
+         @param category - cmds, fs, python or material.
+         @param start - perf_counter at the start of the call.
+         @param seconds - Duration of the call.
+         @param detail - First argument of the call, shown in the trace.
+
+         @return None
+        """
+        material = self.current_material()
+        with self.lock:
+            self.durations.setdefault(name, list()).append(seconds)
+            self.categories[name] = category
+            if material is not None and category in ('cmds', 'fs'):
+                totals = self.materials.setdefault(material, {'seconds': 0.0, 'cmds': 0, 'cmds_seconds': 0.0, 'fs': 0, 'fs_seconds': 0.0})
+                totals[category] += 1
+                totals['{}_seconds'.format(category)] += seconds
+            if len(self.events) < self.max_events:
+                self.events.append((name, category, start, seconds, threading.get_ident(), material, detail))
+            else:
+                self.dropped += 1
+
+    def enter_material(self, name: str) -> bool:
+        """
+         Make a material the current one of the thread.
+
+         @return True if the material wasn't already the current one, the outermost call counts the time.
+        """
+        stack = getattr(self.local, 'materials', None)
+        if stack is None:
+            stack = self.local.materials = list()
+        outermost = not stack or stack[-1] != name
+        stack.append(name)
+        return outermost
+
+    def exit_material(self, name: str, seconds: float, outermost: bool) -> None:
+        self.local.materials.pop()
+        if outermost:
+            with self.lock:
+                totals = self.materials.setdefault(name, {'seconds': 0.0, 'cmds': 0, 'cmds_seconds': 0.0, 'fs': 0, 'fs_seconds': 0.0})
+                totals['seconds'] += seconds
+
+    def stats(self) -> list[OperationStats]:
+        """
+         Get the statistics of every operation, the slowest first.
+
+         @return List of OperationStats.
+        """
+        from .benchmark import percentile
+        with self.lock:
+            durations = {name: list(values) for name, values in self.durations.items()}
+        stats = [OperationStats(name, self.categories[name], len(values), sum(values), 1000.0 * sum(values) / len(values), 1000.0 * percentile(values, 95)) for name, values in durations.items()]
+        return sorted(stats, key=lambda item: item.seconds, reverse=True)
+
+    def chrome_trace(self) -> dict:
+        """
+         Get the events as a Chrome trace, it opens in chrome://tracing, Perfetto or speedscope as a flame chart.
+
+         @return Dictionary in the Trace Event Format.
+        """
+        pid = os.getpid()
+        with self.lock:
+            events = list(self.events)
+        trace_events = list()
+        for name, category, start, seconds, thread, material, detail in events:
+            event = {'name': name, 'cat': category, 'ph': 'X', 'ts': (start - self.start) * 1e6, 'dur': seconds * 1e6, 'pid': pid, 'tid': thread}
+            args = dict()
+            if material is not None:
+                args['material'] = material
+            if detail is not None:
+                args['detail'] = str(detail)[:200]
+            if args:
+                event['args'] = args
+            trace_events.append(event)
+        return {'traceEvents': trace_events, 'displayTimeUnit': 'ms', 'otherData': {'dropped_events': self.dropped}}
+
+class _TracedCommands(object):
+    """
+     Stand in for the cmds proxy of a module, every command is timed.
+    """
+    def __init__(self, commands, tracer: Tracer):
+        self._commands = commands
+        self._tracer = tracer
+
+    def __getattr__(self, name: str):
+        function = getattr(self._commands, name)
+        return _wrap(function, 'cmds.{}'.format(name), 'cmds', self._tracer)
+
+class _TracedModule(object):
+    """
+     Stand in for the os module, or os.path, of a module. Only the functions reading the disk are timed.
+    """
+    def __init__(self, module, prefix: str, functions: tuple, tracer: Tracer):
+        self._module = module
+        self._prefix = prefix
+        self._functions = functions
+        self._tracer = tracer
+
+    def __getattr__(self, name: str):
+        value = getattr(self._module, name)
+        if name == 'path' and self._prefix == 'os':
+            return _TracedModule(value, 'os.path', PATH_FUNCTIONS, self._tracer)
+        if name not in self._functions:
+            return value
+        if name == 'scandir':
+            return _scandir(value, self._tracer)
+        return _wrap(value, '{0}.{1}'.format(self._prefix, name), 'fs', self._tracer)
+
+class _ScandirSpan(object):
+    """
+     Iterator of os.scandir that is timed until it is closed, reading the entries is part of the call.
+    """
+    def __init__(self, iterator, tracer: Tracer, start: float, path):
+        self._iterator = iterator
+        self._tracer = tracer
+        self._start = start
+        self._path = path
+        self._done = False
+
+    def __iter__(self):
+        return iter(self._iterator)
+
+    def __next__(self):
+        return next(self._iterator)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._iterator.close()
+        if not self._done:
+            self._done = True
+            self._tracer.record('os.scandir', 'fs', self._start, time.perf_counter() - self._start, self._path)
+
+def _scandir(function, tracer: Tracer):
+    def scandir(path='.'):
+        start = time.perf_counter()
+        return _ScandirSpan(function(path), tracer, start, path)
+    return scandir
+
+def _wrap(function, name: str, category: str, tracer: Tracer):
+    """
+     Time a function with a tracer.
+    """
+    if not callable(function):
+        return function
+
+    def traced(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            tracer.record(name, category, start, time.perf_counter() - start, args[0] if args else None)
+    traced.__wrapped__ = function
+    return traced
+
+def _wrap_material(function, name: str, tracer: Tracer):
+    """
+     Time a function creating a material and make the material current while it runs.
+    """
+    def traced(*args, **kwargs):
+        material = args[0] if args else kwargs.get('shader_name')
+        outermost = tracer.enter_material(material)
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - start
+            tracer.exit_material(material, seconds, outermost)
+            tracer.record(name, 'material', start, seconds, material)
+    traced.__wrapped__ = function
+    return traced
+
+def _patch(module, name: str, value) -> None:
+    _TRACING['patches'].append((module, name, getattr(module, name)))
+    setattr(module, name, value)
+
+def enable_tracing(max_events: int = MAX_EVENTS) -> Tracer:
+    """
+     Start tracing the Maya commands, the file system calls and the name matching of the tool. The modules get
+     traced stand ins for their cmds and os globals and their functions, disable_tracing puts the originals back.
+
+     @param max_events - Events kept for the trace.
+
+     @return The Tracer recording, the running one if tracing is already on.
+    """
+    if _TRACING['tracer'] is not None:
+        return _TRACING['tracer']
+    tracer = Tracer(max_events)
+    package = __name__.rsplit('.', 1)[0]
+    for module_name in TRACED_COMMANDS:
+        module = importlib.import_module('{0}.{1}'.format(package, module_name))
+        _patch(module, 'cmds', _TracedCommands(module.cmds, tracer))
+    for module_name in TRACED_FILESYSTEM:
+        module = importlib.import_module('{0}.{1}'.format(package, module_name))
+        if hasattr(module, 'os'):
+            _patch(module, 'os', _TracedModule(module.os, 'os', FILESYSTEM_FUNCTIONS, tracer))
+    for module_name, names in TRACED_FUNCTIONS.items():
+        module = importlib.import_module('{0}.{1}'.format(package, module_name))
+        for name in names:
+            _patch(module, name, _wrap(getattr(module, name), '{0}.{1}'.format(module_name, name), 'python', tracer))
+    for module_name, names in MATERIAL_FUNCTIONS.items():
+        module = importlib.import_module('{0}.{1}'.format(package, module_name))
+        for name in names:
+            _patch(module, name, _wrap_material(getattr(module, name), '{0}.{1}'.format(module_name, name), tracer))
+    _TRACING['tracer'] = tracer
+    return tracer
+
+def disable_tracing() -> Tracer|None:
+    """
+     Stop tracing and put back the original globals of the modules.
+
+     @return The Tracer with what was recorded, None if tracing was off.
+    """
+    for module, name, original in reversed(_TRACING['patches']):
+        setattr(module, name, original)
+    del _TRACING['patches'][:]
+    tracer = _TRACING['tracer']
+    _TRACING['tracer'] = None
+    return tracer
+
+def get_tracer() -> Tracer|None:
+    """
+     Get the running Tracer.
+
+     @return The Tracer, None if tracing is off.
+    """
+    return _TRACING['tracer']
+
+def export_chrome_trace(path: str, tracer: Tracer|None = None) -> int:
+    """
+     Write the events of a tracer as a Chrome trace JSON file.
+
+     @param path - File to write.
+     @param tracer - Tracer to export. None for the running one.
+
+     @return Number of events written.
+    """
+    tracer = tracer or get_tracer()
+    if tracer is None:
+        raise ValueError('Tracing is off and no tracer was given')
+    trace = tracer.chrome_trace()
+    with open(path, 'w') as trace_file:
+        json.dump(trace, trace_file)
+    return len(trace['traceEvents'])
+
+def format_stats(tracer: Tracer|None = None, limit: int = 25) -> str:
+    """
+     Describe where the time went: the slowest operations and the totals of each material.
+
+     @param tracer - Tracer to describe. None for the running one.
+     @param limit - Number of operations and materials shown.
+
+     @return The report as text.
+    """
+    tracer = tracer or get_tracer()
+    if tracer is None:
+        return 'Tracing is off'
+    lines = ['{0:<40}{1:>8}{2:>12}{3:>10}{4:>10}'.format('operation', 'calls', 'total ms', 'mean ms', 'p95 ms')]
+    for stats in tracer.stats()[:limit]:
+        lines.append('{0:<40}{1:>8}{2:>12.2f}{3:>10.3f}{4:>10.3f}'.format(stats.name, stats.calls, 1000.0 * stats.seconds, stats.mean_ms, stats.p95_ms))
+    if tracer.materials:
+        lines.append('')
+        lines.append('{0:<40}{1:>8}{2:>12}{3:>8}{4:>12}'.format('material', 'cmds', 'cmds ms', 'fs', 'total ms'))
+        slowest = sorted(tracer.materials.items(), key=lambda item: item[1]['seconds'], reverse=True)
+        for material, totals in slowest[:limit]:
+            lines.append('{0:<40}{1:>8}{2:>12.2f}{3:>8}{4:>12.2f}'.format(material, totals['cmds'], 1000.0 * totals['cmds_seconds'], totals['fs'], 1000.0 * totals['seconds']))
+    if tracer.dropped:
+        lines.append('{} events left out of the trace'.format(tracer.dropped))
+    return '\n'.join(lines)
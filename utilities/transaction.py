@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+_ACTIVE = list()
+
+def memory_usage() -> float|None:
+    """
+     Get the memory used by Maya.
+
+     @return Megabytes of the heap, None if the backend can't tell.
+    """
+    from .mel_helper import cmds
+    try:
+        return float(cmds.memory(heapMemory=True, megaByte=True))
+    except (AttributeError, RuntimeError, TypeError):
+        return None
+
+def track_nodes(nodes: list[str]) -> None:
+    """
+     Add nodes created by the tool to the running transaction, they are deleted if it fails.
+
+     @param nodes - Names of the created nodes.
+
+     @return None
+    """
+    if _ACTIVE:
+        _ACTIVE[-1].created.extend(nodes)
+
+class Transaction(object):
+    """
+     Group the commands of the tool in one undo chunk and delete the nodes created if an error is raised inside.
+     Transactions can be nested: a material inside a batch is rolled back on its own, the nodes of the materials that
+     succeed go to the batch.
+
+     with Transaction('ShaderCreatorBatch', suspend_undo=True) as transaction:
+         ...
+
+     @param name - Name of the undo chunk.
+     @param suspend_undo - True to stop recording undo inside the transaction, for very large batches. The undo queue
+     is kept and the memory is measured before and after.
+    """
+    def __init__(self, name: str = 'ShaderCreator', suspend_undo: bool = False):
+        self.name = name
+        self.suspend_undo = suspend_undo
+        self.created = list()
+        self.rolled_back = False
+        self.memory_before = None
+        self.memory_after = None
+        self._undo_state = None
+
+    def __enter__(self):
+        from .mel_helper import cmds
+        if self.suspend_undo:
+            self.memory_before = memory_usage()
+            self._undo_state = cmds.undoInfo(query=True, state=True)
+            # stateWithoutFlush keeps what is already in the undo queue
+            cmds.undoInfo(stateWithoutFlush=False)
+        else:
+            cmds.undoInfo(openChunk=True, chunkName=self.name)
+        _ACTIVE.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        from .mel_helper import cmds
+        _ACTIVE.remove(self)
+        try:
+            if exc_type is not None:
+                self.rollback()
+            elif _ACTIVE:
+                _ACTIVE[-1].created.extend(self.created)
+        finally:
+            if self.suspend_undo:
+                cmds.undoInfo(stateWithoutFlush=self._undo_state)
+                self.memory_after = memory_usage()
+            else:
+                cmds.undoInfo(closeChunk=True)
+        return False
+
+    def rollback(self) -> int:
+        """
+         Delete the nodes created in the transaction that still exist.
+
+         @return Number of nodes deleted.
+        """
+        from .mel_helper import cmds
+        existing = [node for node in dict.fromkeys(reversed(self.created)) if cmds.objExists(node)]
+        if existing:
+            cmds.delete(existing)
+        self.created = list()
+        self.rolled_back = True
+        return len(existing)
+
+def format_transaction(transaction: Transaction) -> str:
+    """
+     Describe a transaction: the nodes it kept and the memory used when undo was suspended.
+
+     @param transaction - Transaction finished.
+
+     @return The report as text.
+    """
+    if transaction.rolled_back:
+        line = '{} rolled back'.format(transaction.name)
+    else:
+        line = '{0}: {1} nodes created'.format(transaction.name, len(transaction.created))
+    if transaction.suspend_undo:
+        line = '{}, undo suspended'.format(line)
+        if transaction.memory_before is not None and transaction.memory_after is not None:
+            line = '{0}, memory {1:.1f} MB -> {2:.1f} MB ({3:+.1f} MB)'.format(line, transaction.memory_before, transaction.memory_after, transaction.memory_after - transaction.memory_before)
+    return line
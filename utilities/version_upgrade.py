@@ -0,0 +1,107 @@
+from __future__ import annotations
+from typing import NamedTuple
+
+class VersionChange(NamedTuple):
+    """
+     A file node that can be moved to a newer version of its texture.
+
+     @param node - Name of the file node.
+     @param old_path - fileTextureName of the node.
+     @param new_path - fileTextureName of the latest version.
+     @param old_version - Version of the node.
+     @param new_version - Latest version found.
+    """
+    node: str
+    old_path: str
+    new_path: str
+    old_version: int
+    new_version: int
+
+def resolve_latest_path(file_path: str) -> tuple|None:
+    """
+     Find the latest version of a texture path with the same naming rules as path_look_relatives.
+     UDIM paths are resolved from their first tile and keep their token.
+
+     @param file_path - fileTextureName of a file node.
+
+     @return Tuple with the latest path and the old and new version numbers. None if the path has no version or isn't found.
+    """
+    from .texture_index import get_directory_index
+    from .texture_validation import UDIM_TOKENS, expand_udim_path
+    from .path_helper import path_udim
+    file_path = file_path.replace('\\', '/')
+    if '/' not in file_path:
+        return None
+    tiles = expand_udim_path(file_path)
+    tile_path = tiles[min(tiles)] if tiles else file_path
+    path, file = tile_path.rsplit('/', 1)
+    try:
+        index = get_directory_index(path)
+    except OSError:
+        return None
+    record = index.records.get(file)
+    if record is None or record.version is None:
+        return None
+    history = index.histories(record.key).get(record.channel)
+    if history is None or not len(history):
+        return None
+    latest_path = history.latest()
+    # The node keeps the UDIM token if it had one
+    if any(token in file_path for token in UDIM_TOKENS):
+        latest_path = path_udim(latest_path)[0]
+    return latest_path, record.version, history.latest_version
+
+def find_version_changes(nodes: list[str]|None = None) -> list[VersionChange]:
+    """
+     Find the file nodes of the tool that have a newer version of their texture. Nothing is changed in the scene.
+
+     @param nodes - File nodes to look at. None for every file node created by the tool, found with one query.
+
+     @return List of VersionChange sorted by node name.
+    """
+    from .mel_helper import cmds, find_tagged_nodes
+    if nodes is None:
+        nodes = find_tagged_nodes('file')
+    changes = list()
+    # The folders are read through the cached index, each folder is scanned only once
+    for node in sorted(nodes):
+        old_path = cmds.getAttr('{}.fileTextureName'.format(node)) or str()
+        resolved = resolve_latest_path(old_path)
+        if resolved is None:
+            continue
+        new_path, old_version, new_version = resolved
+        if new_version > old_version and new_path != old_path:
+            changes.append(VersionChange(node, old_path, new_path, old_version, new_version))
+    return changes
+
+def upgrade_texture_versions(dry_run: bool = False, nodes: list[str]|None = None) -> list[VersionChange]:
+    """
+     Move every file node of the tool to the latest version of its texture in one undoable step.
+
+     @param dry_run - True to only report the changes.
+     @param nodes - File nodes to upgrade. None for every file node created by the tool.
+
+     @return List of VersionChange applied, or that would be applied in a dry run.
+    """
+    from .mel_helper import set_attributes
+    changes = find_version_changes(nodes)
+    if changes and not dry_run:
+        # Only the changed paths are set
+        set_attributes([('{}.fileTextureName'.format(change.node), change.new_path, 'string') for change in changes], 'ShaderCreatorUpgrade')
+    return changes
+
+def format_version_changes(changes: list[VersionChange], dry_run: bool = False) -> str:
+    """
+     Describe version changes for the artist.
+
+     @param changes - List of VersionChange.
+     @param dry_run - True if the changes weren't applied.
+
+     @return The report as text.
+    """
+    if not changes:
+        return 'Every texture is already in its latest version.'
+    lines = ['{0} file nodes {1} to the latest version:'.format(len(changes), 'would be moved' if dry_run else 'moved')]
+    for change in changes:
+        lines.append('{0}: v{1} -> v{2} {3}'.format(change.node, change.old_version, change.new_version, change.new_path))
+    return '\n'.join(lines)
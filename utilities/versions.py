@@ -0,0 +1,79 @@
+from __future__ import annotations
+import bisect
+
+class VersionHistory(object):
+    """
+     Every version of one map of one asset, sorted once when the files are added.
+     The latest version is read in O(1) and a version is pinned with a binary search.
+    """
+    def __init__(self):
+        self.versions = list()
+        self.files = dict()
+        self._best = dict()
+
+    def add(self, version: int, path: str, order: tuple = ()) -> None:
+        """
+         Add a file of a version.
+
+         @param version - Version number of the file.
+         @param path - Path of the file.
+         @param order - Sort key between files of the same version, the smallest is returned. For example the UDIM tile.
+
+         @return None
+        """
+        if version not in self.files:
+            bisect.insort(self.versions, version)
+            self.files[version] = list()
+        self.files[version].append(path)
+        best = self._best.get(version)
+        if best is None or (order, path) < best:
+            self._best[version] = (order, path)
+
+    def __len__(self) -> int:
+        return len(self.versions)
+
+    @property
+    def latest_version(self) -> int|None:
+        return self.versions[-1] if self.versions else None
+
+    def latest(self) -> str|None:
+        """
+         Get the file of the latest version.
+
+         @return Path of the file or None if there are no versions.
+        """
+        return self._best[self.versions[-1]][1] if self.versions else None
+
+    def pin(self, version: int, exact: bool = False) -> str|None:
+        """
+         Get the file of a version. If the version doesn't exist the closest older version is used.
+
+         @param version - Version number to look for.
+         @param exact - True to return None if the version doesn't exist.
+
+         @return Path of the file or None if there is no version at or before the given one.
+        """
+        position = bisect.bisect_right(self.versions, version)
+        if not position:
+            return None
+        found = self.versions[position - 1]
+        if exact and found != version:
+            return None
+        return self._best[found][1]
+
+def build_histories(records: list, folder: str = '') -> dict:
+    """
+     Build the version history of every channel of a group of classified files.
+
+     @param records - List of naming.TextureName. Files without version are skipped.
+     @param folder - Folder of the files, used to build the paths.
+
+     @return Dictionary of channels and VersionHistory.
+    """
+    histories = dict()
+    for record in records:
+        if record.version is None:
+            continue
+        path = '{0}/{1}'.format(folder, record.name) if folder else record.name
+        histories.setdefault(record.channel, VersionHistory()).add(record.version, path, (record.udim or '', record.extension, record.name))
+    return histories